@@ -0,0 +1,175 @@
+"""Provide a class for a persistent cache of parsed novels.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import pickle
+from hashlib import sha1
+from hashlib import sha256
+from pywriter.pywriter_globals import *
+
+
+class NovelCache:
+    """Persistent cache for Novel instances parsed from project files.
+
+    Public methods:
+        get(projectPath, sourceFiles, settings) -- return a cached Novel instance, if any.
+        put(projectPath, sourceFiles, settings, novel) -- store a Novel instance.
+
+    Public instance variables:
+        cacheDir -- str: path to the cache directory.
+        maxSize -- int: maximum size of all cache entries in bytes.
+
+    Each entry is a file in the cache directory, named after the project path.
+    It holds a header and the pickled Novel instance. The header identifies
+    the source files by path, size, and modification time, and by a content hash.
+    An entry is valid if the parser settings match, and if either the file stats
+    or the content hash match. The latter keeps the entry valid e.g. after a
+    fresh checkout that changes the modification times.
+
+    The least recently used entries are deleted if the cache exceeds maxSize.
+    Since cache entries are unpickled, the cache directory must be trusted.
+    """
+    EXTENSION = '.pickle'
+    FORMAT_VERSION = 4
+    # To be incremented when the model classes change.
+
+    def __init__(self, cacheDir, maxSize=100000000):
+        """Initialize instance variables.
+
+        Positional arguments:
+            cacheDir -- str: path to the cache directory (created, if missing).
+
+        Optional arguments:
+            maxSize -- int: maximum size of all cache entries in bytes.
+        """
+        self.cacheDir = cacheDir
+        self.maxSize = maxSize
+
+    def get(self, projectPath, sourceFiles, settings):
+        """Return the cached Novel instance parsed from sourceFiles.
+
+        Positional arguments:
+            projectPath -- str: path to the project file.
+            sourceFiles -- list of str: paths to all files parsed for the project.
+            settings -- dict: parser settings affecting the result.
+
+        Return None, if there is no valid cache entry.
+        """
+        entryPath = self._get_entry_path(projectPath)
+        try:
+            with open(entryPath, 'rb') as f:
+                header = pickle.load(f)
+                if header['version'] != self.FORMAT_VERSION:
+                    return None
+
+                if header['settings'] != self._get_signature(settings):
+                    return None
+
+                fileStats = self._get_file_stats(sourceFiles)
+                if header['stats'] != fileStats:
+                    if header['hash'] != self._get_content_hash(sourceFiles):
+                        return None
+
+                    isRenewed = True
+                else:
+                    isRenewed = False
+                novel = pickle.load(f)
+        except:
+            return None
+
+        if isRenewed:
+            # Update the file stats, so the next lookup doesn't need hashing.
+            self.put(projectPath, sourceFiles, settings, novel)
+        else:
+            # Mark the entry as recently used.
+            try:
+                os.utime(entryPath)
+            except:
+                pass
+        return novel
+
+    def put(self, projectPath, sourceFiles, settings, novel):
+        """Store a Novel instance parsed from sourceFiles.
+
+        Positional arguments:
+            projectPath -- str: path to the project file.
+            sourceFiles -- list of str: paths to all files parsed for the project.
+            settings -- dict: parser settings affecting the result.
+            novel -- Novel instance to store.
+
+        The cache is an optimization, so errors are ignored.
+        """
+        entryPath = self._get_entry_path(projectPath)
+        try:
+            header = dict(
+                version=self.FORMAT_VERSION,
+                path=os.path.realpath(projectPath),
+                settings=self._get_signature(settings),
+                stats=self._get_file_stats(sourceFiles),
+                hash=self._get_content_hash(sourceFiles),
+                )
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with open(f'{entryPath}.tmp', 'wb') as f:
+                pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(novel, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(f'{entryPath}.tmp', entryPath)
+            self._prune()
+        except:
+            pass
+
+    def _get_entry_path(self, projectPath):
+        """Return the path of the cache entry for projectPath."""
+        key = sha1(os.path.realpath(projectPath).encode('utf-8')).hexdigest()
+        return f'{self.cacheDir}/{key}{self.EXTENSION}'
+
+    def _get_file_stats(self, sourceFiles):
+        """Return a list of (path, size, modification time) tuples."""
+        fileStats = []
+        for filePath in sourceFiles:
+            stat = os.stat(filePath)
+            fileStats.append((filePath, stat.st_size, stat.st_mtime_ns))
+        return fileStats
+
+    def _get_content_hash(self, sourceFiles):
+        """Return a hash over the names and contents of sourceFiles."""
+        contentHash = sha256()
+        for filePath in sourceFiles:
+            contentHash.update(os.path.basename(filePath).encode('utf-8'))
+            with open(filePath, 'rb') as f:
+                contentHash.update(f.read())
+        return contentHash.hexdigest()
+
+    def _get_signature(self, settings):
+        """Return a comparable representation of the plain settings."""
+        plainTypes = (str, int, float, bool, tuple, list, type(None))
+        signature = []
+        for key in sorted(settings):
+            if isinstance(settings[key], plainTypes):
+                signature.append((key, repr(settings[key])))
+        return signature
+
+    def _prune(self):
+        """Delete the least recently used entries exceeding the size limit.
+
+        Only the entries of this cache's kind count, so caches
+        with different extensions can share the cache directory.
+        """
+        entries = []
+        for fileName in os.listdir(self.cacheDir):
+            # The entry name is a hash followed by the extension; e.g. ".pickle" must not match ".nwd.pickle".
+            if fileName.endswith(self.EXTENSION) and not '.' in fileName[:-len(self.EXTENSION)]:
+                entryPath = f'{self.cacheDir}/{fileName}'
+                stat = os.stat(entryPath)
+                entries.append((stat.st_mtime_ns, stat.st_size, entryPath))
+        entries.sort(reverse=True)
+        totalSize = 0
+        for __, size, entryPath in entries:
+            totalSize += size
+            if totalSize > self.maxSize:
+                try:
+                    os.remove(entryPath)
+                except:
+                    pass
@@ -5,18 +5,22 @@ For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 from pywriter.model.basic_element import BasicElement
+from pywriter.model.id_list import IdList
 
 
 class Chapter(BasicElement):
     """yWriter chapter representation.
     
+    Public methods:
+        set_order_observer(observer) -- set a function to be called when the scene list changes.
+
     Public instance variables:
         chLevel: int -- chapter level (part/chapter).
         chType: int -- chapter type (Normal/Notes/Todo/Unused).
         suppressChapterTitle: bool -- uppress chapter title when exporting.
         isTrash: bool -- True, if the chapter is the project's trash bin.
         suppressChapterBreak: bool -- Suppress chapter break when exporting.
-        srtScenes: list of str -- the chapter's sorted scene IDs.        
+        srtScenes: IdList -- the chapter's sorted scene IDs (property with getter and setter).
     """
 
     def __init__(self):
@@ -26,6 +30,10 @@ class Chapter(BasicElement):
         """
         super().__init__()
 
+        self._orderObserver = None
+        # Function to be called when the scene list changes.
+        # Set by the ChapterDict holding the chapter; not pickled.
+
         self.chLevel: int = None
         # xml: <SectionStart>
         # 0 = chapter level
@@ -81,3 +89,36 @@ class Chapter(BasicElement):
         # xml: <Scenes><ScID>
         # The chapter's scene IDs. The order of its elements
         # corresponds to the chapter's order of the scenes.
+
+    @property
+    def srtScenes(self) -> IdList:
+        return self._srtScenes
+
+    @srtScenes.setter
+    def srtScenes(self, scIds: list):
+        """Set the sorted scene IDs, indexing them for membership tests."""
+        self._srtScenes = IdList(scIds, self._notify_order_observer)
+        self._notify_order_observer()
+
+    def set_order_observer(self, observer):
+        """Set a function to be called when the scene list changes.
+        
+        Positional arguments:
+            observer -- callable without arguments, or None.
+        """
+        self._orderObserver = observer
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_orderObserver'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Let the unpickled scene list report its changes again.
+        self.srtScenes = self._srtScenes
+
+    def _notify_order_observer(self):
+        """Call the order observer, if any."""
+        if self._orderObserver is not None:
+            self._orderObserver()
@@ -0,0 +1,108 @@
+"""Provide a list class for sorted element IDs.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from typing import Callable, Iterable
+
+
+class IdList(list):
+    """List of element IDs with a set index for membership tests.
+
+    The list keeps the order of the IDs, while the "in" operator
+    is answered by the index set instead of a linear scan.
+    All list methods adding, removing, or reordering IDs keep the index in sync,
+    and call the onChange function, if any.
+    """
+
+    def __init__(self, elemIds: Iterable[str]=(), onChange: Callable=None):
+        """Initialize the list and its index.
+
+        Optional arguments:
+            elemIds -- iterable of element IDs in their sort order.
+            onChange -- function without arguments, called after each change of the list.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(elemIds)
+        self._index: set[str] = set(self)
+        self._onChange = onChange
+
+    def __contains__(self, elemId) -> bool:
+        return elemId in self._index
+
+    def __reduce__(self):
+        # Pickle the IDs as a plain list, so the index is rebuilt on loading.
+        # The onChange function is not pickled; the owner must set it again.
+        return (self.__class__, (list(self),))
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._index = set(self)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._index = set(self)
+        self._changed()
+
+    def __iadd__(self, elemIds):
+        self.extend(elemIds)
+        return self
+
+    def __imul__(self, n):
+        super().__imul__(n)
+        self._index = set(self)
+        self._changed()
+        return self
+
+    def append(self, elemId: str):
+        super().append(elemId)
+        self._index.add(elemId)
+        self._changed()
+
+    def extend(self, elemIds: Iterable[str]):
+        start = len(self)
+        super().extend(elemIds)
+        self._index.update(self[start:])
+        self._changed()
+
+    def insert(self, i: int, elemId: str):
+        super().insert(i, elemId)
+        self._index.add(elemId)
+        self._changed()
+
+    def remove(self, elemId: str):
+        super().remove(elemId)
+        self._discard(elemId)
+        self._changed()
+
+    def pop(self, i: int=-1) -> str:
+        elemId = super().pop(i)
+        self._discard(elemId)
+        self._changed()
+        return elemId
+
+    def clear(self):
+        super().clear()
+        self._index.clear()
+        self._changed()
+
+    def reverse(self):
+        super().reverse()
+        self._changed()
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def _changed(self):
+        """Call the onChange function, if any."""
+        if self._onChange is not None:
+            self._onChange()
+
+    def _discard(self, elemId: str):
+        """Remove elemId from the index, unless it is still listed."""
+        if not list.__contains__(self, elemId):
+            self._index.discard(elemId)
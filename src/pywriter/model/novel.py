@@ -11,8 +11,11 @@ from pywriter.pywriter_globals import *
 from pywriter.model.basic_element import BasicElement
 from pywriter.model.chapter import Chapter
 from pywriter.model.scene import Scene
+from pywriter.model.scene_relations import SceneDict
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
+from pywriter.model.id_list import IdList
+from pywriter.model.novel_order import ChapterDict, NovelOrder
 
 LANGUAGE_TAG: Pattern = re.compile('\[lang=(.*?)\]')
 
@@ -27,6 +30,15 @@ class Novel(BasicElement):
     Public methods:
         get_languages() -- Determine the languages used in the document.
         check_locale() -- Check the document's locale (language code and country code).
+        set_clean() -- Start tracking the changes, with all elements marked as unchanged.
+        set_dirty(kind, elemId) -- Mark an element as changed.
+        is_dirty(kind, elemId) -- Return True, if an element may have changed since set_clean().
+        get_character_scenes(crId) -- Return the IDs of the scenes related to a character.
+        get_location_scenes(lcId) -- Return the IDs of the scenes related to a location.
+        get_item_scenes(itId) -- Return the IDs of the scenes related to an item.
+        get_chapter_position(chId) -- Return the position of a chapter in srtChapters.
+        get_scene_position(scId) -- Return the chapter ID and the positions of a scene.
+        get_scene_positions() -- Return the positions of all scenes assigned to a chapter.
 
     Public instance variables:
         authorName: str -- author's name.
@@ -35,17 +47,25 @@ class Novel(BasicElement):
         fieldTitle2: str -- scene rating field title 2.
         fieldTitle3: str -- scene rating field title 3.
         fieldTitle4: str -- scene rating field title 4.
-        chapters: dict -- (key: ID; value: chapter instance).
-        scenes: dict -- (key: ID, value: scene instance).
-        srtChapters: list -- the novel's sorted chapter IDs.
+        chapters: ChapterDict -- (key: ID; value: chapter instance) (property with getter and setter).
+        scenes: SceneDict -- (key: ID, value: scene instance) (property with getter and setter).
+        srtChapters: IdList -- the novel's sorted chapter IDs (property with getter and setter).
         locations: dict -- (key: ID, value: WorldElement instance).
-        srtLocations: list -- the novel's sorted location IDs.
+        srtLocations: IdList -- the novel's sorted location IDs (property with getter and setter).
         items: dict -- (key: ID, value: WorldElement instance).
-        srtItems: list -- the novel's sorted item IDs.
+        srtItems: IdList -- the novel's sorted item IDs (property with getter and setter).
         characters: dict -- (key: ID, value: character instance).
-        srtCharacters: list -- the novel's sorted character IDs.
+        srtCharacters: IdList -- the novel's sorted character IDs (property with getter and setter).
         projectNotes: dict --  (key: ID, value: projectNote instance).
         srtPrjNotes: list -- the novel's sorted project notes.
+        crIdsByTitle: dict -- (key: title, value: character ID).
+        lcIdsByTitle: dict -- (key: title, value: location ID).
+        itIdsByTitle: dict -- (key: title, value: item ID).
+        dirtyElements: dict -- (key: element kind, value: set of the changed element IDs); None, if not tracking.
+
+    Element kinds for the change tracking:
+        'project' (without IDs), 'chapters', 'scenes', 'characters', 'locations', 'items', 'projectNotes'.
+    Added, deleted, and reordered elements need no marks, because they are detected by their IDs.
     """
 
     def __init__(self):
@@ -82,22 +102,27 @@ class Novel(BasicElement):
         self.wordTarget: int = None
         # xml: <PROJECT><wordCountStart>
 
-        self.chapters: dict[str, Chapter] = {}
+        self._order = NovelOrder()
+        # Position index of the chapters and scenes.
+        # Invalidated by the chapters, srtChapters, and the chapters' srtScenes on changes.
+
+        self.chapters: ChapterDict = {}
         # xml: <CHAPTERS><CHAPTER><ID>
         # key = chapter ID, value = Chapter instance.
         # The order of the elements does not matter (the novel's order of the chapters is defined by srtChapters)
 
-        self.scenes: dict[str, Scene] = {}
+        self.scenes: SceneDict = {}
         # xml: <SCENES><SCENE><ID>
         # key = scene ID, value = Scene instance.
         # The order of the elements does not matter (the novel's order of the scenes is defined by
         # the order of the chapters and the order of the scenes within the chapters)
+        # The SceneDict keeps reverse indexes of the scene relations.
 
         self.languages: list[str] = None
         # List of non-document languages occurring as scene markup.
         # Format: ll-CC, where ll is the language code, and CC is the country code.
 
-        self.srtChapters: list[str] = []
+        self.srtChapters: IdList = []
         # The novel's chapter IDs. The order of its elements corresponds to the novel's order of the chapters.
 
         self.locations: dict[str, WorldElement] = {}
@@ -106,25 +131,28 @@ class Novel(BasicElement):
         # key = location ID, value = WorldElement instance.
         # The order of the elements does not matter.
 
-        self.srtLocations: list[str] = []
+        self._srtLocations: IdList = IdList()
         # The novel's location IDs. The order of its elements
         # corresponds to the XML project file.
+        # The IdList's index set allows fast membership tests.
 
         self.items: dict[str, WorldElement] = {}
         # xml: <ITEMS>
         # key = item ID, value = WorldElement instance.
         # The order of the elements does not matter.
 
-        self.srtItems: list[str] = []
+        self._srtItems: IdList = IdList()
         # The novel's item IDs. The order of its elements corresponds to the XML project file.
+        # The IdList's index set allows fast membership tests.
 
         self.characters: dict[str, Character] = {}
         # xml: <CHARACTERS>
         # key = character ID, value = Character instance.
         # The order of the elements does not matter.
 
-        self.srtCharacters: list[str] = []
+        self._srtCharacters: IdList = IdList()
         # The novel's character IDs. The order of its elements corresponds to the XML project file.
+        # The IdList's index set allows fast membership tests.
 
         self.projectNotes: dict[str, BasicElement] = {}
         # xml: <PROJECTNOTES>
@@ -134,12 +162,87 @@ class Novel(BasicElement):
         self.srtPrjNotes: list[str] = []
         # The novel's projectNote IDs. The order of its elements corresponds to the XML project file.
 
+        self.crIdsByTitle: dict[str, str] = {}
+        # key = character title, value = character ID.
+        # Name index for resolving references by title.
+        # To be updated by the file readers when registering a character.
+
+        self.lcIdsByTitle: dict[str, str] = {}
+        # key = location title, value = location ID.
+        # Name index for resolving references by title.
+        # To be updated by the file readers when registering a location.
+
+        self.itIdsByTitle: dict[str, str] = {}
+        # key = item title, value = item ID.
+        # Name index for resolving references by title.
+        # To be updated by the file readers when registering an item.
+
         self.languageCode: str = None
         # Language code acc. to ISO 639-1.
 
         self.countryCode: str = None
         # Country code acc. to ISO 3166-2.
 
+        self.dirtyElements: dict[str, set] = None
+        # key = element kind, value = set of the IDs of the elements marked as changed.
+        # None means that the changes are not tracked, so every element is considered changed.
+
+    @property
+    def chapters(self) -> ChapterDict:
+        return self._chapters
+
+    @chapters.setter
+    def chapters(self, chapters: dict):
+        """Set the chapters, observing them for the position index."""
+        self._chapters = ChapterDict(chapters, self._order.invalidate)
+        self._order.invalidate()
+
+    @property
+    def srtChapters(self) -> IdList:
+        return self._srtChapters
+
+    @srtChapters.setter
+    def srtChapters(self, chIds: list):
+        """Set the sorted chapter IDs, observing them for the position index."""
+        self._srtChapters = IdList(chIds, self._order.invalidate)
+        self._order.invalidate()
+
+    @property
+    def scenes(self) -> SceneDict:
+        return self._scenes
+
+    @scenes.setter
+    def scenes(self, scenes: dict):
+        """Set the scenes, indexing their relations to characters, locations, and items."""
+        self._scenes = SceneDict(scenes)
+
+    @property
+    def srtLocations(self) -> IdList:
+        return self._srtLocations
+
+    @srtLocations.setter
+    def srtLocations(self, lcIds: list):
+        """Set the sorted location IDs, indexing them for membership tests."""
+        self._srtLocations = IdList(lcIds)
+
+    @property
+    def srtItems(self) -> IdList:
+        return self._srtItems
+
+    @srtItems.setter
+    def srtItems(self, itIds: list):
+        """Set the sorted item IDs, indexing them for membership tests."""
+        self._srtItems = IdList(itIds)
+
+    @property
+    def srtCharacters(self) -> IdList:
+        return self._srtCharacters
+
+    @srtCharacters.setter
+    def srtCharacters(self, crIds: list):
+        """Set the sorted character IDs, indexing them for membership tests."""
+        self._srtCharacters = IdList(crIds)
+
     def get_languages(self):
         """Determine the languages used in the document.
         
@@ -201,3 +304,108 @@ class Novel(BasicElement):
         self.languageCode = 'zxx'
         self.countryCode = 'none'
 
+    def set_clean(self):
+        """Start tracking the changes, with all elements marked as unchanged.
+        
+        From now on, every change must be marked with set_dirty(),
+        otherwise it may be lost when writing a file.
+        """
+        self.dirtyElements = {}
+
+    def set_dirty(self, kind: str, elemId: str = None):
+        """Mark an element as changed.
+        
+        Positional arguments:
+            kind: str -- element kind, e.g. 'scenes'.
+            
+        Optional arguments:
+            elemId: str -- ID of the changed element; None for the project.
+            
+        If the changes are not tracked, do nothing.
+        """
+        if self.dirtyElements is not None:
+            self.dirtyElements.setdefault(kind, set()).add(elemId)
+
+    def is_dirty(self, kind: str, elemId: str = None) -> bool:
+        """Return True, if an element may have changed since set_clean().
+        
+        Positional arguments:
+            kind: str -- element kind, e.g. 'scenes'.
+            
+        Optional arguments:
+            elemId: str -- ID of the element; if None, check all elements of the kind.
+            
+        If the changes are not tracked, return True.
+        """
+        if self.dirtyElements is None:
+            return True
+
+        dirtyIds = self.dirtyElements.get(kind, None)
+        if not dirtyIds:
+            return False
+
+        return elemId is None or elemId in dirtyIds
+
+    def get_character_scenes(self, crId: str) -> list:
+        """Return a list with the IDs of the scenes related to a character.
+        
+        Positional arguments:
+            crId: str -- character ID.
+            
+        The lookup takes the reverse index, so its cost depends on the number of scenes found.
+        """
+        return self._scenes.relations.get_scenes('characters', crId)
+
+    def get_location_scenes(self, lcId: str) -> list:
+        """Return a list with the IDs of the scenes related to a location.
+        
+        Positional arguments:
+            lcId: str -- location ID.
+        """
+        return self._scenes.relations.get_scenes('locations', lcId)
+
+    def get_item_scenes(self, itId: str) -> list:
+        """Return a list with the IDs of the scenes related to an item.
+        
+        Positional arguments:
+            itId: str -- item ID.
+        """
+        return self._scenes.relations.get_scenes('items', itId)
+
+    def get_chapter_position(self, chId: str) -> int:
+        """Return the position of a chapter in srtChapters, or None if not listed.
+        
+        Positional arguments:
+            chId: str -- chapter ID.
+        """
+        self._order.update(self._srtChapters, self._chapters)
+        return self._order.chapterPositions.get(chId, None)
+
+    def get_scene_position(self, scId: str) -> tuple:
+        """Return the chapter ID and the positions of a scene.
+        
+        Positional arguments:
+            scId: str -- scene ID.
+            
+        Return a (chapter ID, position in the chapter, position in the novel) tuple,
+        or None if the scene is not assigned to a chapter listed in srtChapters.
+        The lookup takes the position index, which is rebuilt after changes.
+        """
+        self._order.update(self._srtChapters, self._chapters)
+        return self._order.scenePositions.get(scId, None)
+
+    def get_scene_positions(self) -> dict:
+        """Return the positions of all scenes assigned to a chapter listed in srtChapters.
+        
+        Return a dict (key: scene ID; value: tuple as returned by get_scene_position()) 
+        in the novel's order. The dict must not be changed.
+        """
+        self._order.update(self._srtChapters, self._chapters)
+        return self._order.scenePositions
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Let the unpickled chapters and chapter list report their changes again.
+        self.chapters = self._chapters
+        self.srtChapters = self._srtChapters
+
@@ -0,0 +1,74 @@
+"""Provide classes for the changes between two novel representations.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class ElementChanges:
+    """Changes of one kind of elements, e.g. the scenes.
+
+    Public instance variables:
+        added: list of str -- IDs of the new elements, in the new order.
+        removed: list of str -- IDs of the deleted elements, in the old order.
+        modified: list of str -- IDs of the elements with changed content, in the new order.
+        changedFields: dict -- (key: ID of a modified element; value: list of changed field names).
+        moved: list of str -- IDs of the elements changing their parent (scenes changing the chapter).
+        isReordered: bool -- True, if the order of the elements present in both novels changed.
+
+    changedFields lacks the IDs of elements compared by fingerprints only.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.added: list[str] = []
+        self.removed: list[str] = []
+        self.modified: list[str] = []
+        self.changedFields: dict[str, list[str]] = {}
+        self.moved: list[str] = []
+        self.isReordered: bool = False
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified or self.moved or self.isReordered)
+
+
+class NovelChanges:
+    """Structured change set between an old and a new novel.
+
+    Public instance variables:
+        project: list of str -- names of the changed project fields.
+        isProjectModified: bool -- True, if any project field changed.
+        chapters: ElementChanges -- changes of the chapters.
+        scenes: ElementChanges -- changes of the scenes.
+        characters: ElementChanges -- changes of the characters.
+        locations: ElementChanges -- changes of the locations.
+        items: ElementChanges -- changes of the items.
+        projectNotes: ElementChanges -- changes of the project notes.
+        fingerprints: dict -- content fingerprints of the new novel (see NovelDiff.get_fingerprints).
+
+    An instance is "true", if there is any change.
+    """
+    ELEMENT_KINDS = ('chapters', 'scenes', 'characters', 'locations', 'items', 'projectNotes')
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.project: list[str] = []
+        self.isProjectModified: bool = False
+        self.chapters = ElementChanges()
+        self.scenes = ElementChanges()
+        self.characters = ElementChanges()
+        self.locations = ElementChanges()
+        self.items = ElementChanges()
+        self.projectNotes = ElementChanges()
+        self.fingerprints: dict = None
+
+    def __bool__(self) -> bool:
+        if self.isProjectModified:
+            return True
+
+        for kind in self.ELEMENT_KINDS:
+            if getattr(self, kind):
+                return True
+
+        return False
@@ -0,0 +1,231 @@
+"""Provide a class for comparing two novel representations.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from hashlib import blake2b
+from pywriter.pywriter_globals import *
+from pywriter.model.novel_changes import NovelChanges
+
+
+class NovelDiff:
+    """Diff engine for Novel instances.
+
+    Public methods:
+        compare(oldNovel, newNovel) -- return the changes as a NovelChanges instance.
+        compare_fingerprints(oldFingerprints, newNovel) -- return the changes since the fingerprints were taken.
+        get_fingerprints(novel) -- return the content fingerprints of the project and all elements.
+
+    Public class constants:
+        PROJECT_FIELDS, CHAPTER_FIELDS, SCENE_FIELDS, CHARACTER_FIELDS, WORLD_ELEMENT_FIELDS, NOTE_FIELDS --
+        tuples of the compared instance variables.
+
+    Elements are matched by ID. Each element is hashed once, and only elements
+    with different fingerprints are compared field by field, so a comparison
+    takes linear time. Derived values such as word counts are not compared,
+    and empty values (None, empty strings, lists, and dicts) are considered equal.
+    The fingerprints are strings, so they can be stored e.g. in a JSON file.
+    """
+    _BASIC_FIELDS = ('title', 'desc', 'kwVar')
+    PROJECT_FIELDS = _BASIC_FIELDS + (
+        'authorName',
+        'authorBio',
+        'fieldTitle1',
+        'fieldTitle2',
+        'fieldTitle3',
+        'fieldTitle4',
+        'wordTarget',
+        'wordCountStart',
+        'languageCode',
+        'countryCode',
+        )
+    CHAPTER_FIELDS = _BASIC_FIELDS + (
+        'chLevel',
+        'chType',
+        'suppressChapterTitle',
+        'isTrash',
+        'suppressChapterBreak',
+        'srtScenes',
+        )
+    SCENE_FIELDS = _BASIC_FIELDS + (
+        'sceneContent',
+        'scType',
+        'doNotExport',
+        'status',
+        'notes',
+        'tags',
+        'field1',
+        'field2',
+        'field3',
+        'field4',
+        'appendToPrev',
+        'isReactionScene',
+        'isSubPlot',
+        'goal',
+        'conflict',
+        'outcome',
+        'characters',
+        'locations',
+        'items',
+        'date',
+        'time',
+        'day',
+        'lastsMinutes',
+        'lastsHours',
+        'lastsDays',
+        'image',
+        'scnArcs',
+        'scnStyle',
+        )
+    WORLD_ELEMENT_FIELDS = _BASIC_FIELDS + ('image', 'tags', 'aka')
+    CHARACTER_FIELDS = WORLD_ELEMENT_FIELDS + ('notes', 'bio', 'goals', 'fullName', 'isMajor')
+    NOTE_FIELDS = _BASIC_FIELDS
+
+    def compare(self, oldNovel, newNovel):
+        """Return the changes from oldNovel to newNovel.
+
+        Positional arguments:
+            oldNovel -- Novel instance: the reference.
+            newNovel -- Novel instance: the changed novel.
+
+        Return a NovelChanges instance, including the names of the changed fields.
+        """
+        changes = self.compare_fingerprints(self.get_fingerprints(oldNovel), newNovel)
+        if changes.isProjectModified:
+            changes.project = self._get_changed_fields(oldNovel, newNovel, self.PROJECT_FIELDS)
+        for kind, fields in self._get_element_fields():
+            elementChanges = getattr(changes, kind)
+            oldElements = getattr(oldNovel, kind)
+            newElements = getattr(newNovel, kind)
+            for elemId in elementChanges.modified:
+                elementChanges.changedFields[elemId] = self._get_changed_fields(
+                    oldElements[elemId], newElements[elemId], fields)
+        return changes
+
+    def compare_fingerprints(self, oldFingerprints, newNovel):
+        """Return the changes since oldFingerprints were taken.
+
+        Positional arguments:
+            oldFingerprints -- dict: the result of get_fingerprints() for the reference.
+            newNovel -- Novel instance: the changed novel.
+
+        Return a NovelChanges instance without the names of the changed fields.
+        """
+        newFingerprints = self.get_fingerprints(newNovel)
+        changes = NovelChanges()
+        changes.fingerprints = newFingerprints
+        changes.isProjectModified = oldFingerprints['project'] != newFingerprints['project']
+        for kind in NovelChanges.ELEMENT_KINDS:
+            elementChanges = getattr(changes, kind)
+            oldElements = oldFingerprints[kind]
+            newElements = newFingerprints[kind]
+            commonOldIds = []
+            for elemId in oldElements:
+                if elemId in newElements:
+                    commonOldIds.append(elemId)
+                else:
+                    elementChanges.removed.append(elemId)
+            commonNewIds = []
+            for elemId, fingerprint in newElements.items():
+                oldFingerprint = oldElements.get(elemId, None)
+                if oldFingerprint is None:
+                    elementChanges.added.append(elemId)
+                else:
+                    commonNewIds.append(elemId)
+                    if oldFingerprint != fingerprint:
+                        elementChanges.modified.append(elemId)
+            elementChanges.isReordered = commonOldIds != commonNewIds
+
+        # Find the scenes changing the chapter.
+        oldParents = oldFingerprints['sceneChapters']
+        for scId, chId in newFingerprints['sceneChapters'].items():
+            if scId in oldParents and oldParents[scId] != chId:
+                changes.scenes.moved.append(scId)
+        return changes
+
+    def get_fingerprints(self, novel):
+        """Return the content fingerprints of the project and all elements.
+
+        Positional arguments:
+            novel -- Novel instance.
+
+        Return a dict with the keys:
+            'project' -- str: fingerprint of the project fields.
+            'chapters', 'scenes', 'characters', 'locations', 'items', 'projectNotes' --
+                dict (key: ID, value: str fingerprint) in the novel's order.
+            'sceneChapters' -- dict (key: scene ID, value: chapter ID).
+
+        Scenes not assigned to a chapter follow the assigned ones.
+        """
+        fingerprints = {}
+        fingerprints['project'] = self._get_fingerprint(novel, self.PROJECT_FIELDS)
+        sceneChapters = {scId: position[0] for scId, position in novel.get_scene_positions().items()}
+        fingerprints['sceneChapters'] = sceneChapters
+        sortOrders = dict(
+            chapters=novel.srtChapters,
+            scenes=list(sceneChapters),
+            characters=novel.srtCharacters,
+            locations=novel.srtLocations,
+            items=novel.srtItems,
+            projectNotes=novel.srtPrjNotes,
+            )
+        for kind, fields in self._get_element_fields():
+            elements = getattr(novel, kind)
+            kindFingerprints = {}
+            for elemId in sortOrders[kind]:
+                if elemId in elements:
+                    kindFingerprints[elemId] = self._get_fingerprint(elements[elemId], fields)
+            for elemId in elements:
+                # Add the unsorted elements, if any.
+                if not elemId in kindFingerprints:
+                    kindFingerprints[elemId] = self._get_fingerprint(elements[elemId], fields)
+            fingerprints[kind] = kindFingerprints
+        return fingerprints
+
+    def _get_element_fields(self):
+        """Return a list of (element kind, compared fields) tuples."""
+        return [
+            ('chapters', self.CHAPTER_FIELDS),
+            ('scenes', self.SCENE_FIELDS),
+            ('characters', self.CHARACTER_FIELDS),
+            ('locations', self.WORLD_ELEMENT_FIELDS),
+            ('items', self.WORLD_ELEMENT_FIELDS),
+            ('projectNotes', self.NOTE_FIELDS),
+            ]
+
+    def _get_changed_fields(self, oldElement, newElement, fields):
+        """Return a list with the names of the fields differing between the elements."""
+        changedFields = []
+        for field in fields:
+            if self._normalize(getattr(oldElement, field, None)) != self._normalize(getattr(newElement, field, None)):
+                changedFields.append(field)
+        return changedFields
+
+    def _get_fingerprint(self, element, fields):
+        """Return a hash over the element's field values."""
+        fingerprint = blake2b(digest_size=16)
+        for field in fields:
+            value = self._normalize(getattr(element, field, None))
+            if isinstance(value, str):
+                # Hash texts such as the scene content without copying them by repr().
+                data = value.encode('utf-8', 'surrogatepass')
+                prefix = b's'
+            else:
+                if isinstance(value, dict):
+                    value = sorted(value.items())
+                data = repr(value).encode('utf-8', 'surrogatepass')
+                prefix = b'r'
+            fingerprint.update(b'%s%d:' % (prefix, len(data)))
+            fingerprint.update(data)
+        return fingerprint.hexdigest()
+
+    def _normalize(self, value):
+        """Return None for empty strings, lists, and dicts; otherwise return value."""
+        if value is None:
+            return None
+
+        if isinstance(value, (str, list, dict)) and not value:
+            return None
+
+        return value
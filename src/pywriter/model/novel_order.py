@@ -0,0 +1,127 @@
+"""Provide classes for the position index of the chapters and scenes.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class NovelOrder:
+    """Position index of the novel's chapters and scenes, rebuilt lazily.
+
+    Public methods:
+        invalidate() -- mark the index as out of date.
+        update(srtChapters, chapters) -- rebuild the index, if out of date.
+
+    Public instance variables:
+        chapterPositions: dict -- (key: chapter ID; value: position in srtChapters).
+        scenePositions: dict -- (key: scene ID; value: (chapter ID, position in the chapter, position in the novel) tuple).
+
+    The novel invalidates the index whenever its chapter list, a chapter,
+    or a chapter's scene list changes. The next lookup rebuilds the index
+    with one pass over the chapters, so a series of changes costs one rebuild.
+    The scenes are in the novel's order. A scene listed in more than one chapter
+    gets the position of its first occurrence.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.chapterPositions: dict[str, int] = {}
+        self.scenePositions: dict[str, tuple] = {}
+        self._isValid = False
+
+    def invalidate(self):
+        """Mark the index as out of date."""
+        self._isValid = False
+
+    def update(self, srtChapters, chapters):
+        """Rebuild the index, if out of date.
+
+        Positional arguments:
+            srtChapters -- list of the novel's sorted chapter IDs.
+            chapters -- dict: (key: chapter ID; value: Chapter instance).
+        """
+        if self._isValid:
+            return
+
+        chapterPositions = {}
+        scenePositions = {}
+        globalIndex = 0
+        for chapterPosition, chId in enumerate(srtChapters):
+            chapterPositions.setdefault(chId, chapterPosition)
+            for scenePosition, scId in enumerate(chapters[chId].srtScenes):
+                if not scId in scenePositions:
+                    scenePositions[scId] = (chId, scenePosition, globalIndex)
+                globalIndex += 1
+        self.chapterPositions = chapterPositions
+        self.scenePositions = scenePositions
+        self._isValid = True
+
+
+class ChapterDict(dict):
+    """Dictionary of chapters invalidating the novel's position index on changes.
+
+    A chapter added to the dictionary reports the changes of its scene list.
+    """
+
+    def __init__(self, chapters=(), onChange=None):
+        """Initialize the dictionary.
+
+        Optional arguments:
+            chapters -- dict or iterable of (chapter ID, Chapter instance) tuples.
+            onChange -- function without arguments, called after each change.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self._onChange = onChange
+        self.update(chapters)
+
+    def __reduce__(self):
+        # Pickle the chapters as a plain dict; the owner must set the onChange function again.
+        return (self.__class__, (dict(self),))
+
+    def __setitem__(self, chId, chapter):
+        if chId in self:
+            self[chId].set_order_observer(None)
+        super().__setitem__(chId, chapter)
+        chapter.set_order_observer(self._onChange)
+        self._changed()
+
+    def __delitem__(self, chId):
+        self[chId].set_order_observer(None)
+        super().__delitem__(chId)
+        self._changed()
+
+    def pop(self, chId, *default):
+        if chId in self:
+            self[chId].set_order_observer(None)
+        chapter = super().pop(chId, *default)
+        self._changed()
+        return chapter
+
+    def popitem(self):
+        chId, chapter = super().popitem()
+        chapter.set_order_observer(None)
+        self._changed()
+        return chId, chapter
+
+    def setdefault(self, chId, chapter=None):
+        if not chId in self:
+            self[chId] = chapter
+        return self[chId]
+
+    def update(self, *args, **kwargs):
+        for chId, chapter in dict(*args, **kwargs).items():
+            self[chId] = chapter
+
+    def clear(self):
+        for chapter in self.values():
+            chapter.set_order_observer(None)
+        super().clear()
+        self._changed()
+
+    def _changed(self):
+        """Call the onChange function, if any."""
+        if self._onChange is not None:
+            self._onChange()
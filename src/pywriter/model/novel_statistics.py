@@ -0,0 +1,92 @@
+"""Provide a class for word, letter, and paragraph statistics of a novel.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from pywriter.model.scene import count_text
+
+
+class NovelStatistics:
+    """Word, letter, and paragraph counts of a novel.
+
+    Public methods:
+        count(novel) -- count the scenes of a novel and aggregate the results.
+
+    Public instance variables:
+        scenes: dict -- (key: scene ID; value: (words, letters, paragraphs) tuple).
+        chapters: dict -- (key: chapter ID; value: counts tuple).
+        statuses: dict -- (key: scene status; value: counts tuple).
+        viewpoints: dict -- (key: ID of the scene's first character, or None; value: counts tuple).
+        total: tuple -- counts of the whole novel.
+
+    All scenes assigned to a chapter are counted. Like in yWriter, only
+    normal scenes in normal chapters contribute to the aggregated counts.
+    The scene texts are counted like in LibreOffice, see the Scene class.
+    If NumPy is installed, it is used for aggregating the counts.
+    """
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self.scenes: dict[str, tuple] = {}
+        self.chapters: dict[str, tuple] = {}
+        self.statuses: dict[int, tuple] = {}
+        self.viewpoints: dict[str, tuple] = {}
+        self.total: tuple = (0, 0, 0)
+
+    def count(self, novel):
+        """Count the scenes of a novel and aggregate the results.
+
+        Positional arguments:
+            novel -- Novel instance.
+        """
+        self.scenes = {}
+        keys = []
+        counts = []
+        for chId in novel.srtChapters:
+            chapter = novel.chapters[chId]
+            for scId in chapter.srtScenes:
+                scene = novel.scenes[scId]
+                self.scenes[scId] = count_text(scene.sceneContent or '')
+                if chapter.chType == 0 and scene.scType == 0:
+                    if scene.characters:
+                        viewpoint = scene.characters[0]
+                    else:
+                        viewpoint = None
+                    keys.append((chId, scene.status, viewpoint))
+                    counts.append(self.scenes[scId])
+        try:
+            import numpy
+        except ImportError:
+            self._aggregate(keys, counts)
+        else:
+            self._aggregate_numpy(keys, counts, numpy)
+
+    def _aggregate(self, keys, counts):
+        """Sum up the counts per chapter, status, and viewpoint."""
+        groups = (self.chapters, self.statuses, self.viewpoints) = ({}, {}, {})
+        total = [0, 0, 0]
+        for key, sceneCounts in zip(keys, counts):
+            for group, groupKey in zip(groups, key):
+                groupCounts = group.setdefault(groupKey, [0, 0, 0])
+                for i in range(3):
+                    groupCounts[i] += sceneCounts[i]
+            for i in range(3):
+                total[i] += sceneCounts[i]
+        for group in groups:
+            for groupKey in group:
+                group[groupKey] = tuple(group[groupKey])
+        self.total = tuple(total)
+
+    def _aggregate_numpy(self, keys, counts, numpy):
+        """Sum up the counts per chapter, status, and viewpoint, using NumPy."""
+        countArray = numpy.array(counts, dtype=numpy.int64).reshape(-1, 3)
+        groups = []
+        for i in range(3):
+            groupKeys = {}
+            indices = [groupKeys.setdefault(key[i], len(groupKeys)) for key in keys]
+            sums = numpy.zeros((len(groupKeys), 3), dtype=numpy.int64)
+            numpy.add.at(sums, numpy.array(indices, dtype=numpy.intp), countArray)
+            groups.append({groupKey: tuple(int(n) for n in sums[j]) for groupKey, j in groupKeys.items()})
+        self.chapters, self.statuses, self.viewpoints = groups
+        self.total = tuple(int(n) for n in countArray.sum(axis=0))
@@ -23,10 +23,54 @@ NON_LETTERS: Pattern = re.compile('\[.+?\]|\/\*.+?\*\/|\n|\r')
 # this is to be replaced by empty strings, thus excluding markup, comments, and linefeeds
 # from letter counting
 
+MARKUP: Pattern = re.compile(r'\[.+?\]|\/\*.+?\*\/')
+# this is the markup and comments part of the expressions above
+
+PARAGRAPH_START: Pattern = re.compile(r'^[^\S\n]*\S', re.MULTILINE)
+# this matches the first non-blank character of a line
+
+
+def get_word_text(text: str) -> str:
+    """Return text prepared for splitting into words.
+    
+    Dashes and dash replacements become word limits, markup and comments are removed, 
+    and hyphens join words. This gives the same result as substituting 
+    ADDITIONAL_WORD_LIMITS and NO_WORD_LIMITS, but is faster with long texts.
+    """
+    text = text.replace('--', ' ').replace('—', ' ').replace('–', ' ')
+    if text.startswith('>'):
+        text = text[1:]
+    text = text.replace('\n>', '\n')
+    return MARKUP.sub('', text).replace('-', '')
+
+
+def count_words(text: str) -> int:
+    """Return the number of words in text, counted like in LibreOffice."""
+    return len(get_word_text(text).split())
+
+
+def count_letters(text: str) -> int:
+    """Return the number of letters in text, without markup, comments, and linefeeds."""
+    text = MARKUP.sub('', text)
+    return len(text) - text.count('\n') - text.count('\r')
+
+
+def count_text(text: str) -> tuple:
+    """Return a (words, letters, paragraphs) tuple for text.
+    
+    Paragraphs are the lines containing at least one word.
+    """
+    wordText = get_word_text(text)
+    paragraphs = len(PARAGRAPH_START.findall(wordText))
+    return len(wordText.split()), count_letters(text), paragraphs
+
 
 class Scene(BasicElement):
     """yWriter scene representation.
     
+    Public methods:
+        set_relations_observer(observer) -- set a function to be called when the scene relations are assigned.
+
     Public instance variables:
         sceneContent: str -- scene content (property with getter and setter).
         wordCount: int -- word count (derived; updated by the sceneContent setter).
@@ -46,9 +90,9 @@ class Scene(BasicElement):
         goal: str -- the main actor's scene goal. 
         conflict: str -- what hinders the main actor to achieve his goal.
         outcome: str -- what comes out at the end of the scene.
-        characters -- list of character IDs related to this scene.
-        locations -- list of location IDs related to this scene. 
-        items -- list of item IDs related to this scene.
+        characters -- list of character IDs related to this scene (property with getter and setter).
+        locations -- list of location IDs related to this scene (property with getter and setter). 
+        items -- list of item IDs related to this scene (property with getter and setter).
         date: str -- specific start date in ISO format (yyyy-mm-dd).
         time: str -- specific start time in ISO format (hh:mm).
         minute: str -- unspecific start time: minutes.
@@ -76,6 +120,10 @@ class Scene(BasicElement):
         """
         super().__init__()
 
+        self._relationsObserver = None
+        # Function to be called when characters, locations, or items are assigned.
+        # Set by the SceneDict holding the scene; not pickled.
+
         self._sceneContent: str = None
         # xml: <SceneContent>
         # Scene text with yW7 raw markup.
@@ -162,13 +210,13 @@ class Scene(BasicElement):
         self.outcome: str = None
         # xml: <Outcome>
 
-        self.characters: list[str] = None
+        self._characters: list[str] = None
         # xml: <Characters><CharID>
 
-        self.locations: list[str] = None
+        self._locations: list[str] = None
         # xml: <Locations><LocID>
 
-        self.items: list[str] = None
+        self._items: list[str] = None
         # xml: <Items><ItemID>
 
         self.date: str = None
@@ -217,9 +265,51 @@ class Scene(BasicElement):
     def sceneContent(self, text: str):
         """Set sceneContent updating word count and letter count."""
         self._sceneContent = text
-        text = ADDITIONAL_WORD_LIMITS.sub(' ', text)
-        text = NO_WORD_LIMITS.sub('', text)
-        wordList = text.split()
-        self.wordCount = len(wordList)
-        text = NON_LETTERS.sub('', self._sceneContent)
-        self.letterCount = len(text)
+        self.wordCount = count_words(text)
+        self.letterCount = count_letters(text)
+
+    @property
+    def characters(self) -> list:
+        return self._characters
+
+    @characters.setter
+    def characters(self, crIds: list):
+        """Set the related character IDs, updating the novel's reverse index."""
+        self._characters = crIds
+        if self._relationsObserver is not None:
+            self._relationsObserver('characters')
+
+    @property
+    def locations(self) -> list:
+        return self._locations
+
+    @locations.setter
+    def locations(self, lcIds: list):
+        """Set the related location IDs, updating the novel's reverse index."""
+        self._locations = lcIds
+        if self._relationsObserver is not None:
+            self._relationsObserver('locations')
+
+    @property
+    def items(self) -> list:
+        return self._items
+
+    @items.setter
+    def items(self, itIds: list):
+        """Set the related item IDs, updating the novel's reverse index."""
+        self._items = itIds
+        if self._relationsObserver is not None:
+            self._relationsObserver('items')
+
+    def set_relations_observer(self, observer):
+        """Set a function to be called when the scene relations are assigned.
+        
+        Positional arguments:
+            observer -- callable with the kind of the relations assigned as argument, or None.
+        """
+        self._relationsObserver = observer
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_relationsObserver'] = None
+        return state
@@ -0,0 +1,157 @@
+"""Provide classes for the reverse indexes of the scene relations.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from functools import partial
+
+
+class SceneRelations:
+    """Reverse indexes of the scenes' relations to characters, locations, and items.
+
+    Public methods:
+        update(scId, scene, kind) -- index the current relations of a scene.
+        remove(scId) -- remove a scene from the indexes.
+        get_scenes(kind, elemId) -- return the IDs of the scenes related to an element.
+
+    Public class constants:
+        KINDS -- tuple of the related element kinds, named like the Scene instance variables.
+
+    The scene IDs are kept in the order the relations were indexed.
+    For a novel read from a file, this is the order of the scenes in the file.
+    """
+    KINDS = ('characters', 'locations', 'items')
+
+    def __init__(self):
+        """Initialize instance variables."""
+        self._scenesByElement: dict[str, dict[str, dict[str, None]]] = {kind: {} for kind in self.KINDS}
+        # key = element kind, value = dict (key = element ID, value = ordered set of scene IDs).
+
+        self._indexedRelations: dict[str, dict[str, set]] = {}
+        # key = scene ID, value = dict (key = element kind, value = set of the indexed element IDs).
+
+    def update(self, scId, scene, kind=None):
+        """Index the current relations of a scene, replacing the previously indexed ones.
+
+        Positional arguments:
+            scId -- str: scene ID.
+            scene -- Scene instance.
+
+        Optional arguments:
+            kind -- str: the kind of relations to update; if None, update all.
+
+        Only the changed relations are updated, so the cost depends
+        on the number of the scene's relations, not on the novel's size.
+        """
+        indexedRelations = self._indexedRelations.setdefault(scId, {})
+        if kind is None:
+            kinds = self.KINDS
+        else:
+            kinds = (kind,)
+        for kind in kinds:
+            scenesByElement = self._scenesByElement[kind]
+            oldIds = indexedRelations.get(kind, set())
+            newIds = set(getattr(scene, kind) or ())
+            for elemId in oldIds - newIds:
+                scIds = scenesByElement[elemId]
+                del scIds[scId]
+                if not scIds:
+                    del scenesByElement[elemId]
+            for elemId in getattr(scene, kind) or ():
+                if not elemId in oldIds:
+                    scenesByElement.setdefault(elemId, {})[scId] = None
+            indexedRelations[kind] = newIds
+
+    def remove(self, scId):
+        """Remove a scene from the indexes.
+
+        Positional arguments:
+            scId -- str: scene ID.
+        """
+        indexedRelations = self._indexedRelations.pop(scId, {})
+        for kind, elemIds in indexedRelations.items():
+            scenesByElement = self._scenesByElement[kind]
+            for elemId in elemIds:
+                scIds = scenesByElement[elemId]
+                del scIds[scId]
+                if not scIds:
+                    del scenesByElement[elemId]
+
+    def get_scenes(self, kind, elemId):
+        """Return a list with the IDs of the scenes related to an element.
+
+        Positional arguments:
+            kind -- str: element kind ('characters', 'locations', or 'items').
+            elemId -- str: ID of the character, location, or item.
+        """
+        return list(self._scenesByElement[kind].get(elemId, ()))
+
+
+class SceneDict(dict):
+    """Dictionary of scenes keeping the reverse indexes of their relations in sync.
+
+    Public instance variables:
+        relations: SceneRelations -- reverse indexes of the scene relations.
+
+    A scene added to the dictionary reports the assignments to its
+    characters, locations, and items to the indexes.
+    Changing a relation list in place is not tracked; assign a new list instead.
+    """
+
+    def __init__(self, scenes=()):
+        """Initialize the dictionary and index the scenes' relations.
+
+        Optional arguments:
+            scenes -- dict or iterable of (scene ID, Scene instance) tuples.
+
+        Extends the superclass constructor.
+        """
+        super().__init__()
+        self.relations = SceneRelations()
+        self.update(scenes)
+
+    def __reduce__(self):
+        # Pickle the scenes as a plain dict, so the indexes are rebuilt on loading.
+        return (self.__class__, (dict(self),))
+
+    def __setitem__(self, scId, scene):
+        if scId in self:
+            self._detach(scId)
+        super().__setitem__(scId, scene)
+        scene.set_relations_observer(partial(self.relations.update, scId, scene))
+        self.relations.update(scId, scene)
+
+    def __delitem__(self, scId):
+        self._detach(scId)
+        super().__delitem__(scId)
+
+    def pop(self, scId, *default):
+        if scId in self:
+            self._detach(scId)
+        return super().pop(scId, *default)
+
+    def popitem(self):
+        scId, scene = super().popitem()
+        self.relations.remove(scId)
+        scene.set_relations_observer(None)
+        return scId, scene
+
+    def setdefault(self, scId, scene=None):
+        if not scId in self:
+            self[scId] = scene
+        return self[scId]
+
+    def update(self, *args, **kwargs):
+        for scId, scene in dict(*args, **kwargs).items():
+            self[scId] = scene
+
+    def clear(self):
+        for scId in list(self):
+            self._detach(scId)
+        super().clear()
+
+    def _detach(self, scId):
+        """Remove a scene from the indexes and stop observing it."""
+        self.relations.remove(scId)
+        self[scId].set_relations_observer(None)
@@ -6,14 +6,13 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import sys
-import gettext
-import locale
 
 __all__ = ['Error',
            '_',
            'LOCALE_PATH',
-           'CURRENT_LANGUAGE',
+           'get_current_language',
            'norm_path',
+           'intern_text',
            'string_to_list',
            'list_to_string',
            ]
@@ -24,20 +23,38 @@ class Error(Exception):
     pass
 
 
-#--- Initialize localization.
+#--- Initialize localization on demand.
 LOCALE_PATH = f'{os.path.dirname(sys.argv[0])}/locale/'
-try:
-    CURRENT_LANGUAGE = locale.getlocale()[0][:2]
-except:
-    # Fallback for old Windows versions.
-    CURRENT_LANGUAGE = locale.getdefaultlocale()[0][:2]
-try:
-    t = gettext.translation('pywriter', LOCALE_PATH, languages=[CURRENT_LANGUAGE])
-    _ = t.gettext
-except:
+_translation = None
 
-    def _(message):
-        return message
+
+def get_current_language():
+    """Return the two-letter code of the current locale's language."""
+    import locale
+    try:
+        return locale.getlocale()[0][:2]
+    except:
+        # Fallback for old Windows versions.
+        return locale.getdefaultlocale()[0][:2]
+
+
+def _(message):
+    """Return the translation of message.
+    
+    Positional arguments:
+        message -- str: text to be translated.
+    
+    Load the translation on the first call, so importing the module doesn't touch the locale.
+    Without a translation file, return message.
+    """
+    global _translation
+    if _translation is None:
+        import gettext
+        try:
+            _translation = gettext.translation('pywriter', LOCALE_PATH, languages=[get_current_language()])
+        except:
+            _translation = gettext.NullTranslations()
+    return _translation.gettext(message)
 
 
 def norm_path(path):
@@ -46,6 +63,22 @@ def norm_path(path):
     return os.path.normpath(path)
 
 
+def intern_text(text):
+    """Return an interned version of text, so equal strings share one object.
+    
+    Positional arguments:
+        text -- str to intern, or None.
+    
+    Use this for short strings that are repeated throughout a project,
+    such as IDs, tags, and names. Don't use it for longer texts.
+    Return None, if text is None.
+    """
+    if text is None:
+        return None
+
+    return sys.intern(text)
+
+
 def string_to_list(text, divider=';'):
     """Convert a string into a list with unique elements.
     
@@ -57,7 +90,7 @@ def string_to_list(text, divider=';'):
     
     Split a string into a list of strings. Retain the order, but discard duplicates.
     Remove leading and trailing spaces, if any.
-    Return a list of strings.
+    Return a list of interned strings.
     If an error occurs, return an empty list.
     """
     elements = []
@@ -66,7 +99,7 @@ def string_to_list(text, divider=';'):
         for element in tempList:
             element = element.strip()
             if element and not element in elements:
-                elements.append(element)
+                elements.append(sys.intern(element))
         return elements
 
     except:
@@ -8,6 +8,7 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 from pywriter.pywriter_globals import *
 import sys
+import time
 
 
 class Ui:
@@ -17,13 +18,18 @@ class Ui:
         ask_yes_no(text) -- return True or False.
         set_info_how(message) -- show how the converter is doing.
         set_info_what(message) -- show what the converter is going to do.
+        set_progress(done, total, phase) -- Stub for showing the progress of a conversion step.
         show_warning(message) -- Stub for displaying a warning message.
         start() -- launch the GUI, if any.
         
     Public instance variables:
         infoWhatText -- buffer for general messages.
         infoHowText -- buffer for error/success messages.
+    
+    Public class constants:
+        PROGRESS_INTERVAL -- float: minimum time in seconds between progress messages.
     """
+    PROGRESS_INTERVAL = 0.5
 
     def __init__(self, title):
         """Initialize text buffers for messaging.
@@ -33,6 +39,8 @@ class Ui:
         """
         self.infoWhatText = ''
         self.infoHowText = ''
+        self._progressTime = 0.0
+        self._progressPhase = None
 
     def ask_yes_no(self, text):
         """Return True or False.
@@ -66,6 +74,18 @@ class Ui:
         """
         self.infoWhatText = message
 
+    def set_progress(self, done, total, phase):
+        """Stub for showing the progress of a conversion step.
+        
+        Positional arguments:
+            done -- int: number of elements processed.
+            total -- int: number of elements to be processed.
+            phase -- str: description of the conversion step.
+            
+        The converter calls this in its loops, so subclasses must return quickly.
+        """
+        pass
+
     def show_warning(self, message):
         """Stub for displaying a warning message.
 
@@ -74,6 +94,25 @@ class Ui:
         """
         pass
 
+    def _is_progress_due(self, done, total, phase):
+        """Return True, if the progress is to be shown.
+        
+        Positional arguments:
+            done -- int: number of elements processed.
+            total -- int: number of elements to be processed.
+            phase -- str: description of the conversion step.
+        
+        Show the first and the last progress of each phase.
+        In between, show the progress once per PROGRESS_INTERVAL at most.
+        """
+        now = time.monotonic()
+        if phase != self._progressPhase or done >= total or now - self._progressTime >= self.PROGRESS_INTERVAL:
+            self._progressTime = now
+            self._progressPhase = phase
+            return True
+
+        return False
+
     def start(self):
         """Launch the GUI, if any.
         
@@ -0,0 +1,128 @@
+"""Provide a facade class for a user interface running in an asyncio event loop.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import asyncio
+import threading
+from pywriter.pywriter_globals import *
+from pywriter.ui.ui import Ui
+
+
+class UiAsync(Ui):
+    """Ui subclass passing the messages to an asyncio event loop.
+
+    Public methods:
+        ask_yes_no(text) -- return the answer of the confirmation coroutine, if any.
+        set_info_how(message) -- show how the converter is doing.
+        set_info_what(message) -- show what the converter is going to do.
+        set_progress(done, total, phase) -- show the progress of a conversion step.
+        show_warning(message) -- Display a warning message.
+        get_message() -- Coroutine: return the next message.
+
+    Public instance variables:
+        messages -- asyncio.Queue of (kind, message) tuples.
+
+    The converter may call the methods from executor threads.
+    The messages are put on the queue in the event loop's thread.
+    Kinds are 'what', 'how', and 'warning' with a str message, 
+    and 'progress' with a (done, total, phase) tuple as message.
+    """
+
+    def __init__(self, title, confirm=None):
+        """Initialize the message queue.
+
+        Positional arguments:
+            title -- application title.
+
+        Optional arguments:
+            confirm -- coroutine function taking a question and returning True or False.
+
+        Must be called in the running event loop, e.g. in a coroutine.
+        Raise RuntimeError, if there is no running event loop.
+        Extends the superclass constructor.
+        """
+        super().__init__(title)
+        self._loop = asyncio.get_running_loop()
+        self._loopThread = threading.current_thread()
+        self._confirm = confirm
+        self.messages = asyncio.Queue()
+
+    def ask_yes_no(self, text):
+        """Return the answer of the confirmation coroutine.
+
+        Positional arguments:
+            text -- question to be asked.
+
+        Without a confirmation coroutine, return True like the "silent mode".
+        Called in the event loop's thread, the question can not be awaited, so return False.
+        Overrides the superclass method.
+        """
+        if self._confirm is None:
+            return True
+
+        if threading.current_thread() is self._loopThread:
+            return False
+
+        return asyncio.run_coroutine_threadsafe(self._confirm(text), self._loop).result()
+
+    def set_info_how(self, message):
+        """Show how the converter is doing.
+
+        Positional arguments:
+            message -- message to be put on the queue.
+
+        Replace the error marker, if any.
+        Overrides the superclass method.
+        """
+        if message.startswith('!'):
+            message = f'FAIL: {message.split("!", maxsplit=1)[1].strip()}'
+        self.infoHowText = message
+        self._put('how', message)
+
+    def set_info_what(self, message):
+        """Show what the converter is going to do.
+
+        Positional arguments:
+            message -- message to be put on the queue.
+
+        Overrides the superclass method.
+        """
+        self.infoWhatText = message
+        self._put('what', message)
+
+    def set_progress(self, done, total, phase):
+        """Show the progress of a conversion step.
+
+        Positional arguments:
+            done -- int: number of elements processed.
+            total -- int: number of elements to be processed.
+            phase -- str: description of the conversion step.
+
+        Put the counts on the queue, but not more often than every PROGRESS_INTERVAL seconds.
+        Overrides the superclass method.
+        """
+        if self._is_progress_due(done, total, phase):
+            self._put('progress', (done, total, phase))
+
+    def show_warning(self, message):
+        """Display a warning message.
+
+        Positional arguments:
+            message -- message to be put on the queue.
+
+        Overrides the superclass method.
+        """
+        self._put('warning', message)
+
+    async def get_message(self):
+        """Return the next (kind, message) tuple from the queue."""
+        return await self.messages.get()
+
+    def _put(self, kind, message):
+        """Put a message on the queue in the event loop's thread."""
+        if threading.current_thread() is self._loopThread:
+            self.messages.put_nowait((kind, message))
+        else:
+            self._loop.call_soon_threadsafe(self.messages.put_nowait, (kind, message))
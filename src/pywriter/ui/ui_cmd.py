@@ -15,6 +15,7 @@ class UiCmd(Ui):
         ask_yes_no(text) -- query yes or no at the console.
         set_info_how(message) -- show how the converter is doing.
         set_info_what(message) -- show what the converter is going to do.
+        set_progress(done, total, phase) -- show the progress of a conversion step.
         show_warning(message) -- Display a warning message.
     """
 
@@ -68,6 +69,20 @@ class UiCmd(Ui):
         """
         print(message)
 
+    def set_progress(self, done, total, phase):
+        """Show the progress of a conversion step.
+        
+        Positional arguments:
+            done -- int: number of elements processed.
+            total -- int: number of elements to be processed.
+            phase -- str: description of the conversion step.
+            
+        Print the counts, but not more often than every PROGRESS_INTERVAL seconds.
+        Overrides the superclass method.
+        """
+        if self._is_progress_due(done, total, phase):
+            print(f'{phase}: {done}/{total}')
+
     def show_warning(self, message):
         """Display a warning message."""
         print(f'\nWARNING: {message}\n')
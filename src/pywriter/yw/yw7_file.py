@@ -8,7 +8,6 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import re
-from html import unescape
 from datetime import datetime
 import xml.etree.ElementTree as ET
 from pywriter.pywriter_globals import *
@@ -20,6 +19,7 @@ from pywriter.model.basic_element import BasicElement
 from pywriter.file.file import File
 from pywriter.model.id_generator import create_id
 from pywriter.yw.xml_indent import indent
+from pywriter.yw.yw7_stream import Yw7Stream
 
 
 class Yw7File(File):
@@ -58,6 +58,38 @@ class Yw7File(File):
         'Field_SceneStyle',
         ]
 
+    _CHP_TEXT_TAGS = {
+        'Title': 'title',
+        'Desc': 'desc',
+        }
+    _SCN_TEXT_TAGS = {
+        'Title': 'title',
+        'Desc': 'desc',
+        'Notes': 'notes',
+        'Field1': 'field1',
+        'Field2': 'field2',
+        'Field3': 'field3',
+        'Field4': 'field4',
+        'LastsDays': 'lastsDays',
+        'LastsHours': 'lastsHours',
+        'LastsMinutes': 'lastsMinutes',
+        'Goal': 'goal',
+        'Conflict': 'conflict',
+        'Outcome': 'outcome',
+        'ImageFile': 'image',
+        }
+    _CRT_TEXT_TAGS = {
+        'Title': 'title',
+        'ImageFile': 'image',
+        'Desc': 'desc',
+        'AKA': 'aka',
+        'Notes': 'notes',
+        'Bio': 'bio',
+        'Goals': 'goals',
+        'FullName': 'fullName',
+        }
+    # Names of xml elements holding plain text: key = xml tag, value = attribute name.
+
     def __init__(self, filePath, **kwargs):
         """Initialize instance variables.
         
@@ -65,12 +97,14 @@ class Yw7File(File):
             filePath: str -- path to the yw7 file.
             
         Optional arguments:
-            kwargs -- keyword arguments (not used here).            
+            novel_cache -- NovelCache instance for looking up already parsed projects.
         
         Extends the superclass constructor.
         """
         super().__init__(filePath)
         self.tree = None
+        self._novelCache = kwargs.get('novel_cache', None)
+        self._isTreeDeferred = False
 
     def adjust_scene_types(self):
         """Make sure that scenes in non-"Normal" chapters inherit the chapter's type."""
@@ -99,11 +133,22 @@ class Yw7File(File):
 
         if self.is_locked():
             raise Error(f'{_("yWriter seems to be open. Please close first")}.')
+
+        if self._novelCache is not None:
+            novel = self._novelCache.get(self.filePath, [self.filePath], {})
+            if novel is not None:
+                # Parse the xml file only if it is to be written back.
+                self.novel = novel
+                self.tree = None
+                self._isTreeDeferred = True
+                return
+
         try:
             self.tree = ET.parse(self.filePath)
         except:
             raise Error(f'{_("Can not process file")}: "{norm_path(self.filePath)}".')
 
+        self._isTreeDeferred = False
         root = self.tree.getroot()
         self._read_project(root)
         self._read_locations(root)
@@ -120,17 +165,32 @@ class Yw7File(File):
             self.novel.scenes[scId].scnArcs = self.novel.scenes[scId].kwVar.get('Field_SceneArcs', None)
             self.novel.scenes[scId].scnStyle = self.novel.scenes[scId].kwVar.get('Field_SceneStyle', None)
 
+        if self._novelCache is not None:
+            self._novelCache.put(self.filePath, [self.filePath], {}, self.novel)
+
     def write(self):
         """Write instance variables to the yWriter xml file.
         
         Open the yWriter xml file located at filePath and replace the instance variables 
         not being None. Create new XML elements if necessary.
+        If there is no xml tree to preserve, write a new file in one pass.
+        If the novel's changes are tracked, rebuild only the changed elements,
+        and copy the rest from the existing file.
         Raise the "Error" exception in case of error. 
         Overrides the superclass method.
         """
         if self.is_locked():
             raise Error(f'{_("yWriter seems to be open. Please close first")}.')
 
+        if self._isTreeDeferred:
+            # The novel was read from the cache, so the xml tree is still missing.
+            try:
+                self.tree = ET.parse(self.filePath)
+            except:
+                raise Error(f'{_("Can not process file")}: "{norm_path(self.filePath)}".')
+
+            self._isTreeDeferred = False
+
         if self.novel.languages is None:
             self.novel.get_languages()
 
@@ -141,12 +201,23 @@ class Yw7File(File):
             if self.novel.scenes[scId].scnStyle is not None:
                 self.novel.scenes[scId].kwVar['Field_SceneStyle'] = self.novel.scenes[scId].scnStyle
 
-        self._build_element_tree()
-        self._write_element_tree(self)
-        self._postprocess_xml_file(self.filePath)
-
-    def _build_element_tree(self):
-        """Modify the yWriter project attributes of an existing xml element tree."""
+        if self.tree is None:
+            self._stream_element_tree()
+        elif self.novel.dirtyElements is None or not self._write_dirty_elements():
+            self._build_element_tree()
+            self._write_element_tree(self)
+            self._postprocess_xml_file(self.filePath)
+        if self.novel.dirtyElements is not None:
+            # The file is up to date now.
+            self.novel.set_clean()
+
+    def _build_element_tree(self, xmlStream=None):
+        """Modify the yWriter project attributes of an existing xml element tree.
+        
+        Optional arguments:
+            xmlStream -- Yw7Stream instance: if given, write the new elements
+                         instead of adding them to the tree.
+        """
 
         def set_element(parent, tag, text, index):
             subelement = parent.find(tag)
@@ -161,6 +232,36 @@ class Yw7File(File):
                 index += 1
             return index
 
+        def detach_children(parent, tag):
+            """Remove all children with tag from parent and return them in document order.
+
+            The section is rebuilt in one pass, because removing
+            the children one by one takes quadratic time.
+            """
+            detached = []
+            kept = []
+            for child in parent:
+                if child.tag == tag:
+                    detached.append(child)
+                else:
+                    kept.append(child)
+            parent[:] = kept
+            return detached
+
+        def start_section(xmlSection):
+            if xmlStream is not None:
+                xmlStream.start_section(xmlSection.tag)
+
+        def add_element(xmlSection, xmlElement):
+            if xmlStream is None:
+                xmlSection.append(xmlElement)
+            else:
+                xmlStream.write_element(xmlElement)
+
+        def end_section():
+            if xmlStream is not None:
+                xmlStream.end_section()
+
         def build_scene_subtree(xmlScene, prjScn):
 
             def remove_date_time():
@@ -184,10 +285,9 @@ class Yw7File(File):
             i = set_element(xmlScene, 'Title', prjScn.title, i)
 
             if xmlScene.find('BelongsToChID') is None:
-                for chId in self.novel.chapters:
-                    if scId in self.novel.chapters[chId].srtScenes:
-                        ET.SubElement(xmlScene, 'BelongsToChID').text = chId
-                        break
+                scenePosition = self.novel.get_scene_position(scId)
+                if scenePosition is not None:
+                    ET.SubElement(xmlScene, 'BelongsToChID').text = scenePosition[0]
 
             if prjScn.desc is not None:
                 try:
@@ -196,14 +296,17 @@ class Yw7File(File):
                     if prjScn.desc:
                         ET.SubElement(xmlScene, 'Desc').text = prjScn.desc
 
-            if xmlScene.find('SceneContent') is None:
-                ET.SubElement(xmlScene, 'SceneContent').text = prjScn.sceneContent
-
-            if xmlScene.find('WordCount') is None:
-                ET.SubElement(xmlScene, 'WordCount').text = str(prjScn.wordCount)
-
-            if xmlScene.find('LetterCount') is None:
-                ET.SubElement(xmlScene, 'LetterCount').text = str(prjScn.letterCount)
+            #--- Write the scene content along with the counts.
+            for tag, text in (
+                    ('SceneContent', prjScn.sceneContent),
+                    ('WordCount', str(prjScn.wordCount)),
+                    ('LetterCount', str(prjScn.letterCount)),
+                    ):
+                xmlElement = xmlScene.find(tag)
+                if xmlElement is None:
+                    ET.SubElement(xmlScene, tag).text = text
+                elif prjScn.sceneContent is not None:
+                    xmlElement.text = text
 
             #--- Write scene type.
             #
@@ -480,6 +583,11 @@ class Yw7File(File):
                 for itId in prjScn.items:
                     ET.SubElement(xmlItems, 'ItemID').text = itId
 
+            #--- The scene content replaces the RTF file.
+            xmlRtfFile = xmlScene.find('RTFFile')
+            if xmlRtfFile is not None:
+                xmlScene.remove(xmlRtfFile)
+
             """ Removing empty characters/locations/items entries
             
             if prjScn.characters is not None:
@@ -898,71 +1006,81 @@ class Yw7File(File):
         #--- Process project attributes.
 
         build_project_subtree(xmlProject)
+        if xmlStream is not None:
+            xmlStream.write_element(xmlProject)
 
         #--- Process xmlLocations.
 
         # Remove LOCATION entries in order to rewrite
         # the LOCATIONS section in a modified sort order.
-        for xmlLoc in xmlLocations.findall('LOCATION'):
-            xmlLocations.remove(xmlLoc)
+        detach_children(xmlLocations, 'LOCATION')
 
         # Add the new XML location subtrees to the project tree.
+        start_section(xmlLocations)
         sortOrder = 0
         for lcId in self.novel.srtLocations:
             sortOrder += 1
-            xmlLoc = ET.SubElement(xmlLocations, 'LOCATION')
+            xmlLoc = ET.Element('LOCATION')
             ET.SubElement(xmlLoc, 'ID').text = lcId
             build_location_subtree(xmlLoc, self.novel.locations[lcId], sortOrder)
+            add_element(xmlLocations, xmlLoc)
+        end_section()
 
         #--- Process xmlItems.
 
         # Remove ITEM entries in order to rewrite
         # the ITEMS section in a modified sort order.
-        for xmlItm in xmlItems.findall('ITEM'):
-            xmlItems.remove(xmlItm)
+        detach_children(xmlItems, 'ITEM')
 
         # Add the new XML item subtrees to the project tree.
+        start_section(xmlItems)
         sortOrder = 0
         for itId in self.novel.srtItems:
             sortOrder += 1
-            xmlItm = ET.SubElement(xmlItems, 'ITEM')
+            xmlItm = ET.Element('ITEM')
             ET.SubElement(xmlItm, 'ID').text = itId
             build_item_subtree(xmlItm, self.novel.items[itId], sortOrder)
+            add_element(xmlItems, xmlItm)
+        end_section()
 
         #--- Process xmlCharacters.
 
         # Remove CHARACTER entries in order to rewrite
         # the CHARACTERS section in a modified sort order.
-        for xmlCrt in xmlCharacters.findall('CHARACTER'):
-            xmlCharacters.remove(xmlCrt)
+        detach_children(xmlCharacters, 'CHARACTER')
 
         # Add the new XML character subtrees to the project tree.
+        start_section(xmlCharacters)
         sortOrder = 0
         for crId in self.novel.srtCharacters:
             sortOrder += 1
-            xmlCrt = ET.SubElement(xmlCharacters, 'CHARACTER')
+            xmlCrt = ET.Element('CHARACTER')
             ET.SubElement(xmlCrt, 'ID').text = crId
             build_character_subtree(xmlCrt, self.novel.characters[crId], sortOrder)
+            add_element(xmlCharacters, xmlCrt)
+        end_section()
 
         #--- Process project notes.
 
         # Remove PROJECTNOTE entries in order to rewrite
         # the PROJECTNOTES section in a modified sort order.
         if xmlProjectnotes is not None:
-            for xmlProjectnote in xmlProjectnotes.findall('PROJECTNOTE'):
-                xmlProjectnotes.remove(xmlProjectnote)
+            detach_children(xmlProjectnotes, 'PROJECTNOTE')
             if not self.novel.srtPrjNotes:
                 root.remove(xmlProjectnotes)
         elif self.novel.srtPrjNotes:
             xmlProjectnotes = ET.SubElement(root, 'PROJECTNOTES')
         if self.novel.srtPrjNotes:
             # Add the new XML prjNote subtrees to the project tree.
+            start_section(xmlProjectnotes)
             sortOrder = 0
             for pnId in self.novel.srtPrjNotes:
                 sortOrder += 1
-                xmlProjectnote = ET.SubElement(xmlProjectnotes, 'PROJECTNOTE')
+                xmlProjectnote = ET.Element('PROJECTNOTE')
                 ET.SubElement(xmlProjectnote, 'ID').text = pnId
                 build_prjNote_subtree(xmlProjectnote, self.novel.projectNotes[pnId], sortOrder)
+                add_element(xmlProjectnotes, xmlProjectnote)
+            end_section()
 
         #--- Process project variables.
         xmlProjectvars = root.find('PROJECTVARS')
@@ -1017,33 +1135,40 @@ class Yw7File(File):
                                     '0')
                 # adding new IDs to the prjVars list
 
+            if xmlStream is not None:
+                xmlStream.write_element(xmlProjectvars)
+
         #--- Process scenes.
 
         # Save the original XML scene subtrees
         # and remove them from the project tree.
-        for xmlScene in xmlScenes.findall('SCENE'):
-            scId = xmlScene.find('ID').text
-            xmlNewScenes[scId] = xmlScene
-            xmlScenes.remove(xmlScene)
+        for xmlScene in detach_children(xmlScenes, 'SCENE'):
+            xmlNewScenes[xmlScene.find('ID').text] = xmlScene
 
         # Add the new XML scene subtrees to the project tree.
-        for scId in self.novel.scenes:
+        start_section(xmlScenes)
+        total = len(self.novel.scenes)
+        for done, scId in enumerate(self.novel.scenes):
+            self.ui.set_progress(done, total, _('Writing scenes'))
             if not scId in xmlNewScenes:
                 xmlNewScenes[scId] = ET.Element('SCENE')
                 ET.SubElement(xmlNewScenes[scId], 'ID').text = scId
-            build_scene_subtree(xmlNewScenes[scId], self.novel.scenes[scId])
-            xmlScenes.append(xmlNewScenes[scId])
+                build_scene_subtree(xmlNewScenes[scId], self.novel.scenes[scId])
+            elif self.novel.is_dirty('scenes', scId):
+                build_scene_subtree(xmlNewScenes[scId], self.novel.scenes[scId])
+            add_element(xmlScenes, xmlNewScenes.pop(scId))
+        self.ui.set_progress(total, total, _('Writing scenes'))
+        end_section()
 
         #--- Process chapters.
 
         # Save the original XML chapter subtree
         # and remove it from the project tree.
-        for xmlChapter in xmlChapters.findall('CHAPTER'):
-            chId = xmlChapter.find('ID').text
-            xmlNewChapters[chId] = xmlChapter
-            xmlChapters.remove(xmlChapter)
+        for xmlChapter in detach_children(xmlChapters, 'CHAPTER'):
+            xmlNewChapters[xmlChapter.find('ID').text] = xmlChapter
 
         # Add the new XML chapter subtrees to the project tree.
+        start_section(xmlChapters)
         sortOrder = 0
         for chId in self.novel.srtChapters:
             sortOrder += 1
@@ -1051,22 +1176,11 @@ class Yw7File(File):
                 xmlNewChapters[chId] = ET.Element('CHAPTER')
                 ET.SubElement(xmlNewChapters[chId], 'ID').text = chId
             build_chapter_subtree(xmlNewChapters[chId], self.novel.chapters[chId], sortOrder)
-            xmlChapters.append(xmlNewChapters[chId])
-
-        # Modify the scene contents of an existing xml element tree.
-        for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            if self.novel.scenes[scId].sceneContent is not None:
-                xmlScene.find('SceneContent').text = self.novel.scenes[scId].sceneContent
-                xmlScene.find('WordCount').text = str(self.novel.scenes[scId].wordCount)
-                xmlScene.find('LetterCount').text = str(self.novel.scenes[scId].letterCount)
-            try:
-                xmlScene.remove(xmlScene.find('RTFFile'))
-            except:
-                pass
+            add_element(xmlChapters, xmlNewChapters.pop(chId))
+        end_section()
 
-        indent(root)
-        self.tree = ET.ElementTree(root)
+        if xmlStream is None:
+            self.tree = ET.ElementTree(root)
 
     def _postprocess_xml_file(self, filePath):
         '''Postprocess an xml file created by ElementTree.
@@ -1083,26 +1197,39 @@ class Yw7File(File):
         '''
         with open(filePath, 'r', encoding='utf-8') as f:
             text = f.read()
-        lines = text.split('\n')
-        newlines = ['<?xml version="1.0" encoding="utf-8"?>']
-        for line in lines:
-            for tag in self._CDATA_TAGS:
-                line = re.sub(f'\<{tag}\>', f'<{tag}><![CDATA[', line)
-                line = re.sub(f'\<\/{tag}\>', f']]></{tag}>', line)
-            newlines.append(line)
-        text = '\n'.join(newlines)
-        text = text.replace('[CDATA[ \n', '[CDATA[')
-        text = text.replace('\n]]', ']]')
+
+        # Process the whole text at once; the tags do not span lines.
+        text = f'<?xml version="1.0" encoding="utf-8"?>\n{text}'
         if not self.novel.chapters:
             text = text.replace('<CHAPTERS />', '<CHAPTERS></CHAPTERS>')
             # otherwise, yWriter fails to parse the file if there are no chapters.
-        text = unescape(text)
+        text = self._postprocess_xml_text(text)
         try:
             with open(filePath, 'w', encoding='utf-8') as f:
                 f.write(text)
         except:
             raise Error(f'{_("Cannot write file")}: "{norm_path(filePath)}".')
 
+    def _postprocess_xml_text(self, text):
+        """Return xml text created by ElementTree with the CDATA tags inserted and the entities unescaped.
+        
+        Positional argument:
+            text: str -- serialized xml elements, not splitting any CDATA element.
+        """
+        from html import unescape
+
+        def insert_cdata(match):
+            """Return the opening or closing tag of match with the CDATA delimiter."""
+            if match.group(1):
+                return f']]></{match.group(2)}>'
+
+            return f'<{match.group(2)}><![CDATA['
+
+        text = re.sub(f'<(/?)({"|".join(self._CDATA_TAGS)})>', insert_cdata, text)
+        text = text.replace('[CDATA[ \n', '[CDATA[')
+        text = text.replace('\n]]', ']]')
+        return unescape(text)
+
     def _read_project(self, root):
         """Read attributes at project level from the xml element tree."""
         xmlProject = root.find('PROJECT')
@@ -1165,12 +1292,12 @@ class Yw7File(File):
         self.novel.srtLocations = []
         # This is necessary for re-reading.
         for xmlLocation in root.find('LOCATIONS'):
-            lcId = xmlLocation.find('ID').text
+            lcId = intern_text(xmlLocation.find('ID').text)
             self.novel.srtLocations.append(lcId)
             self.novel.locations[lcId] = WorldElement()
 
             if xmlLocation.find('Title') is not None:
-                self.novel.locations[lcId].title = xmlLocation.find('Title').text
+                self.novel.locations[lcId].title = intern_text(xmlLocation.find('Title').text)
 
             if xmlLocation.find('ImageFile') is not None:
                 self.novel.locations[lcId].image = xmlLocation.find('ImageFile').text
@@ -1202,12 +1329,12 @@ class Yw7File(File):
         self.novel.srtItems = []
         # This is necessary for re-reading.
         for xmlItem in root.find('ITEMS'):
-            itId = xmlItem.find('ID').text
+            itId = intern_text(xmlItem.find('ID').text)
             self.novel.srtItems.append(itId)
             self.novel.items[itId] = WorldElement()
 
             if xmlItem.find('Title') is not None:
-                self.novel.items[itId].title = xmlItem.find('Title').text
+                self.novel.items[itId].title = intern_text(xmlItem.find('Title').text)
 
             if xmlItem.find('ImageFile') is not None:
                 self.novel.items[itId].image = xmlItem.find('ImageFile').text
@@ -1235,58 +1362,58 @@ class Yw7File(File):
                         self.novel.items[itId].kwVar[fieldName] = field.text
 
     def _read_characters(self, root):
-        """Read characters from the xml element tree."""
-        self.novel.srtCharacters = []
-        # This is necessary for re-reading.
-        for xmlCharacter in root.find('CHARACTERS'):
-            crId = xmlCharacter.find('ID').text
-            self.novel.srtCharacters.append(crId)
-            self.novel.characters[crId] = Character()
-
-            if xmlCharacter.find('Title') is not None:
-                self.novel.characters[crId].title = xmlCharacter.find('Title').text
-
-            if xmlCharacter.find('ImageFile') is not None:
-                self.novel.characters[crId].image = xmlCharacter.find('ImageFile').text
-
-            if xmlCharacter.find('Desc') is not None:
-                self.novel.characters[crId].desc = xmlCharacter.find('Desc').text
-
-            if xmlCharacter.find('AKA') is not None:
-                self.novel.characters[crId].aka = xmlCharacter.find('AKA').text
-
-            if xmlCharacter.find('Tags') is not None:
-                if xmlCharacter.find('Tags').text is not None:
-                    tags = string_to_list(xmlCharacter.find('Tags').text)
-                    self.novel.characters[crId].tags = self._strip_spaces(tags)
-
-            if xmlCharacter.find('Notes') is not None:
-                self.novel.characters[crId].notes = xmlCharacter.find('Notes').text
-
-            if xmlCharacter.find('Bio') is not None:
-                self.novel.characters[crId].bio = xmlCharacter.find('Bio').text
+        """Read characters from the xml element tree.
+        
+        Each CHARACTER element's children are visited once and dispatched on their tag.
+        """
 
-            if xmlCharacter.find('Goals') is not None:
-                self.novel.characters[crId].goals = xmlCharacter.find('Goals').text
+        def read_tags(character, xmlElement):
+            if xmlElement.text is not None:
+                tags = string_to_list(xmlElement.text)
+                character.tags = self._strip_spaces(tags)
 
-            if xmlCharacter.find('FullName') is not None:
-                self.novel.characters[crId].fullName = xmlCharacter.find('FullName').text
+        def read_fields(character, xmlElement):
+            fields = self._index_children(xmlElement)
+            for fieldName in self.CRT_KWVAR:
+                if fieldName in fields:
+                    character.kwVar[fieldName] = fields[fieldName].text
 
-            if xmlCharacter.find('Major') is not None:
-                self.novel.characters[crId].isMajor = True
-            else:
-                self.novel.characters[crId].isMajor = False
+        handlers = {
+            'Tags': read_tags,
+            }
+        self.novel.srtCharacters = []
+        # This is necessary for re-reading.
+        for xmlCharacter in root.find('CHARACTERS'):
+            character = Character()
 
             #--- Initialize custom keyword variables.
             for fieldName in self.CRT_KWVAR:
-                self.novel.characters[crId].kwVar[fieldName] = None
-
-            #--- Read character custom fields.
-            for xmlCharacterFields in xmlCharacter.findall('Fields'):
-                for fieldName in self.CRT_KWVAR:
-                    field = xmlCharacterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.characters[crId].kwVar[fieldName] = field.text
+                character.kwVar[fieldName] = None
+
+            xmlElements = {}
+            for xmlElement in xmlCharacter:
+                tag = xmlElement.tag
+                if tag == 'Fields':
+                    # Read character custom fields.
+                    read_fields(character, xmlElement)
+                    continue
+
+                if tag in xmlElements:
+                    # Only the first element of a kind is evaluated.
+                    continue
+
+                xmlElements[tag] = xmlElement
+                attribute = self._CRT_TEXT_TAGS.get(tag, None)
+                if attribute is not None:
+                    setattr(character, attribute, xmlElement.text)
+                elif tag in handlers:
+                    handlers[tag](character, xmlElement)
+
+            character.isMajor = 'Major' in xmlElements
+            character.title = intern_text(character.title)
+            crId = intern_text(xmlElements['ID'].text)
+            self.novel.srtCharacters.append(crId)
+            self.novel.characters[crId] = character
 
     def _read_projectnotes(self, root):
         """Read project notes from the xml element tree."""
@@ -1342,21 +1469,81 @@ class Yw7File(File):
             pass
 
     def _read_scenes(self, root):
-        """ Read attributes at scene level from the xml element tree."""
-        for xmlScene in root.find('SCENES'):
-            scId = xmlScene.find('ID').text
-            self.novel.scenes[scId] = Scene()
+        """ Read attributes at scene level from the xml element tree.
+        
+        Each SCENE element's children are visited once and dispatched on their tag.
+        Elements whose meaning depends on other elements are evaluated afterwards.
+        """
 
-            if xmlScene.find('Title') is not None:
-                self.novel.scenes[scId].title = xmlScene.find('Title').text
+        def read_content(scene, xmlElement):
+            if xmlElement.text is not None:
+                scene.sceneContent = xmlElement.text
 
-            if xmlScene.find('Desc') is not None:
-                self.novel.scenes[scId].desc = xmlScene.find('Desc').text
+        def read_fields(scene, xmlElement):
+            fields = self._index_children(xmlElement)
 
-            if xmlScene.find('SceneContent') is not None:
-                sceneContent = xmlScene.find('SceneContent').text
-                if sceneContent is not None:
-                    self.novel.scenes[scId].sceneContent = sceneContent
+            #--- Read scene custom fields.
+            for fieldName in self.SCN_KWVAR:
+                if fieldName in fields:
+                    scene.kwVar[fieldName] = fields[fieldName].text
+
+            # Read scene type, if any.
+            if 'Field_SceneType' in fields:
+                if fields['Field_SceneType'].text == '1':
+                    scene.scType = 1
+                elif fields['Field_SceneType'].text == '2':
+                    scene.scType = 2
+
+        def read_status(scene, xmlElement):
+            scene.status = int(xmlElement.text)
+
+        def read_tags(scene, xmlElement):
+            if xmlElement.text is not None:
+                tags = string_to_list(xmlElement.text)
+                scene.tags = self._strip_spaces(tags)
+
+        def read_characters(scene, xmlElement):
+            for characters in xmlElement.iter('CharID'):
+                crId = intern_text(characters.text)
+                if crId in srtCharacters:
+                    if scene.characters is None:
+                        scene.characters = []
+                    scene.characters.append(crId)
+
+        def read_locations(scene, xmlElement):
+            for locations in xmlElement.iter('LocID'):
+                lcId = intern_text(locations.text)
+                if lcId in srtLocations:
+                    if scene.locations is None:
+                        scene.locations = []
+                    scene.locations.append(lcId)
+
+        def read_items(scene, xmlElement):
+            for items in xmlElement.iter('ItemID'):
+                itId = intern_text(items.text)
+                if itId in srtItems:
+                    if scene.items is None:
+                        scene.items = []
+                    scene.items.append(itId)
+
+        handlers = {
+            'SceneContent': read_content,
+            'Status': read_status,
+            'Tags': read_tags,
+            'Characters': read_characters,
+            'Locations': read_locations,
+            'Items': read_items,
+            }
+
+        # The sorted ID lists are indexed, so the relation checks above don't scan the lists.
+        srtCharacters = self.novel.srtCharacters
+        srtLocations = self.novel.srtLocations
+        srtItems = self.novel.srtItems
+        xmlScenes = root.find('SCENES')
+        total = len(xmlScenes)
+        for done, xmlScene in enumerate(xmlScenes):
+            self.ui.set_progress(done, total, _('Reading scenes'))
+            scene = Scene()
 
             #--- Read scene type.
 
@@ -1371,179 +1558,160 @@ class Yw7File(File):
             # Normal | N/A    | N/A            | 0
             # Normal | N/A    | 0              | 0
 
-            self.novel.scenes[scId].scType = 0
+            scene.scType = 0
 
             #--- Initialize custom keyword variables.
             for fieldName in self.SCN_KWVAR:
-                self.novel.scenes[scId].kwVar[fieldName] = None
-
-            for xmlSceneFields in xmlScene.findall('Fields'):
-                #--- Read scene custom fields.
-                for fieldName in self.SCN_KWVAR:
-                    field = xmlSceneFields.find(fieldName)
-                    if field is not None:
-                        self.novel.scenes[scId].kwVar[fieldName] = field.text
-
-                # Read scene type, if any.
-                if xmlSceneFields.find('Field_SceneType') is not None:
-                    if xmlSceneFields.find('Field_SceneType').text == '1':
-                        self.novel.scenes[scId].scType = 1
-                    elif xmlSceneFields.find('Field_SceneType').text == '2':
-                        self.novel.scenes[scId].scType = 2
-            if xmlScene.find('Unused') is not None:
-                if self.novel.scenes[scId].scType == 0:
-                    self.novel.scenes[scId].scType = 3
+                scene.kwVar[fieldName] = None
+
+            xmlElements = {}
+            for xmlElement in xmlScene:
+                tag = xmlElement.tag
+                if tag == 'Fields':
+                    read_fields(scene, xmlElement)
+                    continue
+
+                if tag in xmlElements:
+                    # Only the first element of a kind is evaluated.
+                    continue
+
+                xmlElements[tag] = xmlElement
+                attribute = self._SCN_TEXT_TAGS.get(tag, None)
+                if attribute is not None:
+                    setattr(scene, attribute, xmlElement.text)
+                elif tag in handlers:
+                    handlers[tag](scene, xmlElement)
+
+            if 'Unused' in xmlElements:
+                if scene.scType == 0:
+                    scene.scType = 3
 
             # Export when RTF.
-            if xmlScene.find('ExportCondSpecific') is None:
-                self.novel.scenes[scId].doNotExport = False
-            elif xmlScene.find('ExportWhenRTF') is not None:
-                self.novel.scenes[scId].doNotExport = False
+            if not 'ExportCondSpecific' in xmlElements:
+                scene.doNotExport = False
+            elif 'ExportWhenRTF' in xmlElements:
+                scene.doNotExport = False
             else:
-                self.novel.scenes[scId].doNotExport = True
-
-            if xmlScene.find('Status') is not None:
-                self.novel.scenes[scId].status = int(xmlScene.find('Status').text)
-
-            if xmlScene.find('Notes') is not None:
-                self.novel.scenes[scId].notes = xmlScene.find('Notes').text
-
-            if xmlScene.find('Tags') is not None:
-                if xmlScene.find('Tags').text is not None:
-                    tags = string_to_list(xmlScene.find('Tags').text)
-                    self.novel.scenes[scId].tags = self._strip_spaces(tags)
+                scene.doNotExport = True
 
-            if xmlScene.find('Field1') is not None:
-                self.novel.scenes[scId].field1 = xmlScene.find('Field1').text
-
-            if xmlScene.find('Field2') is not None:
-                self.novel.scenes[scId].field2 = xmlScene.find('Field2').text
-
-            if xmlScene.find('Field3') is not None:
-                self.novel.scenes[scId].field3 = xmlScene.find('Field3').text
-
-            if xmlScene.find('Field4') is not None:
-                self.novel.scenes[scId].field4 = xmlScene.find('Field4').text
-
-            if xmlScene.find('AppendToPrev') is not None:
-                self.novel.scenes[scId].appendToPrev = True
-            else:
-                self.novel.scenes[scId].appendToPrev = False
+            scene.appendToPrev = 'AppendToPrev' in xmlElements
 
             #--- Scene start.
-            if xmlScene.find('SpecificDateTime') is not None:
-                dateTimeStr = xmlScene.find('SpecificDateTime').text
+            if 'SpecificDateTime' in xmlElements:
+                dateTimeStr = xmlElements['SpecificDateTime'].text
 
                 # Check SpecificDateTime for ISO compliance.
                 try:
                     dateTime = datetime.fromisoformat(dateTimeStr)
                 except:
-                    self.novel.scenes[scId].date = ''
-                    self.novel.scenes[scId].time = ''
+                    scene.date = ''
+                    scene.time = ''
                 else:
                     startDateTime = dateTime.isoformat().split('T')
-                    self.novel.scenes[scId].date = startDateTime[0]
-                    self.novel.scenes[scId].time = startDateTime[1]
+                    scene.date = startDateTime[0]
+                    scene.time = startDateTime[1]
             else:
-                if xmlScene.find('Day') is not None:
-                    day = xmlScene.find('Day').text
+                if 'Day' in xmlElements:
+                    day = xmlElements['Day'].text
 
                     # Check if Day represents an integer.
                     try:
                         int(day)
                     except ValueError:
                         day = ''
-                    self.novel.scenes[scId].day = day
+                    scene.day = day
 
                 hasUnspecificTime = False
-                if xmlScene.find('Hour') is not None:
-                    hour = xmlScene.find('Hour').text.zfill(2)
+                if 'Hour' in xmlElements:
+                    hour = xmlElements['Hour'].text.zfill(2)
                     hasUnspecificTime = True
                 else:
                     hour = '00'
-                if xmlScene.find('Minute') is not None:
-                    minute = xmlScene.find('Minute').text.zfill(2)
+                if 'Minute' in xmlElements:
+                    minute = xmlElements['Minute'].text.zfill(2)
                     hasUnspecificTime = True
                 else:
                     minute = '00'
                 if hasUnspecificTime:
-                    self.novel.scenes[scId].time = f'{hour}:{minute}:00'
-
-            #--- Scene duration.
-            if xmlScene.find('LastsDays') is not None:
-                self.novel.scenes[scId].lastsDays = xmlScene.find('LastsDays').text
-
-            if xmlScene.find('LastsHours') is not None:
-                self.novel.scenes[scId].lastsHours = xmlScene.find('LastsHours').text
+                    scene.time = f'{hour}:{minute}:00'
 
-            if xmlScene.find('LastsMinutes') is not None:
-                self.novel.scenes[scId].lastsMinutes = xmlScene.find('LastsMinutes').text
-
-            if xmlScene.find('ReactionScene') is not None:
-                self.novel.scenes[scId].isReactionScene = True
-            else:
-                self.novel.scenes[scId].isReactionScene = False
-
-            if xmlScene.find('SubPlot') is not None:
-                self.novel.scenes[scId].isSubPlot = True
-            else:
-                self.novel.scenes[scId].isSubPlot = False
-
-            if xmlScene.find('Goal') is not None:
-                self.novel.scenes[scId].goal = xmlScene.find('Goal').text
-
-            if xmlScene.find('Conflict') is not None:
-                self.novel.scenes[scId].conflict = xmlScene.find('Conflict').text
-
-            if xmlScene.find('Outcome') is not None:
-                self.novel.scenes[scId].outcome = xmlScene.find('Outcome').text
-
-            if xmlScene.find('ImageFile') is not None:
-                self.novel.scenes[scId].image = xmlScene.find('ImageFile').text
-
-            if xmlScene.find('Characters') is not None:
-                for characters in xmlScene.find('Characters').iter('CharID'):
-                    crId = characters.text
-                    if crId in self.novel.srtCharacters:
-                        if self.novel.scenes[scId].characters is None:
-                            self.novel.scenes[scId].characters = []
-                        self.novel.scenes[scId].characters.append(crId)
-
-            if xmlScene.find('Locations') is not None:
-                for locations in xmlScene.find('Locations').iter('LocID'):
-                    lcId = locations.text
-                    if lcId in self.novel.srtLocations:
-                        if self.novel.scenes[scId].locations is None:
-                            self.novel.scenes[scId].locations = []
-                        self.novel.scenes[scId].locations.append(lcId)
-
-            if xmlScene.find('Items') is not None:
-                for items in xmlScene.find('Items').iter('ItemID'):
-                    itId = items.text
-                    if itId in self.novel.srtItems:
-                        if self.novel.scenes[scId].items is None:
-                            self.novel.scenes[scId].items = []
-                        self.novel.scenes[scId].items.append(itId)
+            scene.isReactionScene = 'ReactionScene' in xmlElements
+            scene.isSubPlot = 'SubPlot' in xmlElements
+            scId = intern_text(xmlElements['ID'].text)
+            self.novel.scenes[scId] = scene
+        self.ui.set_progress(total, total, _('Reading scenes'))
 
     def _read_chapters(self, root):
-        """Read attributes at chapter level from the xml element tree."""
+        """Read attributes at chapter level from the xml element tree.
+        
+        Each CHAPTER element's children are visited once and dispatched on their tag.
+        Elements whose meaning depends on other elements are evaluated afterwards.
+        """
+
+        def read_fields(chapter, xmlElement):
+            fields = self._index_children(xmlElement)
+            if 'Field_SuppressChapterTitle' in fields:
+                if fields['Field_SuppressChapterTitle'].text == '1':
+                    chapter.suppressChapterTitle = True
+            chapter.isTrash = False
+            if 'Field_IsTrash' in fields:
+                if fields['Field_IsTrash'].text == '1':
+                    chapter.isTrash = True
+            chapter.suppressChapterBreak = False
+            if 'Field_SuppressChapterBreak' in fields:
+                if fields['Field_SuppressChapterBreak'].text == '1':
+                    chapter.suppressChapterBreak = True
+
+            #--- Read chapter custom fields.
+            for fieldName in self.CHP_KWVAR:
+                if fieldName in fields:
+                    chapter.kwVar[fieldName] = fields[fieldName].text
+
+        def read_scenes(chapter, xmlElement):
+            for scn in xmlElement.findall('ScID'):
+                scId = intern_text(scn.text)
+                if scId in self.novel.scenes:
+                    chapter.srtScenes.append(scId)
+
+        handlers = {
+            'Scenes': read_scenes,
+            }
         self.novel.srtChapters = []
         # This is necessary for re-reading.
         for xmlChapter in root.find('CHAPTERS'):
-            chId = xmlChapter.find('ID').text
-            self.novel.chapters[chId] = Chapter()
-            self.novel.srtChapters.append(chId)
+            chapter = Chapter()
+            chapter.suppressChapterTitle = False
 
-            if xmlChapter.find('Title') is not None:
-                self.novel.chapters[chId].title = xmlChapter.find('Title').text
-
-            if xmlChapter.find('Desc') is not None:
-                self.novel.chapters[chId].desc = xmlChapter.find('Desc').text
+            #--- Initialize custom keyword variables.
+            for fieldName in self.CHP_KWVAR:
+                chapter.kwVar[fieldName] = None
 
-            if xmlChapter.find('SectionStart') is not None:
-                self.novel.chapters[chId].chLevel = 1
+            #--- Read chapter's scene list.
+            chapter.srtScenes = []
+
+            xmlElements = {}
+            for xmlElement in xmlChapter:
+                tag = xmlElement.tag
+                if tag == 'Fields':
+                    #--- Read chapter fields.
+                    read_fields(chapter, xmlElement)
+                    continue
+
+                if tag in xmlElements:
+                    # Only the first element of a kind is evaluated.
+                    continue
+
+                xmlElements[tag] = xmlElement
+                attribute = self._CHP_TEXT_TAGS.get(tag, None)
+                if attribute is not None:
+                    setattr(chapter, attribute, xmlElement.text)
+                elif tag in handlers:
+                    handlers[tag](chapter, xmlElement)
+
+            if 'SectionStart' in xmlElements:
+                chapter.chLevel = 1
             else:
-                self.novel.chapters[chId].chLevel = 0
+                chapter.chLevel = 0
 
             # This is how yWriter 7.1.3.0 reads the chapter type:
             #
@@ -1558,65 +1726,48 @@ class Yw7File(File):
             # Todo   | x      | x    | 2           | 2
             # Unused | -1     | x    | x           | 3
 
-            self.novel.chapters[chId].chType = 0
-            if xmlChapter.find('Unused') is not None:
-                yUnused = True
-            else:
-                yUnused = False
-            if xmlChapter.find('ChapterType') is not None:
+            chapter.chType = 0
+            yUnused = 'Unused' in xmlElements
+            if 'ChapterType' in xmlElements:
                 # The file may be created with yWriter version 7.0.7.2+
-                yChapterType = xmlChapter.find('ChapterType').text
+                yChapterType = xmlElements['ChapterType'].text
                 if yChapterType == '2':
-                    self.novel.chapters[chId].chType = 2
+                    chapter.chType = 2
                 elif yChapterType == '1':
-                    self.novel.chapters[chId].chType = 1
+                    chapter.chType = 1
                 elif yUnused:
-                    self.novel.chapters[chId].chType = 3
+                    chapter.chType = 3
             else:
                 # The file may be created with a yWriter version prior to 7.0.7.2
-                if xmlChapter.find('Type') is not None:
-                    yType = xmlChapter.find('Type').text
+                if 'Type' in xmlElements:
+                    yType = xmlElements['Type'].text
                     if yType == '1':
-                        self.novel.chapters[chId].chType = 1
+                        chapter.chType = 1
                     elif yUnused:
-                        self.novel.chapters[chId].chType = 3
+                        chapter.chType = 3
 
-            self.novel.chapters[chId].suppressChapterTitle = False
-            if self.novel.chapters[chId].title is not None:
-                if self.novel.chapters[chId].title.startswith('@'):
-                    self.novel.chapters[chId].suppressChapterTitle = True
+            if chapter.title is not None:
+                if chapter.title.startswith('@'):
+                    chapter.suppressChapterTitle = True
 
-            #--- Initialize custom keyword variables.
-            for fieldName in self.CHP_KWVAR:
-                self.novel.chapters[chId].kwVar[fieldName] = None
+            chId = intern_text(xmlElements['ID'].text)
+            self.novel.chapters[chId] = chapter
+            self.novel.srtChapters.append(chId)
 
-            #--- Read chapter fields.
-            for xmlChapterFields in xmlChapter.findall('Fields'):
-                if xmlChapterFields.find('Field_SuppressChapterTitle') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterTitle').text == '1':
-                        self.novel.chapters[chId].suppressChapterTitle = True
-                self.novel.chapters[chId].isTrash = False
-                if xmlChapterFields.find('Field_IsTrash') is not None:
-                    if xmlChapterFields.find('Field_IsTrash').text == '1':
-                        self.novel.chapters[chId].isTrash = True
-                self.novel.chapters[chId].suppressChapterBreak = False
-                if xmlChapterFields.find('Field_SuppressChapterBreak') is not None:
-                    if xmlChapterFields.find('Field_SuppressChapterBreak').text == '1':
-                        self.novel.chapters[chId].suppressChapterBreak = True
+    def _index_children(self, xmlElement):
+        """Local helper method.
 
-                #--- Read chapter custom fields.
-                for fieldName in self.CHP_KWVAR:
-                    field = xmlChapterFields.find(fieldName)
-                    if field is not None:
-                        self.novel.chapters[chId].kwVar[fieldName] = field.text
+        Positional argument:
+            xmlElement -- xml element whose children are to be indexed.
 
-            #--- Read chapter's scene list.
-            self.novel.chapters[chId].srtScenes = []
-            if xmlChapter.find('Scenes') is not None:
-                for scn in xmlChapter.find('Scenes').findall('ScID'):
-                    scId = scn.text
-                    if scId in self.novel.scenes:
-                        self.novel.chapters[chId].srtScenes.append(scId)
+        Return a dictionary with the element's children by tag.
+        Like find(), the index refers to the first child of a kind.
+        """
+        xmlChildren = {}
+        for xmlChild in xmlElement:
+            if not xmlChild.tag in xmlChildren:
+                xmlChildren[xmlChild.tag] = xmlChild
+        return xmlChildren
 
     def _strip_spaces(self, lines):
         """Local helper method.
@@ -1631,6 +1782,210 @@ class Yw7File(File):
             stripped.append(line.strip())
         return stripped
 
+    def _get_xml_ranges(self, text):
+        """Return the positions of the project's sections and scenes in the xml text.
+        
+        Positional argument:
+            text: str -- content of a .yw7 xml file.
+        
+        Return a tuple of two dictionaries in document order:
+            (key: section tag, value: (start, end) tuple of the section's text)
+            (key: scene ID, value: (start, end) tuple of the scene's text)
+        Return None, if the text's structure is not as expected.
+        """
+
+        def find_tag(tagRegex, pos):
+            """Return the next match of tagRegex, skipping CDATA sections and comments."""
+            while True:
+                match = tagRegex.search(text, pos)
+                if match is None or not match.group().startswith('<!'):
+                    return match
+
+                if match.group() == '<![CDATA[':
+                    pos = text.find(']]>', match.end())
+                else:
+                    pos = text.find('-->', match.end())
+                if pos < 0:
+                    return None
+
+        SKIPPED = r'<!\[CDATA\[|<!--'
+        sectionTag = re.compile(rf'{SKIPPED}|<(/?)(\w+)(\s*/)?>')
+        sceneTag = re.compile(f'{SKIPPED}|<SCENE>|</SCENES>')
+        sceneEndTag = re.compile(f'{SKIPPED}|</SCENE>')
+        sceneId = re.compile(r'\s*<ID>([^<]*)</ID>')
+        sections = {}
+        scenes = {}
+        match = find_tag(sectionTag, 0)
+        if match is None or match.group(2) != 'YWRITER7' or match.group(1) or match.group(3):
+            return None
+
+        while True:
+            match = find_tag(sectionTag, match.end())
+            if match is None:
+                return None
+
+            if match.group(1):
+                break
+
+            tag = match.group(2)
+            start = match.start()
+            if tag in sections:
+                return None
+
+            if match.group(3):
+                # The section is empty.
+                pass
+            elif tag == 'SCENES':
+                while True:
+                    match = find_tag(sceneTag, match.end())
+                    if match is None:
+                        return None
+
+                    if match.group() == '</SCENES>':
+                        break
+
+                    sceneStart = match.start()
+                    idMatch = sceneId.match(text, match.end())
+                    if idMatch is None:
+                        return None
+
+                    match = find_tag(sceneEndTag, idMatch.end())
+                    if match is None:
+                        return None
+
+                    scenes[idMatch.group(1)] = (sceneStart, match.end())
+            else:
+                match = find_tag(re.compile(f'{SKIPPED}|</{tag}>'), match.end())
+                if match is None:
+                    return None
+
+            sections[tag] = (start, match.end())
+        if match.group(2) != 'YWRITER7':
+            return None
+
+        return sections, scenes
+
+    def _stream_element_tree(self):
+        """Write a new .yw7 xml file located at filePath without building an xml element tree.
+        
+        The xml elements are created, written, and discarded one by one,
+        so the memory use does not grow with the project size.
+        Raise the "Error" exception in case of error. 
+        """
+        self._write_xml_stream(self._build_element_tree)
+
+    def _write_dirty_elements(self):
+        """Write the changed elements, and copy the others from the .yw7 xml file located at filePath.
+        
+        Only the changed scenes are rebuilt in the xml element tree.
+        The sections with neither changed elements nor a changed order are copied as a whole,
+        as are the sections unknown to this class.
+        Return True on success. 
+        Return False, if the file does not match the xml element tree, so it has to be written as a whole.
+        Raise the "Error" exception in case of error. 
+        """
+
+        def get_ids(xmlSection):
+            if xmlSection is None:
+                return []
+
+            return [xmlElement.find('ID').text for xmlElement in xmlSection]
+
+        def write_elements(xmlStream):
+            for xmlSection in root:
+                if not xmlSection.tag in dirtySections:
+                    start, end = sectionRanges[xmlSection.tag]
+                    xmlStream.copy_element(text[start:end])
+                    continue
+
+                xmlStream.start_section(xmlSection.tag)
+                for xmlElement in xmlSection:
+                    if xmlSection.tag == 'SCENES':
+                        scId = xmlElement.find('ID').text
+                        if scId in sceneRanges and not self.novel.is_dirty('scenes', scId):
+                            start, end = sceneRanges[scId]
+                            xmlStream.copy_element(text[start:end])
+                            continue
+
+                    xmlStream.write_element(xmlElement)
+                xmlStream.end_section()
+
+        try:
+            with open(self.filePath, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except:
+            return False
+
+        xmlRanges = self._get_xml_ranges(text)
+        if xmlRanges is None:
+            return False
+
+        sectionRanges, sceneRanges = xmlRanges
+        root = self.tree.getroot()
+        if list(sectionRanges) != [xmlSection.tag for xmlSection in root]:
+            return False
+
+        if list(sceneRanges) != get_ids(root.find('SCENES')):
+            return False
+
+        #--- Determine the sections to be rewritten.
+        dirtySections = {'SCENES'}
+        if self.novel.is_dirty('project'):
+            dirtySections.update(('PROJECT', 'PROJECTVARS'))
+        xmlProjectvars = root.find('PROJECTVARS')
+        if xmlProjectvars is not None:
+            numberOfProjectvars = len(xmlProjectvars)
+        for tag, kind, srtIds in (
+                ('LOCATIONS', 'locations', self.novel.srtLocations),
+                ('ITEMS', 'items', self.novel.srtItems),
+                ('CHARACTERS', 'characters', self.novel.srtCharacters),
+                ('PROJECTNOTES', 'projectNotes', self.novel.srtPrjNotes),
+                ('CHAPTERS', 'chapters', self.novel.srtChapters),
+                ):
+            if self.novel.is_dirty(kind) or get_ids(root.find(tag)) != list(srtIds):
+                dirtySections.add(tag)
+
+        self._build_element_tree()
+        if xmlProjectvars is None or len(xmlProjectvars) != numberOfProjectvars:
+            # Project variables for new languages have been added.
+            dirtySections.add('PROJECTVARS')
+        self._write_xml_stream(write_elements)
+        return True
+
+    def _write_xml_stream(self, write_elements):
+        """Write the .yw7 xml file located at filePath with a Yw7Stream instance.
+        
+        Positional argument:
+            write_elements -- function that takes the Yw7Stream instance and writes the project's sections.
+        
+        Keep a backup of an existing file, and restore it in case of failure.
+        Raise the "Error" exception in case of error. 
+        """
+        backedUp = False
+        if os.path.isfile(self.filePath):
+            try:
+                os.replace(self.filePath, f'{self.filePath}.bak')
+            except:
+                raise Error(f'{_("Cannot overwrite file")}: "{norm_path(self.filePath)}".')
+            else:
+                backedUp = True
+        xmlStream = Yw7Stream(self.filePath, self._postprocess_xml_text)
+        try:
+            xmlStream.open()
+            try:
+                write_elements(xmlStream)
+            finally:
+                xmlStream.close()
+        except Exception as ex:
+            if backedUp:
+                os.replace(f'{self.filePath}.bak', self.filePath)
+            elif os.path.isfile(self.filePath):
+                os.remove(self.filePath)
+            if isinstance(ex, Error):
+                raise
+
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}".')
+
     def _write_element_tree(self, ywProject):
         """Write back the xml element tree to a .yw7 xml file located at filePath.
         
@@ -1644,6 +1999,7 @@ class Yw7File(File):
                 raise Error(f'{_("Cannot overwrite file")}: "{norm_path(ywProject.filePath)}".')
             else:
                 backedUp = True
+        indent(ywProject.tree.getroot())
         try:
             ywProject.tree.write(ywProject.filePath, xml_declaration=False, encoding='utf-8')
         except:
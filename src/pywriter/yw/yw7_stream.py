@@ -0,0 +1,110 @@
+"""Provide a class for writing new yWriter 7 xml files element by element.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/PyWriter
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import xml.etree.ElementTree as ET
+from pywriter.yw.xml_indent import indent
+
+
+class Yw7Stream:
+    """Forward-only writer for a new yWriter 7 xml file.
+
+    Public methods:
+        open() -- open the file and write the header.
+        start_section(tag) -- begin a section of the project, e.g. 'SCENES'.
+        write_element(xmlElement) -- serialize a complete xml subtree.
+        copy_element(xmlText) -- write the source text of an xml subtree.
+        end_section() -- finish the current section.
+        close() -- write the closing root tag and close the file.
+
+    Each subtree is indented, serialized, and postprocessed on its own,
+    so only one element is held in memory at a time. The output equals
+    the output of the indented element tree written by Yw7File.
+    """
+    _ROOT_TAG = 'YWRITER7'
+    _LONG_EMPTY_TAGS = ('CHAPTERS',)
+    # yWriter fails to parse the file if the chapters are written as short empty element.
+
+    def __init__(self, filePath, postprocess):
+        """Initialize instance variables.
+
+        Positional arguments:
+            filePath -- str: path to the xml file.
+            postprocess -- function that takes and returns an xml text
+                           (inserting the CDATA tags and unescaping the entities).
+        """
+        self._filePath = filePath
+        self._postprocess = postprocess
+        self._file = None
+        self._sectionTag = None
+        self._isSectionEmpty = True
+
+    def open(self):
+        """Open the file and write the header."""
+        self._file = open(self._filePath, 'w', encoding='utf-8')
+        self._file.write(f'<?xml version="1.0" encoding="utf-8"?>\n<{self._ROOT_TAG}>\n')
+
+    def start_section(self, tag):
+        """Begin a section of the project.
+
+        Positional arguments:
+            tag -- str: xml tag of the section.
+
+        The opening tag is deferred, because empty sections are written as a single tag.
+        """
+        self._sectionTag = tag
+        self._isSectionEmpty = True
+
+    def write_element(self, xmlElement):
+        """Serialize a complete xml subtree.
+
+        Positional arguments:
+            xmlElement -- xml element to be written, either into the current section or at project level.
+        """
+        level = self._write_indentation()
+        indent(xmlElement, level)
+        xmlElement.tail = '\n'
+        self._file.write(self._postprocess(ET.tostring(xmlElement, encoding='unicode')))
+
+    def copy_element(self, xmlText):
+        """Write the source text of an xml subtree.
+
+        Positional arguments:
+            xmlText -- str: the element as read from an xml file, from the opening to the closing tag.
+        """
+        self._write_indentation()
+        self._file.write(f'{xmlText}\n')
+
+    def end_section(self):
+        """Finish the current section."""
+        if not self._isSectionEmpty:
+            self._file.write(f'  </{self._sectionTag}>\n')
+        elif self._sectionTag in self._LONG_EMPTY_TAGS:
+            self._file.write(f'  <{self._sectionTag}></{self._sectionTag}>\n')
+        else:
+            self._file.write(f'  <{self._sectionTag} />\n')
+        self._sectionTag = None
+
+    def _write_indentation(self):
+        """Open the current section, if needed, and indent the next element.
+        
+        Return the element's nesting level.
+        """
+        if self._sectionTag is None:
+            level = 1
+        else:
+            level = 2
+            if self._isSectionEmpty:
+                self._file.write(f'  <{self._sectionTag}>\n')
+                self._isSectionEmpty = False
+        self._file.write('  ' * level)
+        return level
+
+    def close(self):
+        """Write the closing root tag and close the file."""
+        try:
+            self._file.write(f'</{self._ROOT_TAG}>\n')
+        finally:
+            self._file.close()
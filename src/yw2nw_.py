@@ -8,11 +8,7 @@ For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import argparse
-from pathlib import Path
-from pywriter.ui.ui import Ui
-from pywriter.ui.ui_cmd import UiCmd
-from yw2nwlib.nw_configuration import NwConfiguration
-from yw2nwlib.nw_converter import NwConverter
+import sys
 
 SUFFIX = ''
 APPNAME = 'yw2nw'
@@ -39,7 +35,15 @@ OPTIONS = dict(
 )
 
 
-def run(sourcePath, doubleLinebreaks=False, silentMode=True, installDir='.'):
+def run(sourcePath, doubleLinebreaks=False, silentMode=True, installDir='.', cacheDir=None, jobs=1, sync=False):
+    # Import the converter only when needed, so that e.g. "--help" starts quickly.
+    from pywriter.file.novel_cache import NovelCache
+    from pywriter.ui.ui import Ui
+    from pywriter.ui.ui_cmd import UiCmd
+    from yw2nwlib.nw_configuration import NwConfiguration
+    from yw2nwlib.nw_converter import NwConverter
+    from yw2nwlib.nwd_cache import NwdCache
+
     if silentMode:
         ui = Ui('')
     else:
@@ -60,13 +64,67 @@ def run(sourcePath, doubleLinebreaks=False, silentMode=True, installDir='.'):
     if doubleLinebreaks:
         kwargs['double_linebreaks'] = True
 
-    converter = NwConverter()
-    converter.ui = ui
-    converter.run(sourcePath, **kwargs)
+    # Reuse already parsed projects, if a cache directory is given.
+    if cacheDir is not None:
+        kwargs['novel_cache'] = NovelCache(cacheDir)
+        kwargs['nwd_cache'] = NwdCache(cacheDir)
+
+    # Convert the scene contents in parallel, if more than one job is given.
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        kwargs['convert_executor'] = ProcessPoolExecutor(jobs)
+    try:
+        converter = NwConverter()
+        converter.ui = ui
+        if sync:
+            converter.run_sync(sourcePath, **kwargs)
+        else:
+            converter.run(sourcePath, **kwargs)
+    finally:
+        if jobs > 1:
+            kwargs['convert_executor'].shutdown()
     ui.start()
 
 
-if __name__ == '__main__':
+def validate(sourcePath, silentMode=True):
+    """Verify the content files of a novelWriter project against the manifest written by yw2nw.
+
+    Positional arguments:
+        sourcePath -- str: path of the .nwx file.
+
+    Optional arguments:
+        silentMode -- bool: if True, don't print the result.
+
+    Return True, if all content files match the manifest.
+    """
+    import os
+    from pywriter.pywriter_globals import Error
+    from pywriter.ui.ui import Ui
+    from pywriter.ui.ui_cmd import UiCmd
+    from yw2nwlib.nw_manifest import NwManifest
+
+    if silentMode:
+        ui = Ui('')
+    else:
+        ui = UiCmd('Converter between yWriter and novelWriter @release')
+    manifest = NwManifest(f'{os.path.dirname(os.path.abspath(sourcePath))}/content')
+    ui.set_info_what(f'Validate "{manifest.filePath}"')
+    try:
+        manifest.read()
+    except Error as ex:
+        ui.set_info_how(f'!{str(ex)}')
+        return False
+
+    problems = manifest.validate()
+    if problems:
+        ui.set_info_how('!{}'.format('\n'.join(problems)))
+        return False
+
+    ui.set_info_how(f'{len(manifest.entries)} content files match the manifest.')
+    return True
+
+
+def main():
     parser = argparse.ArgumentParser(
         description='Converter between yWriter and novelWriter',
         epilog='')
@@ -79,10 +137,35 @@ if __name__ == '__main__':
     parser.add_argument('--silent',
                         action="store_true",
                         help='suppress error messages and the request to confirm overwriting')
+    parser.add_argument('--no-cache',
+                        action="store_true",
+                        help='always parse the source files instead of reusing previously parsed data')
+    parser.add_argument('-j', '--jobs',
+                        type=int,
+                        default=1,
+                        help='number of processes converting the scene contents to novelWriter')
+    parser.add_argument('--validate',
+                        action="store_true",
+                        help='verify the content files of a novelWriter project against the manifest written by yw2nw')
+    parser.add_argument('--sync',
+                        action="store_true",
+                        help='apply the changes made since the last conversion to the other project instead of converting')
     args = parser.parse_args()
+    if args.validate:
+        sys.exit(not validate(args.sourcePath, args.silent))
+
+    from pathlib import Path
     try:
         homeDir = str(Path.home()).replace('\\', '/')
         installDir = f'{homeDir}/.pywriter/{APPNAME}/config'
+        cacheDir = f'{homeDir}/.pywriter/{APPNAME}/cache'
     except:
         installDir = '.'
-    run(args.sourcePath, args.double_linebreaks, args.silent, installDir)
+        cacheDir = None
+    if args.no_cache:
+        cacheDir = None
+    run(args.sourcePath, args.double_linebreaks, args.silent, installDir, cacheDir, args.jobs, args.sync)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,7 +18,7 @@ class Handles:
 
     def __init__(self):
         """Initialize the list of handles."""
-        self._handles = []
+        self._handles = set()
 
     def has_member(self, handle):
         """Return True if handle is in the list of handles."""
@@ -40,7 +40,7 @@ class Handles:
             if not c in self.HANDLE_CHARS:
                 return False
 
-        self._handles.append(handle)
+        self._handles.add(handle)
         return True
 
     def create_member(self, text):
@@ -18,6 +18,8 @@ class NwConverter(YwCnvUi):
     
     Public methods:
         run(sourcePath, **kwargs) -- Create source and target objects and run conversion.
+        run_async(sourcePath, **kwargs) -- Coroutine: run the conversion without blocking the event loop.
+        run_sync(sourcePath, **kwargs) -- Synchronize a yWriter project and the novelWriter project converted from it.
     """
 
     def export_from_yw(self, source, target):
@@ -67,10 +69,177 @@ class NwConverter(YwCnvUi):
 
         Overrides the superclass method.
         """
+        files = self._prepare_conversion(sourcePath, **kwargs)
+        if files is None:
+            return
+
+        sourceFile, targetFile = files
+        if sourceFile.EXTENSION == Yw7File.EXTENSION:
+            self.export_from_yw(sourceFile, targetFile)
+        else:
+            self.create_yw7(sourceFile, targetFile)
+
+    def run_sync(self, sourcePath, **kwargs):
+        """Synchronize a yWriter project and the novelWriter project converted from it.
+
+        Positional arguments: 
+            sourcePath -- str: the path of either the .yw7 file or the .nwx file.
+        
+        Required keyword arguments: 
+            (see NwxFile)
+
+        Apply the changes made since the last conversion or synchronization to the other project.
+        Report the conflicts and the changes that require a full conversion.
+        """
+        from yw2nwlib.nw_sync import NwSync
+
         if not os.path.isfile(sourcePath):
             self.ui.set_info_how(f'!File "{norm_path(sourcePath)}" not found.')
             return
 
+        fileName, fileExtension = os.path.splitext(sourcePath.replace('\\', '/'))
+        srcDir = os.path.dirname(sourcePath).replace('\\', '/')
+        if not srcDir:
+            srcDir = '.'
+        srcDir = f'{srcDir}/'
+
+        # The novelWriter project must be read completely, so don't take it from the cache.
+        nwKwargs = dict(kwargs)
+        nwKwargs.pop('novel_cache', None)
+        if fileExtension == Yw7File.EXTENSION:
+            ywPath = sourcePath
+            nwFile = NwxFile(f'{fileName}.nw/nwProject{NwxFile.EXTENSION}', **nwKwargs)
+        elif fileExtension == NwxFile.EXTENSION:
+            nwFile = NwxFile(sourcePath, **nwKwargs)
+            ywPath = self._get_yw7_path(nwFile, srcDir)
+        else:
+            self.ui.set_info_how(f'!File type of "{norm_path(sourcePath)}" not supported.')
+            return
+
+        self.ui.set_info_what(f'{_("Synchronize")} "{norm_path(ywPath)}" {_("and")} "{norm_path(nwFile.filePath)}"')
+        if os.path.isfile(f'{os.path.dirname(nwFile.filePath)}/nwProject.lock'):
+            self.ui.set_info_how(f'!Please exit novelWriter.')
+            return
+
+        for filePath in (ywPath, nwFile.filePath):
+            if not os.path.isfile(filePath):
+                self.ui.set_info_how(f'!File "{norm_path(filePath)}" not found.')
+                return
+
+        ywFile = Yw7File(ywPath, **kwargs)
+        ywFile.ui = self.ui
+        nwFile.ui = self.ui
+        sync = NwSync(ywFile, nwFile)
+        try:
+            sync.run()
+        except Error as ex:
+            self.ui.set_info_how(f'!{str(ex)}')
+            return
+
+        messages = [
+            f'{len(sync.toNovelWriter)} {_("content files updated from yWriter")}.',
+            f'{len(sync.toYw)} {_("content files taken over into yWriter")}.',
+            ]
+        if sync.conflicts:
+            messages.append(f'{_("Conflicts, not synchronized")}:')
+            messages.extend(sync.conflicts)
+        if sync.structuralChanges:
+            messages.append(f'{_("Changes requiring a full conversion")}:')
+            messages.extend(sync.structuralChanges)
+        self.ui.set_info_how('\n'.join(messages))
+
+    async def run_async(self, sourcePath, **kwargs):
+        """Create source and target objects and run conversion without blocking the event loop.
+
+        Positional arguments: 
+            sourcePath -- str: the source file path.
+        
+        Required keyword arguments: 
+            (see NwxFile)
+
+        Each step of the conversion runs in the event loop's default executor.
+        The novelWriter content files are read and written concurrently by a thread pool.
+        Use a UiAsync instance as ui to receive the messages in the event loop.
+        
+        Cancelling the task stops the conversion before the next step. 
+        A step already running is completed, but its result is discarded.
+        Errors other than the "Error" exception propagate out of the task.
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        import functools
+
+        loop = asyncio.get_running_loop()
+        ioExecutor = ThreadPoolExecutor()
+        kwargs['io_executor'] = ioExecutor
+        try:
+            files = await loop.run_in_executor(None, functools.partial(self._prepare_conversion, sourcePath, **kwargs))
+            if files is None:
+                return
+
+            sourceFile, targetFile = files
+            await self._convert_async(loop, sourceFile, targetFile)
+        finally:
+            ioExecutor.shutdown(wait=False)
+
+    async def _convert_async(self, loop, source, target):
+        """Convert source into target, awaiting each step in the default executor.
+
+        Positional arguments:
+            loop -- the running event loop.
+            source -- Yw7File or NwxFile instance.
+            target -- NwxFile or Yw7File instance.
+
+        This is the asynchronous equivalent of export_from_yw() and create_yw7().
+        """
+        import asyncio
+
+        if source.EXTENSION == Yw7File.EXTENSION:
+            self.ui.set_info_what(
+                _('Input: {0} "{1}"\nOutput: {2} "{3}"').format(source.DESCRIPTION, norm_path(source.filePath), target.DESCRIPTION, norm_path(target.filePath)))
+        else:
+            self.ui.set_info_what(
+                _('Create a yWriter project file from {0}\nNew project: "{1}"').format(source.DESCRIPTION, norm_path(target.filePath)))
+            if os.path.isfile(target.filePath):
+                self.ui.set_info_how(f'!{_("File already exists")}: "{norm_path(target.filePath)}".')
+                return
+
+        try:
+            await loop.run_in_executor(None, self.check, source, target)
+            source.novel = Novel()
+            await loop.run_in_executor(None, source.read)
+            if source.EXTENSION == Yw7File.EXTENSION:
+                remove_language_tags(source.novel)
+            target.novel = source.novel
+            await loop.run_in_executor(None, target.write)
+        except asyncio.CancelledError:
+            self.newFile = None
+            self.ui.set_info_how(f'!{_("Action canceled by user")}.')
+            raise
+
+        except Error as ex:
+            self.newFile = None
+            self.ui.set_info_how(f'!{str(ex)}')
+        else:
+            self.newFile = target.filePath
+            self.ui.set_info_how(f'{_("File written")}: "{norm_path(target.filePath)}".')
+
+    def _prepare_conversion(self, sourcePath, **kwargs):
+        """Create the source and target objects.
+
+        Positional arguments: 
+            sourcePath -- str: the source file path.
+        
+        Required keyword arguments: 
+            (see NwxFile)
+
+        Back up an existing target project, if any.
+        Return a (sourceFile, targetFile) tuple, or None if the conversion is not possible.
+        """
+        if not os.path.isfile(sourcePath):
+            self.ui.set_info_how(f'!File "{norm_path(sourcePath)}" not found.')
+            return None
+
         fileName, fileExtension = os.path.splitext(sourcePath.replace('\\', '/'))
         srcDir = os.path.dirname(sourcePath).replace('\\', '/')
         if not srcDir:
@@ -82,7 +251,7 @@ class NwConverter(YwCnvUi):
             prjDir = f'{srcDir}{title}.nw'
             if os.path.isfile('{prjDir}/nwProject.lock'):
                 self.ui.set_info_how(f'!Please exit novelWriter.')
-                return
+                return None
 
             try:
                 os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
@@ -94,35 +263,53 @@ class NwConverter(YwCnvUi):
                     i += 1
                     if i > 999:
                         self.ui.set_info_how(f'!Unable to back up the project.')
-                        return
+                        return None
 
                 os.replace(prjDir, f'{prjDir}{extension}')
                 self.ui.set_info_what(f'Backup folder "{norm_path(prjDir)}{extension}" saved.')
                 os.makedirs(f'{prjDir}{NwxFile.CONTENT_DIR}')
             targetFile = NwxFile(f'{prjDir}/nwProject.nwx', **kwargs)
-            self.export_from_yw(sourceFile, targetFile)
+            sourceFile.ui = self.ui
+            targetFile.ui = self.ui
+            return sourceFile, targetFile
+
         elif fileExtension == NwxFile.EXTENSION:
             sourceFile = NwxFile(sourcePath, **kwargs)
-            prjDir = f'{srcDir}/../'
-            sourceFile.read_xml_file()
-            root = sourceFile._tree.getroot()
-            prj = root.find('project')
-            if prj.find('title') is not None:
-                title = prj.find('title').text
-            elif prj.find('name') is not None:
-                title = prj.find('name').text
-            else:
-                title = 'NewProject'
-            fileName = f'{prjDir}{title}{Yw7File.EXTENSION}'
+            fileName = self._get_yw7_path(sourceFile, srcDir)
             if os.path.isfile(fileName):
                 if self._confirm_overwrite(fileName):
                     os.replace(fileName, f'{fileName}.bak')
                     self.ui.set_info_what(f'Backup file "{norm_path(fileName)}.bak" saved.')
                 else:
                     self.ui.set_info_what('Action canceled by user.')
-                    return
+                    return None
 
             targetFile = Yw7File(fileName, **kwargs)
-            self.create_yw7(sourceFile, targetFile)
+            sourceFile.ui = self.ui
+            targetFile.ui = self.ui
+            return sourceFile, targetFile
+
         else:
             self.ui.set_info_how(f'!File type of "{norm_path(sourcePath)}" not supported.')
+            return None
+
+    def _get_yw7_path(self, nwxFile, srcDir):
+        """Return the path of the yWriter project belonging to a novelWriter project.
+
+        Positional arguments:
+            nwxFile -- NwxFile instance.
+            srcDir -- str: the novelWriter project's directory, ending with a slash.
+
+        The yWriter project is located next to the novelWriter project directory.
+        """
+        prjDir = f'{srcDir}/../'
+        nwxFile.read_xml_file()
+        root = nwxFile._tree.getroot()
+        prj = root.find('project')
+        if prj.find('title') is not None:
+            title = prj.find('title').text
+        elif prj.find('name') is not None:
+            title = prj.find('name').text
+        else:
+            title = 'NewProject'
+        return f'{prjDir}{title}{Yw7File.EXTENSION}'
@@ -0,0 +1,167 @@
+"""Provide a class for the novelWriter index cache generated by yw2nw.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+import os
+from pywriter.pywriter_globals import *
+from yw2nwlib.nwd_file import NwdFile
+
+
+class NwIndex:
+    """novelWriter tag and heading index, stored in the project's meta directory.
+
+    Public methods:
+        add_item(handle, itemClass, text) -- index a content file and return its counts.
+        write() -- write the index file.
+        remove() -- remove the index file, if any.
+
+    Public instance variables:
+        filePath -- str: path to the index file.
+        tagsIndex -- dict: (key: tag; value: dict with the handle, heading, and class of the tagged item).
+        itemIndex -- dict: (key: item handle; value: dict with the headings and references of the item).
+
+    The index file has the format of novelWriter 2.0, so novelWriter
+    doesn't need to scan all content files when opening the project.
+    Headings are identified by title keys: "T0001" for the first heading
+    of a file, "T0002" for the second one, and so on; "T0000" stands for
+    the text before the first heading. The line numbers don't include
+    the file's meta data lines.
+    """
+    META_DIR = '/meta/'
+    FILE_NAME = 'index.json'
+    HEADING_LEVELS = {
+        '#': 'H1',
+        '##': 'H2',
+        '###': 'H3',
+        '####': 'H4',
+        '#!': 'H1',
+        '##!': 'H2',
+        '###!': 'H3',
+        }
+    REFERENCE_KEYWORDS = (
+        '@pov',
+        '@focus',
+        '@char',
+        '@plot',
+        '@time',
+        '@location',
+        '@object',
+        '@entity',
+        '@custom',
+        )
+
+    def __init__(self, prjDir):
+        """Initialize instance variables.
+
+        Positional arguments:
+            prjDir -- str: path to the novelWriter project directory.
+        """
+        self.filePath = f'{prjDir}{self.META_DIR}{self.FILE_NAME}'
+        self.tagsIndex = {}
+        self.itemIndex = {}
+
+    def add_item(self, handle, itemClass, text):
+        """Index a content file and return its (characters, words, paragraphs) tuple.
+
+        Positional arguments:
+            handle -- str: novelWriter item handle.
+            itemClass -- str: item class (NOVEL/CHARACTER/WORLD/OBJECT).
+            text -- str: the content file's text, including the meta data lines.
+
+        Count the headings' sections like NwdFile.count_text() does.
+        The counts of the whole file are the sums of the sections' counts.
+        """
+
+        def add_heading(titleKey, level, title, lineNumber):
+            headings[titleKey] = dict(
+                level=level,
+                title=title,
+                line=lineNumber,
+                tag='',
+                cCount=0,
+                wCount=0,
+                pCount=0,
+                synopsis='',
+                )
+
+        def count_section():
+            counts = NwdFile.count_text('\n'.join(sectionLines))
+            if titleKey in headings:
+                heading = headings[titleKey]
+                heading['cCount'], heading['wCount'], heading['pCount'] = counts
+            for i in range(3):
+                totals[i] += counts[i]
+
+        lines = text.split('\n')
+        firstLine = 0
+        while firstLine < len(lines) and lines[firstLine].startswith('%%~'):
+            firstLine += 1
+        headings = {}
+        references = {}
+        totals = [0, 0, 0]
+        titleKey = 'T0000'
+        sectionLines = []
+        for lineNumber, line in enumerate(lines[firstLine:], 1):
+            if line.startswith('#'):
+                marker, separator, title = line.rstrip().partition(' ')
+                level = self.HEADING_LEVELS.get(marker, None)
+                if level is not None and separator:
+                    count_section()
+                    titleKey = f'T{len(headings) + 1:04d}'
+                    add_heading(titleKey, level, title.strip(), lineNumber)
+                    sectionLines = []
+            elif line.startswith('@'):
+                keyword, __, values = line.partition(':')
+                keyword = keyword.strip()
+                tags = [value.strip() for value in values.split(',') if value.strip()]
+                if not titleKey in headings:
+                    # Keywords before the first heading refer to the file.
+                    add_heading(titleKey, 'H0', '', 0)
+                if keyword == '@tag' and tags:
+                    headings[titleKey]['tag'] = tags[0]
+                    self.tagsIndex[tags[0]] = {'name': tags[0], 'handle': handle, 'heading': titleKey, 'class': itemClass}
+                elif keyword in self.REFERENCE_KEYWORDS:
+                    headingReferences = references.setdefault(titleKey, {})
+                    for tag in tags:
+                        keywords = headingReferences.get(tag, None)
+                        if keywords is None:
+                            headingReferences[tag] = keyword
+                        elif not keyword in keywords.split(','):
+                            headingReferences[tag] = f'{keywords},{keyword}'
+            elif line.startswith('%') and titleKey in headings:
+                comment = line[1:].strip()
+                if comment.lower().startswith('synopsis:'):
+                    headings[titleKey]['synopsis'] = comment[9:].strip()
+            sectionLines.append(line)
+        count_section()
+        itemData = dict(headings=headings)
+        if references:
+            itemData['references'] = references
+        self.itemIndex[handle] = itemData
+        return tuple(totals)
+
+    def write(self):
+        """Write the index file.
+
+        Raise the "Error" exception in case of error.
+        """
+        index = {
+            'novelWriter.tagsIndex': self.tagsIndex,
+            'novelWriter.itemIndex': self.itemIndex,
+            }
+        try:
+            os.makedirs(os.path.dirname(self.filePath), exist_ok=True)
+            with open(self.filePath, 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+        except:
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}".')
+
+    def remove(self):
+        """Remove the index file, if any, so novelWriter rebuilds the index."""
+        try:
+            os.remove(self.filePath)
+        except FileNotFoundError:
+            pass
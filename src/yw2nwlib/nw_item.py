@@ -19,7 +19,7 @@ class NwItem:
         nwLayout -- str: layout (DOCUMENT/NOTE).
         nwCharCount -- int: character count.
         nwWordCount -- int: word count.
-        nwParaCount -- (not used for conversion).
+        nwParaCount -- int: paragraph count.
         nwCursorPos -- (not used for conversion).
         nwHandle -- str: this item's handle.
         nwOrder -- int: sort order.
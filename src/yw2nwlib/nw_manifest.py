@@ -0,0 +1,142 @@
+"""Provide a class for the manifest of the novelWriter content files generated by yw2nw.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import json
+import os
+from hashlib import sha256
+from pywriter.pywriter_globals import *
+
+
+class NwManifest:
+    """Content hash manifest, stored in the project's content directory.
+
+    Public methods:
+        add_entry(handle, kind, elemId, contentHash, fileHash) -- add the entry of a content file.
+        read() -- read the manifest file.
+        write() -- write the manifest file.
+        validate(executor) -- return a list of differences between the manifest and the content files.
+        get_text_hash(text) -- Static method: return the hash of a content file's text.
+        get_file_hash(filePath) -- Static method: return the hash of a content file.
+
+    Public instance variables:
+        filePath -- str: path to the manifest file.
+        entries -- dict: (key: item handle; value: dict with the entry fields).
+
+    Entry fields:
+        kind -- str: kind of the source element: 'chapters', 'scenes', 'characters', 'locations', or 'items'.
+        id -- str: ID of the source element.
+        contentHash -- str: NovelDiff fingerprint of the source element.
+        fileHash -- str: SHA-256 hash of the generated content file.
+
+    Line breaks are normalized before hashing a file, so the hashes don't depend on the platform.
+    """
+    FILE_NAME = '.yw2nw-manifest.json'
+    FORMAT_VERSION = 1
+
+    def __init__(self, contentDir):
+        """Initialize instance variables.
+
+        Positional arguments:
+            contentDir -- str: path to the novelWriter project's content directory.
+        """
+        self._contentDir = contentDir
+        self.filePath = f'{contentDir}/{self.FILE_NAME}'
+        self.entries = {}
+
+    def add_entry(self, handle, kind, elemId, contentHash, fileHash):
+        """Add the entry of a content file.
+
+        Positional arguments:
+            handle -- str: novelWriter item handle.
+            kind -- str: kind of the source element.
+            elemId -- str: ID of the source element.
+            contentHash -- str: fingerprint of the source element.
+            fileHash -- str: hash of the generated content file.
+        """
+        self.entries[handle] = dict(kind=kind, id=elemId, contentHash=contentHash, fileHash=fileHash)
+
+    def read(self):
+        """Read the manifest file.
+
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            with open(self.filePath, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except:
+            raise Error(f'{_("Cannot read file")}: "{norm_path(self.filePath)}".')
+
+        if manifest.get('version', None) != self.FORMAT_VERSION:
+            raise Error(f'{_("Unsupported manifest version")}: "{norm_path(self.filePath)}".')
+
+        self.entries = manifest['items']
+
+    def write(self):
+        """Write the manifest file.
+
+        Raise the "Error" exception in case of error.
+        """
+        manifest = dict(version=self.FORMAT_VERSION, items=self.entries)
+        try:
+            with open(self.filePath, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+        except:
+            raise Error(f'{_("Cannot write file")}: "{norm_path(self.filePath)}".')
+
+    def validate(self, executor=None):
+        """Return a list of differences between the manifest and the content files.
+
+        Optional arguments:
+            executor -- concurrent.futures.Executor for hashing the files concurrently.
+
+        Without an executor, a thread pool is used.
+        Return an empty list, if all content files match the manifest.
+        """
+
+        def check_file(handle):
+            filePath = f'{self._contentDir}/{handle}.nwd'
+            try:
+                fileHash = self.get_file_hash(filePath)
+            except FileNotFoundError:
+                return f'{_("Missing file")}: "{handle}.nwd".'
+
+            except:
+                return f'{_("Cannot read file")}: "{handle}.nwd".'
+
+            if fileHash != self.entries[handle]['fileHash']:
+                return f'{_("Modified file")}: "{handle}.nwd".'
+
+            return None
+
+        handles = list(self.entries)
+        if executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor() as threadPool:
+                results = list(threadPool.map(check_file, handles))
+        else:
+            results = list(executor.map(check_file, handles))
+        problems = [result for result in results if result is not None]
+        try:
+            fileNames = sorted(os.listdir(self._contentDir))
+        except:
+            fileNames = []
+        for fileName in fileNames:
+            handle, extension = os.path.splitext(fileName)
+            if extension == '.nwd' and not handle in self.entries:
+                problems.append(f'{_("File not in manifest")}: "{fileName}".')
+        return problems
+
+    @staticmethod
+    def get_text_hash(text):
+        """Return the hash of a content file's text."""
+        return sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def get_file_hash(filePath):
+        """Return the hash of a content file, with the line breaks normalized."""
+        with open(filePath, 'rb') as f:
+            data = f.read()
+        return sha256(data.replace(b'\r\n', b'\n')).hexdigest()
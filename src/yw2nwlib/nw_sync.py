@@ -0,0 +1,342 @@
+"""Provide a class for the incremental synchronization of yWriter and novelWriter projects.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+from pywriter.pywriter_globals import *
+from pywriter.model.novel import Novel
+from pywriter.model.novel_diff import NovelDiff
+from pywriter.yw.yw7_purge import remove_language_tags
+from yw2nwlib.nw_index import NwIndex
+from yw2nwlib.nw_manifest import NwManifest
+from yw2nwlib.nwd_character_file import NwdCharacterFile
+from yw2nwlib.nwd_novel_file import NwdNovelFile
+from yw2nwlib.nwd_object_file import NwdObjectFile
+from yw2nwlib.nwd_world_file import NwdWorldFile
+from yw2nwlib.nwx_file import NwxFile
+
+
+class NwSync:
+    """Two-way incremental synchronization of a yWriter project and a novelWriter project.
+
+    Public methods:
+        run() -- synchronize the projects.
+
+    Public instance variables:
+        ywFile -- Yw7File instance: the yWriter project.
+        nwFile -- NwxFile instance: the novelWriter project.
+        toNovelWriter -- list of str: handles of the content files updated from the yWriter project.
+        toYw -- list of str: handles of the content files taken over into the yWriter project.
+        conflicts -- list of str: messages about elements changed in both projects.
+        structuralChanges -- list of str: messages about changes that require a full conversion.
+
+    The manifest written with the novelWriter project holds the synchronization state:
+    the fingerprints of the yWriter elements and the hashes of the content files
+    at the last conversion or synchronization. An element changed in one project
+    is updated in the other one. Elements changed in both projects are left as they are.
+
+    Only the element properties held by the content files are synchronized.
+    Adding, deleting, or moving elements, and the novelWriter item status
+    and importance require a full conversion.
+    """
+    _FIELDS = dict(
+        chapters=('title', 'desc'),
+        scenes=('title', 'desc', 'sceneContent', 'tags', 'appendToPrev'),
+        characters=('title', 'aka', 'tags', 'desc', 'bio', 'goals', 'notes'),
+        locations=('title', 'aka', 'tags', 'desc'),
+        items=('title', 'aka', 'tags', 'desc'),
+        )
+    # Element properties read from the content files.
+    _REFERENCES = ('characters', 'locations', 'items')
+    # Scene properties referring to other elements.
+
+    def __init__(self, ywFile, nwFile):
+        """Initialize instance variables.
+
+        Positional arguments:
+            ywFile -- Yw7File instance: the yWriter project.
+            nwFile -- NwxFile instance: the novelWriter project.
+
+        Both instances must have a ui.
+        """
+        self.ywFile = ywFile
+        self.nwFile = nwFile
+        self.toNovelWriter = []
+        self.toYw = []
+        self.conflicts = []
+        self.structuralChanges = []
+
+    def run(self):
+        """Synchronize the projects.
+
+        Raise the "Error" exception in case of error.
+        """
+
+        def read_content_files(handles):
+            """Parse the content files and return a dict (key: handle; value: element read)."""
+            self.nwFile.read_content_files(handles)
+            nwElements = {}
+            for handle in handles:
+                kind = manifest.entries[handle]['kind']
+                elements = self.nwFile.itemElements[handle]
+                if len(elements) != 1 or elements[0][0] != kind:
+                    self.structuralChanges.append(f'{_("Content file restructured in novelWriter")}: "{handle}.nwd".')
+                    unmapped.add(handle)
+                else:
+                    nwElements[handle] = getattr(self.nwFile.novel, kind)[elements[0][1]]
+            return nwElements
+
+        def get_nw_title(title):
+            """Return the title of a yWriter element as read back from novelWriter."""
+            if title:
+                return title.replace('_', ' ')
+
+            return title
+
+        manifest = NwManifest(f'{os.path.dirname(self.nwFile.filePath)}{NwxFile.CONTENT_DIR}'.rstrip('/'))
+        manifest.read()
+        self.toNovelWriter = []
+        self.toYw = []
+        self.conflicts = []
+        self.structuralChanges = []
+
+        #--- Read the yWriter project.
+        self.ywFile.novel = Novel()
+        self.ywFile.read()
+        ywNovel = self.ywFile.novel
+
+        # Track the changes, so only the changed elements are rewritten.
+        ywNovel.set_clean()
+
+        # Compare the scene contents as exported, but keep the language tags in the yWriter project.
+        rawContents = {}
+        for scId in ywNovel.scenes:
+            rawContents[scId] = ywNovel.scenes[scId].sceneContent
+        remove_language_tags(ywNovel)
+
+        #--- Compare the project structures with the state of the last synchronization.
+        # The novelWriter items are arranged in the order of the yWriter elements they were converted from.
+        handlesById = {}
+        for handle, entry in manifest.entries.items():
+            handlesById[(entry['kind'], entry['id'])] = handle
+        unmapped = set()
+        self.nwFile.novel = Novel()
+        self.nwFile.read_content_files(())
+        nwSequence = []
+        for handle in self.nwFile.nwItems:
+            entry = manifest.entries.get(handle, None)
+            if entry is None:
+                self.structuralChanges.append(f'{_("Content file added in novelWriter")}: "{handle}.nwd".')
+            else:
+                nwSequence.append((entry['kind'], entry['id']))
+        for handle in manifest.entries:
+            if not handle in self.nwFile.nwItems:
+                self.structuralChanges.append(f'{_("Content file deleted in novelWriter")}: "{handle}.nwd".')
+                unmapped.add(handle)
+        ywSequence = self._get_sequence(ywNovel)
+        ywElements = set(ywSequence)
+        for kind, elemId in handlesById:
+            if not (kind, elemId) in ywElements:
+                self.structuralChanges.append(f'{_("Element deleted in yWriter")}: {kind} "{elemId}".')
+                unmapped.add(handlesById[(kind, elemId)])
+        for kind, elemId in ywSequence:
+            if not (kind, elemId) in handlesById:
+                self.structuralChanges.append(f'{_("Element added in yWriter")}: {kind} "{elemId}".')
+        if not self.structuralChanges and nwSequence != ywSequence:
+            self.structuralChanges.append(_('The order of the elements differs.'))
+
+        #--- Find the elements changed in yWriter since the last synchronization.
+        fingerprints = NovelDiff().get_fingerprints(ywNovel)
+        ywChanged = set()
+        for handle, entry in manifest.entries.items():
+            if not handle in unmapped and fingerprints[entry['kind']][entry['id']] != entry['contentHash']:
+                ywChanged.add(handle)
+
+        #--- Find the content files changed in novelWriter since the last synchronization.
+        contentDir = os.path.dirname(manifest.filePath)
+        fileHashes = {}
+        nwChanged = set()
+        for handle, entry in manifest.entries.items():
+            if handle in unmapped:
+                continue
+
+            fileHashes[handle] = NwManifest.get_file_hash(f'{contentDir}/{handle}{NwxFile.CONTENT_EXTENSION}')
+            if fileHashes[handle] != entry['fileHash']:
+                nwChanged.add(handle)
+
+        #--- Parse the changed characters, locations, and items.
+        worldHandles = []
+        novelHandles = []
+        for handle in manifest.entries:
+            if handle in ywChanged or handle in nwChanged:
+                if manifest.entries[handle]['kind'] in self._REFERENCES:
+                    worldHandles.append(handle)
+                elif handle in nwChanged:
+                    novelHandles.append(handle)
+        self.nwFile.novel = Novel()
+        nwElements = read_content_files(worldHandles)
+
+        # Update the scenes referring to an element renamed in yWriter.
+        renamed = {kind: set() for kind in self._REFERENCES}
+        for handle in worldHandles:
+            if handle in ywChanged and handle in nwElements:
+                kind, elemId = manifest.entries[handle]['kind'], manifest.entries[handle]['id']
+                if get_nw_title(getattr(ywNovel, kind)[elemId].title) != nwElements[handle].title:
+                    renamed[kind].add(elemId)
+        for refKind in self._REFERENCES:
+            for elemId in renamed[refKind]:
+                for scId in ywNovel.scenes.relations.get_scenes(refKind, elemId):
+                    handle = handlesById.get(('scenes', scId), None)
+                    if handle is not None and not handle in unmapped:
+                        ywChanged.add(handle)
+
+        #--- Parse the chapters and scenes changed in novelWriter.
+        # Resolve the scene references by the titles in novelWriter, giving the yWriter IDs.
+        idsByTitle = {kind: {} for kind in self._REFERENCES}
+        for handle, entry in manifest.entries.items():
+            kind = entry['kind']
+            if kind in self._REFERENCES and not handle in unmapped:
+                if handle in nwElements:
+                    title = nwElements[handle].title
+                else:
+                    title = get_nw_title(getattr(ywNovel, kind)[entry['id']].title)
+                idsByTitle[kind][title] = entry['id']
+        self.nwFile.novel = Novel()
+        self.nwFile.novel.crIdsByTitle = idsByTitle['characters']
+        self.nwFile.novel.lcIdsByTitle = idsByTitle['locations']
+        self.nwFile.novel.itIdsByTitle = idsByTitle['items']
+        nwElements.update(read_content_files(novelHandles))
+
+        #--- Sort out the conflicts.
+        for handle in manifest.entries:
+            if handle in unmapped:
+                continue
+
+            if handle in ywChanged and handle in nwChanged:
+                entry = manifest.entries[handle]
+                self.conflicts.append(f'{_("Changed in both projects")}: {entry["kind"]} "{entry["id"]}" ("{handle}.nwd").')
+            elif handle in ywChanged:
+                self.toNovelWriter.append(handle)
+            elif handle in nwChanged:
+                self.toYw.append(handle)
+
+        #--- Take over the novelWriter changes into the yWriter project.
+        for handle in self.toYw:
+            kind, ywId = manifest.entries[handle]['kind'], manifest.entries[handle]['id']
+            nwElement = nwElements[handle]
+            ywElement = getattr(ywNovel, kind)[ywId]
+            for field in self._FIELDS[kind]:
+                setattr(ywElement, field, getattr(nwElement, field))
+            ywNovel.set_dirty(kind, ywId)
+            if kind == 'scenes':
+                for field in self._REFERENCES:
+                    setattr(ywElement, field, getattr(nwElement, field))
+                rawContents[ywId] = nwElement.sceneContent
+
+        #--- Update the novelWriter content files changed in yWriter.
+        for handle in self.toNovelWriter:
+            kind, ywId = manifest.entries[handle]['kind'], manifest.entries[handle]['id']
+            fileHashes[handle] = self._write_content_file(ywNovel, handle, kind, ywId)
+        if self.toNovelWriter:
+            self.nwFile.write_xml_file()
+
+            # The index written on conversion is out of date now.
+            NwIndex(os.path.dirname(self.nwFile.filePath)).remove()
+
+        #--- Write the yWriter project, if changed.
+        if self.toYw:
+            for scId in ywNovel.scenes:
+                ywNovel.scenes[scId].sceneContent = rawContents[scId]
+            self.ywFile.write()
+
+            # Take the fingerprints from the file, as the next synchronization will do.
+            # With a novel cache, this saves parsing the file next time.
+            self.ywFile.novel = Novel()
+            self.ywFile.read()
+            remove_language_tags(self.ywFile.novel)
+            fingerprints = NovelDiff().get_fingerprints(self.ywFile.novel)
+
+            # Rewriting the yWriter project may normalize unchanged elements, e.g. strip trailing line breaks.
+            for handle, entry in manifest.entries.items():
+                if not handle in ywChanged and not handle in unmapped and entry['id'] in fingerprints[entry['kind']]:
+                    entry['contentHash'] = fingerprints[entry['kind']][entry['id']]
+
+        #--- Update the manifest.
+        for handle in self.toNovelWriter + self.toYw:
+            entry = manifest.entries[handle]
+            entry['contentHash'] = fingerprints[entry['kind']][entry['id']]
+            entry['fileHash'] = fileHashes[handle]
+        if self.toNovelWriter or self.toYw:
+            manifest.write()
+
+    def _get_sequence(self, novel):
+        """Return a list of (kind, ID) tuples in the order of the novelWriter items converted from novel.
+
+        Positional arguments:
+            novel -- Novel instance.
+
+        The chapters are followed by their scenes, so the list reflects moved scenes.
+        """
+        sequence = []
+        for chId in novel.srtChapters:
+            sequence.append(('chapters', chId))
+            for scId in novel.chapters[chId].srtScenes:
+                sequence.append(('scenes', scId))
+        for kind, srtElements in (
+                ('characters', novel.srtCharacters),
+                ('locations', novel.srtLocations),
+                ('items', novel.srtItems),
+                ):
+            for elemId in srtElements:
+                sequence.append((kind, elemId))
+        return sequence
+
+    def _write_content_file(self, novel, handle, kind, elemId):
+        """Write a content file generated from a yWriter element and return its manifest hash.
+
+        Positional arguments:
+            novel -- Novel instance: the yWriter project.
+            handle -- str: handle of the content file.
+            kind -- str: element kind.
+            elemId -- str: ID of the yWriter element.
+
+        Update the item name, status, and counts in the novelWriter XML project tree.
+        """
+        writer = NwxFile(self.nwFile.filePath, **self.nwFile.kwargs)
+        writer.novel = novel
+        writer.ui = self.nwFile.ui
+        writer.ioExecutor = None
+        sceneStatus = self.nwFile.kwargs['scene_status']
+        nwItem = self.nwFile.nwItems[handle]
+        element = getattr(novel, kind)[elemId]
+        if kind == 'characters' and element.fullName:
+            name = element.fullName
+        else:
+            name = element.title
+        if name:
+            nwItem.nwName = name
+        if kind == 'scenes' and element.status is not None:
+            try:
+                nwItem.nwStatus = sceneStatus[element.status]
+            except IndexError:
+                nwItem.nwStatus = sceneStatus[-1]
+        if kind == 'chapters':
+            nwdFile = NwdNovelFile(writer, nwItem)
+            nwdFile.add_chapter(elemId)
+        elif kind == 'scenes':
+            nwdFile = NwdNovelFile(writer, nwItem)
+            nwdFile.add_scene(elemId)
+        elif kind == 'characters':
+            nwdFile = NwdCharacterFile(writer, nwItem)
+            nwdFile.add_character(elemId)
+        elif kind == 'locations':
+            nwdFile = NwdWorldFile(writer, nwItem)
+            nwdFile.add_element(elemId)
+        else:
+            nwdFile = NwdObjectFile(writer, nwItem)
+            nwdFile.add_element(elemId)
+        nwdFile.write()
+        self.nwFile.update_item(nwItem)
+        return nwdFile.fileHash
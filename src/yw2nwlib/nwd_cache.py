@@ -0,0 +1,151 @@
+"""Provide a class for a persistent cache of parsed novelWriter content files.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import pickle
+from pywriter.pywriter_globals import *
+from pywriter.file.novel_cache import NovelCache
+
+
+class NwdCache(NovelCache):
+    """Persistent cache for the parsed content of novelWriter .nwd files.
+
+    Public methods:
+        open(projectPath, settings) -- load the cache entries of a project.
+        get_parsed(handle, filePath) -- return the parsed content of a .nwd file, if cached.
+        put_parsed(handle, filePath, parsed) -- store the parsed content of a .nwd file.
+        close() -- save the cache entries of the project.
+
+    The entries of a project are kept in one file within the cache directory,
+    named after the project path. Each entry is identified by the item handle.
+    An entry is valid if either the file size and modification time, or the
+    content hash match. Thus, only modified .nwd files need to be parsed again.
+    Changing the parser settings invalidates all entries of the project.
+    The entries have their own format version, independent of the Novel cache,
+    because they hold the results of the NwdFile._parse_* methods.
+    """
+    EXTENSION = '.nwd.pickle'
+    FORMAT_VERSION = 5
+    # To be incremented when the result of a NwdFile._parse_* method changes.
+    # Versions up to 4 were shared with NovelCache.
+
+    def __init__(self, cacheDir, maxSize=100000000):
+        """Initialize instance variables.
+
+        Positional arguments:
+            cacheDir -- str: path to the cache directory (created, if missing).
+
+        Optional arguments:
+            maxSize -- int: maximum size of all cache entries in bytes.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(cacheDir, maxSize)
+        self._projectPath = None
+        self._settings = None
+        self._entries = {}
+        self._usedEntries = {}
+        self._isModified = False
+
+    def open(self, projectPath, settings):
+        """Load the cache entries of a project.
+
+        Positional arguments:
+            projectPath -- str: path to the project file.
+            settings -- dict: parser settings affecting the result.
+        """
+        self._projectPath = projectPath
+        self._settings = settings
+        self._entries = {}
+        self._usedEntries = {}
+        self._isModified = False
+        try:
+            with open(self._get_entry_path(projectPath), 'rb') as f:
+                header = pickle.load(f)
+                if header['version'] != self.FORMAT_VERSION:
+                    return
+
+                if header['settings'] != self._get_signature(settings):
+                    return
+
+                self._entries = pickle.load(f)
+        except:
+            pass
+
+    def get_parsed(self, handle, filePath):
+        """Return the parsed content of a .nwd file.
+
+        Positional arguments:
+            handle -- str: novelWriter item handle.
+            filePath -- str: path to the .nwd file.
+
+        Return None, if there is no valid cache entry.
+        """
+        entry = self._entries.get(handle, None)
+        if entry is None:
+            return None
+
+        try:
+            fileStats = self._get_file_stats([filePath])
+            if entry['stats'] != fileStats:
+                if entry['hash'] != self._get_content_hash([filePath]):
+                    return None
+
+                # Update the file stats, so the next lookup doesn't need hashing.
+                entry['stats'] = fileStats
+                self._isModified = True
+        except:
+            return None
+
+        self._usedEntries[handle] = entry
+        return entry['parsed']
+
+    def put_parsed(self, handle, filePath, parsed):
+        """Store the parsed content of a .nwd file.
+
+        Positional arguments:
+            handle -- str: novelWriter item handle.
+            filePath -- str: path to the .nwd file.
+            parsed -- the picklable result of parsing the file.
+        """
+        try:
+            self._usedEntries[handle] = dict(
+                stats=self._get_file_stats([filePath]),
+                hash=self._get_content_hash([filePath]),
+                parsed=parsed,
+                )
+            self._isModified = True
+        except:
+            pass
+
+    def close(self):
+        """Save the cache entries of the project.
+
+        Entries of .nwd files not looked up since opening are discarded.
+        The cache is an optimization, so errors are ignored.
+        """
+        if self._projectPath is None:
+            return
+
+        if self._isModified or len(self._usedEntries) != len(self._entries):
+            entryPath = self._get_entry_path(self._projectPath)
+            try:
+                header = dict(
+                    version=self.FORMAT_VERSION,
+                    path=os.path.realpath(self._projectPath),
+                    settings=self._get_signature(self._settings),
+                    )
+                os.makedirs(self.cacheDir, exist_ok=True)
+                with open(f'{entryPath}.tmp', 'wb') as f:
+                    pickle.dump(header, f, pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(self._usedEntries, f, pickle.HIGHEST_PROTOCOL)
+                os.replace(f'{entryPath}.tmp', entryPath)
+                self._prune()
+            except:
+                pass
+        self._projectPath = None
+        self._entries = {}
+        self._usedEntries = {}
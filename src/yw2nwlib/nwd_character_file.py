@@ -58,11 +58,32 @@ class NwdCharacterFile(NwdFile):
         crId = str(self._prj.crCount)
         self._prj.novel.characters[crId] = Character()
         self._prj.novel.characters[crId].fullName = self._nwItem.nwName
-        self._prj.novel.characters[crId].title = self._nwItem.nwName
-        desc = []
-        bio = []
-        goals = []
-        notes = []
+        if self._parsed['title'] is None:
+            self._prj.novel.characters[crId].title = self._nwItem.nwName
+        else:
+            self._prj.novel.characters[crId].title = self._parsed['title']
+        self._prj.novel.characters[crId].aka = self._parsed['aka']
+        if self._parsed['tags'] is not None:
+            self._prj.novel.characters[crId].tags = list(self._parsed['tags'])
+        self._prj.novel.characters[crId].desc = self._parsed['desc']
+        self._prj.novel.characters[crId].bio = self._parsed['bio']
+        self._prj.novel.characters[crId].goals = self._parsed['goals']
+        self._prj.novel.characters[crId].notes = self._parsed['notes']
+        if self._nwItem.nwImportance in self._majorImportance:
+            self._prj.novel.characters[crId].isMajor = True
+        else:
+            self._prj.novel.characters[crId].isMajor = False
+        self._prj.novel.srtCharacters.append(crId)
+        self._prj.novel.crIdsByTitle[self._prj.novel.characters[crId].title] = crId
+        return 'Character data read in.'
+
+    def _parse_lines(self):
+        """Return a dictionary with the character properties found in the file.
+        
+        Overrides the superclass method.
+        """
+        parsed = dict(title=None, aka=None, tags=None)
+        sections = dict(desc=[], bio=[], goals=[], notes=[])
         section = 'desc'
         for line in self._lines:
             if not line:
@@ -81,32 +102,19 @@ class NwdCharacterFile(NwdFile):
                     section = 'notes'
             elif line.startswith('@'):
                 if line.startswith('@tag'):
-                    self._prj.novel.characters[crId].title = line.split(':')[1].strip().replace('_', ' ')
+                    parsed['title'] = intern_text(line.split(':')[1].strip().replace('_', ' '))
             elif line.startswith('%'):
                 if line.startswith(self._ywAkaKeyword):
-                    self._prj.novel.characters[crId].aka = line.split(':')[1].strip()
+                    parsed['aka'] = line.split(':')[1].strip()
                 elif line.startswith(self._ywTagKeyword):
-                    if self._prj.novel.characters[crId].tags is None:
-                        self._prj.novel.characters[crId].tags = []
-                    self._prj.novel.characters[crId].tags.append(line.split(':')[1].strip())
-            elif section == 'desc':
-                desc.append(line)
-            elif section == 'bio':
-                bio.append(line)
-            elif section == 'goals':
-                goals.append(line)
-            elif section == 'notes':
-                notes.append(line)
-        self._prj.novel.characters[crId].desc = '\n'.join(desc)
-        self._prj.novel.characters[crId].bio = '\n'.join(bio)
-        self._prj.novel.characters[crId].goals = '\n'.join(goals)
-        self._prj.novel.characters[crId].notes = '\n'.join(notes)
-        if self._nwItem.nwImportance in self._majorImportance:
-            self._prj.novel.characters[crId].isMajor = True
-        else:
-            self._prj.novel.characters[crId].isMajor = False
-        self._prj.novel.srtCharacters.append(crId)
-        return 'Character data read in.'
+                    if parsed['tags'] is None:
+                        parsed['tags'] = []
+                    parsed['tags'].append(intern_text(line.split(':')[1].strip()))
+            else:
+                sections[section].append(line)
+        for section in sections:
+            parsed[section] = '\n'.join(sections[section])
+        return parsed
 
     def add_character(self, crId):
         """Add a character to the file content.
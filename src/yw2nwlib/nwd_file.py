@@ -4,18 +4,28 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import mmap
 import os
+import re
 from pywriter.pywriter_globals import *
+from yw2nwlib.nw_manifest import NwManifest
 
 
 class NwdFile:
     """abstract novelWriter item file representation.
     
     Public methods:
-        read() -- read a content file.
+        read() -- read and parse a content file.
         write() -- write a content file.
+        count_text(text) -- Class method: return the character, word, and paragraph counts of a content file.
+
+    Public instance variables:
+        fileHash -- str: manifest hash of the content written, or None.
     """
     EXTENSION = '.nwd'
+    _DASHES = ('–', '—', '―', '‒')
+    _SHORTCODES = re.compile(r'(?i)(?<!\\)\[[\/\!]?(?:i|b|s|u|m|sup|sub)\]|(?<!\\)\[(?:vspace|newpage|new page)(?::\d+)?\]')
+    _HEADING_PREFIXES = ('#! ', '##! ', '###! ', '# ', '## ', '### ', '#### ')
 
     def __init__(self, prj, nwItem):
         """Define instance variables.
@@ -28,20 +38,88 @@ class NwdFile:
         self._nwItem = nwItem
         self._filePath = os.path.dirname(self._prj.filePath) + self._prj.CONTENT_DIR + nwItem.nwHandle + self.EXTENSION
         self._lines = []
+        self._parsed = None
+        self.fileHash = None
 
     def read(self):
-        """Read a content file.
+        """Read and parse a content file.
         
+        If the project has a .nwd cache, take the parsed content from there,
+        provided the file is unchanged.
         Return a message beginning with the ERROR constant in case of error.
         """
-        try:
-            with open(self._filePath, 'r', encoding='utf-8') as f:
-                self._lines = f.read().split('\n')
-                return 'Item data read in.'
+        nwdCache = self._prj.nwdCache
+        if nwdCache is not None:
+            self._parsed = nwdCache.get_parsed(self._nwItem.nwHandle, self._filePath)
+            if self._parsed is not None:
+                return 'Item data taken from the cache.'
 
+        try:
+            buffer = self._prj.get_prefetched(self._filePath)
+            if buffer is None:
+                with open(self._filePath, 'rb') as f:
+                    try:
+                        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except (ValueError, OSError):
+                        # Empty files and some file systems can not be mapped.
+                        buffer = f.read()
         except:
             raise Error(f'Can not read "{norm_path(self._filePath)}".')
 
+        try:
+            self._parsed = self._parse_buffer(buffer)
+        finally:
+            if isinstance(buffer, mmap.mmap):
+                buffer.close()
+        if nwdCache is not None:
+            nwdCache.put_parsed(self._nwItem.nwHandle, self._filePath, self._parsed)
+        return 'Item data read in.'
+
+    def _parse_buffer(self, buffer):
+        """Return the picklable result of parsing the file content.
+        
+        Positional arguments:
+            buffer -- bytes-like object: the file content, possibly memory-mapped.
+        
+        Decode the buffer and parse the text.
+        """
+        return self._parse_text(self._decode(buffer))
+
+    def _decode(self, buffer):
+        """Return the content of buffer as text with universal newlines.
+        
+        Positional arguments:
+            buffer -- bytes-like object: utf-8 encoded text.
+        
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            text = str(buffer, 'utf-8')
+        except UnicodeDecodeError:
+            raise Error(f'Can not read "{norm_path(self._filePath)}".')
+
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def _parse_text(self, text):
+        """Return the picklable result of parsing the file content.
+        
+        Positional arguments:
+            text -- str: the file content.
+        
+        Split the text into lines to be parsed.
+        """
+        self._lines = text.split('\n')
+        return self._parse_lines()
+
+    def _parse_lines(self):
+        """Return the picklable result of parsing the lines read.
+        
+        The result must depend only on the file content and the settings.
+        It is cached by NwdCache, so increment NwdCache.FORMAT_VERSION when it changes.
+        To be overridden by subclasses.
+        """
+        return self._lines
+
     def write(self):
         """Write a content file. 
         
@@ -53,6 +131,19 @@ class NwdFile:
                  ]
         lines.extend(self._lines)
         text = '\n'.join(lines)
+        self.fileHash = NwManifest.get_text_hash(text)
+        if self._prj.nwIndex is None:
+            charCount, wordCount, paraCount = self.count_text(text)
+        else:
+            charCount, wordCount, paraCount = self._prj.nwIndex.add_item(self._nwItem.nwHandle, self._nwItem.nwClass, text)
+        self._nwItem.nwCharCount = str(charCount)
+        self._nwItem.nwWordCount = str(wordCount)
+        self._nwItem.nwParaCount = str(paraCount)
+        if self._prj.ioExecutor is not None:
+            # The project writes all content files concurrently.
+            self._prj.pendingWrites[self._filePath] = text
+            return 'nwd file queued.'
+
         try:
             with open(self._filePath, 'w', encoding='utf-8') as f:
                 f.write(text)
@@ -60,3 +151,67 @@ class NwdFile:
 
         except:
             raise Error(f'Can not write "{norm_path(self._filePath)}".')
+
+    @classmethod
+    def count_text(cls, text):
+        """Return a (characters, words, paragraphs) tuple for the text of a content file.
+        
+        Positional arguments:
+            text -- str: the content file's text.
+        
+        Count like novelWriter does when indexing the project, so the counts 
+        written to the project file are up to date:
+        Comments, keywords, and layout commands are skipped, 
+        dashes are word limits, shortcodes are not counted,
+        and headings count as words, but not as paragraphs.
+        The text is scanned once, line by line.
+        """
+        for dash in cls._DASHES:
+            if dash in text:
+                text = text.replace(dash, ' ')
+        charCount = 0
+        wordCount = 0
+        paraCount = 0
+        prevEmpty = True
+        for line in text.splitlines():
+            line = line.rstrip()
+            if not line:
+                prevEmpty = True
+                continue
+
+            if line[0] in '%@':
+                continue
+
+            isParagraph = True
+            if line[0] == '[':
+                if line.lower() in ('[newpage]', '[new page]', '[vspace]'):
+                    continue
+
+                if line[:8] == '[vspace:' and line[-1] == ']':
+                    continue
+
+            elif line[0] == '>' or line[-1] == '<':
+                # Remove the alignment and indentation markers.
+                if line[:2] == '>>':
+                    line = line[2:].lstrip(' ')
+                elif line[:1] == '>':
+                    line = line[1:].lstrip(' ')
+                if line[-2:] == '<<':
+                    line = line[:-2].rstrip(' ')
+                elif line[-1:] == '<':
+                    line = line[:-1].rstrip(' ')
+            elif line[0] == '#':
+                for prefix in cls._HEADING_PREFIXES:
+                    if line.startswith(prefix):
+                        line = line[len(prefix):]
+                        isParagraph = False
+                        break
+
+            if '[' in line:
+                line = cls._SHORTCODES.sub('', line)
+            wordCount += len(line.split())
+            charCount += len(line)
+            if isParagraph and prevEmpty:
+                paraCount += 1
+            prevEmpty = not isParagraph
+        return charCount, wordCount, paraCount
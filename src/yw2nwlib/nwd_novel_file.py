@@ -18,6 +18,7 @@ class NwdNovelFile(NwdFile):
         read() -- read a content file.
         add_scene(scId) -- add a scene to the file content.
         add_chapter(chId) -- add a chapter to the file content.
+        convert_scenes(texts, doubleLinebreaks) -- Static method: return scene contents converted to Markdown.
     """
     _POV_TAG = '@pov: '
     _CHARACTER_TAG = '@char: '
@@ -57,6 +58,22 @@ class NwdNovelFile(NwdFile):
         # Customizable tags for general use.
         self._ywTagKeyword = f'%{prj.kwargs["ywriter_tag_keyword"]}: '
 
+        # Classifier for the lines to be parsed. The alternatives are tried in order.
+        # It runs on the undecoded file content.
+        self._lineClassifier = re.compile((
+            '^(?:%%.*'
+            f'|{re.escape(self._POV_TAG)}(?P<pov>.*)'
+            f'|{re.escape(self._CHARACTER_TAG)}(?P<char>.*)'
+            f'|{re.escape(self._LOCATION_TAG)}(?P<location>.*)'
+            f'|{re.escape(self._ITEM_TAG)}(?P<object>.*)'
+            '|@.*'
+            f'|{re.escape(self._ywTagKeyword)}(?P<tag>.*)'
+            f'|%[^\\S\\n]*(?i:{re.escape(self._SYNOPSIS_KEYWORD)})(?P<synopsis>.*)'
+            '|%.*'
+            '|(?P<heading>#.*)'
+            ')$').encode('utf-8'),
+            re.MULTILINE)
+
         # Headings that divide the file into parts, chapters and scenes.
         # self.partHeadingPrefix = prj.kwargs['part_heading_prefix']
         # self.chapterHeadingPrefix = prj.kwargs['chapter_heading_prefix']
@@ -81,6 +98,19 @@ class NwdNovelFile(NwdFile):
             else:
                 return text
 
+        return self.convert_scenes([text], self.doubleLinebreaks)[0]
+
+    @staticmethod
+    def convert_scenes(texts, doubleLinebreaks):
+        """Return a list of scene contents, converted from yw7 markup to Markdown.
+        
+        Positional arguments:
+            texts -- list of str: scene contents to convert.
+            doubleLinebreaks -- bool: if True, paragraph breaks are represented by double line breaks.
+        
+        Being independent of the instance, this can run in a worker process.
+        """
+
         # Convert italics, bold, and strikethrough.
         MD_REPLACEMENTS = [
             ('[i] ', ' [i]'),
@@ -97,16 +127,19 @@ class NwdNovelFile(NwdFile):
             ('[/s]', '~~'),
             ('  ', ' '),
         ]
-        if self.doubleLinebreaks:
+        if doubleLinebreaks:
             MD_REPLACEMENTS.insert(0, ['\n', '\n\n'])
-        try:
-            for yw, md in MD_REPLACEMENTS:
-                text = text.replace(yw, md)
-            text = re.sub('\[\/*[h|c|r|u]\d*\]', '', text)
-            # Remove highlighting, alignment, and underline tags
-        except AttributeError:
-            text = ''
-        return text
+        convertedTexts = []
+        for text in texts:
+            try:
+                for yw, md in MD_REPLACEMENTS:
+                    text = text.replace(yw, md)
+                text = re.sub('\[\/*[h|c|r|u]\d*\]', '', text)
+                # Remove highlighting, alignment, and underline tags
+            except AttributeError:
+                text = ''
+            convertedTexts.append(text)
+        return convertedTexts
 
     def _convert_to_yw(self, text):
         """Return text, converted from Markdown to yw7 markup.
@@ -147,8 +180,16 @@ class NwdNovelFile(NwdFile):
         Extends the superclass method.
         """
 
+        def get_reference(title, tag, idsByTitle):
+            """Return the ID of the element referenced by title, or None if not found."""
+            elemId = idsByTitle.get(title, None)
+            if elemId is None:
+                unresolved.append(f'"{self._nwItem.nwName}": {tag}{title}')
+            return elemId
+
         def set_scene_content(scId, contentLines, characters, locations, items, synopsis, tags):
             if scId is not None:
+                self._prj.unresolvedReferences.extend(unresolved)
                 text = '\n'.join(contentLines)
                 self._prj.novel.scenes[scId].sceneContent = self._convert_to_yw(text)
                 self._prj.novel.scenes[scId].desc = '\n'.join(synopsis)
@@ -185,54 +226,83 @@ class NwdNovelFile(NwdFile):
             status = 5
         else:
             status = 1
+        crIdsByTitle = self._prj.novel.crIdsByTitle
+        lcIdsByTitle = self._prj.novel.lcIdsByTitle
+        itIdsByTitle = self._prj.novel.itIdsByTitle
         characters = []
         locations = []
         items = []
+        unresolved = []
         synopsis = []
         contentLines = []
         tags = []
         inScene = False
         sceneTitle = None
         appendToPrev = None
-        for line in self._lines:
-            if line.startswith('%%'):
-                continue
+        for kind, value in self._parsed:
+            if kind == 'text':
+                if scId is not None:
+                    contentLines.append(value)
+                    continue
 
-            elif line.startswith(self._POV_TAG):
-                characters.insert(0, line.replace(self._POV_TAG, '').strip().replace('_', ' '))
-            elif line.startswith(self._CHARACTER_TAG):
-                characters.append(line.replace(self._CHARACTER_TAG, '').strip().replace('_', ' '))
-            elif line.startswith(self._LOCATION_TAG):
-                locations.append(line.replace(self._LOCATION_TAG, '').strip().replace('_', ' '))
-            elif line.startswith(self._ITEM_TAG):
-                items.append(line.replace(self._ITEM_TAG, '').strip().replace('_', ' '))
-            elif line.startswith('@'):
-                continue
+                # Skip the blank lines preceding the scene content.
+                value = value.lstrip('\n')
+                if not value or not sceneTitle:
+                    continue
 
-            elif line.startswith('%'):
-                if line.startswith(self._ywTagKeyword):
-                    tags.append(line.split(':', maxsplit=1)[1].strip())
-                else:
-                    line = line.lstrip('%').lstrip()
-                    if line.lower().startswith(self._SYNOPSIS_KEYWORD):
-                        synopsis.append(line.split(':', maxsplit=1)[1].strip())
-                    pass
-            elif line.startswith('###') and self._prj.chId:
+                # Write chapter synopsis.
+                if synopsis and not inScene:
+                    self._prj.novel.chapters[self._prj.chId].desc = '\n'.join(synopsis)
+                    synopsis = []
+                inScene = True
+
+                # Add a scene.
+                self._prj.scCount += 1
+                scId = str(self._prj.scCount)
+                self._prj.novel.scenes[scId] = Scene()
+                self._prj.novel.scenes[scId].status = status
+                self._prj.novel.scenes[scId].title = sceneTitle
+                self._prj.novel.scenes[scId].scType = elementType
+                self._prj.novel.chapters[self._prj.chId].srtScenes.append(scId)
+                self._prj.novel.scenes[scId].appendToPrev = appendToPrev
+                contentLines = [value]
+            elif kind == 'pov':
+                crId = get_reference(value, self._POV_TAG, crIdsByTitle)
+                if crId is not None:
+                    characters.insert(0, crId)
+            elif kind == 'char':
+                crId = get_reference(value, self._CHARACTER_TAG, crIdsByTitle)
+                if crId is not None:
+                    characters.append(crId)
+            elif kind == 'location':
+                lcId = get_reference(value, self._LOCATION_TAG, lcIdsByTitle)
+                if lcId is not None:
+                    locations.append(lcId)
+            elif kind == 'object':
+                itId = get_reference(value, self._ITEM_TAG, itIdsByTitle)
+                if itId is not None:
+                    items.append(itId)
+            elif kind == 'tag':
+                tags.append(value)
+            elif kind == 'synopsis':
+                synopsis.append(value)
+            elif value.startswith('###') and self._prj.chId:
                 # Set previous scene content.
                 set_scene_content(scId, contentLines, characters, locations, items, synopsis, tags)
                 scId = None
                 characters = []
                 locations = []
                 items = []
+                unresolved = []
                 synopsis = []
                 tags = []
-                sceneTitle = line.split(' ', maxsplit=1)[1]
-                if line.startswith('####'):
+                sceneTitle = value.partition(' ')[2]
+                if value.startswith('####'):
                     appendToPrev = True
                 else:
                     appendToPrev = None
                 inScene = True
-            elif line.startswith('#'):
+            else:
                 # Set previous scene content.
                 set_scene_content(scId, contentLines, characters, locations, items, synopsis, tags)
                 synopsis = []
@@ -241,10 +311,10 @@ class NwdNovelFile(NwdFile):
                 self._prj.chCount += 1
                 self._prj.chId = str(self._prj.chCount)
                 self._prj.novel.chapters[self._prj.chId] = Chapter()
-                self._prj.novel.chapters[self._prj.chId].title = line.split(' ', maxsplit=1)[1]
+                self._prj.novel.chapters[self._prj.chId].title = value.partition(' ')[2]
                 self._prj.novel.chapters[self._prj.chId].chType = elementType
                 self._prj.novel.srtChapters.append(self._prj.chId)
-                if line.startswith('##'):
+                if value.startswith('##'):
                     self._prj.novel.chapters[self._prj.chId].chLevel = 0
                 else:
                     self._prj.novel.chapters[self._prj.chId].chLevel = 1
@@ -254,31 +324,10 @@ class NwdNovelFile(NwdFile):
                 characters = []
                 locations = []
                 items = []
+                unresolved = []
                 tags = []
                 sceneTitle = f'Scene {self._prj.scCount + 1}'
                 inScene = False
-            elif scId is None and not line:
-                continue
-
-            elif sceneTitle and scId is None:
-                # Write chapter synopsis.
-                if synopsis and not inScene:
-                    self._prj.novel.chapters[self._prj.chId].desc = '\n'.join(synopsis)
-                    synopsis = []
-                inScene = True
-
-                # Add a scene.
-                self._prj.scCount += 1
-                scId = str(self._prj.scCount)
-                self._prj.novel.scenes[scId] = Scene()
-                self._prj.novel.scenes[scId].status = status
-                self._prj.novel.scenes[scId].title = sceneTitle
-                self._prj.novel.scenes[scId].scType = elementType
-                self._prj.novel.chapters[self._prj.chId].srtScenes.append(scId)
-                self._prj.novel.scenes[scId].appendToPrev = appendToPrev
-                contentLines = [line]
-            elif scId is not None:
-                contentLines.append(line)
 
         # Write the last scene of the file or a chapter synopsis, if there is no scene.
         if scId is not None:
@@ -287,6 +336,63 @@ class NwdNovelFile(NwdFile):
             self._prj.novel.chapters[self._prj.chId].desc = '\n'.join(synopsis)
         return 'Chapters and scenes read in.'
 
+    def _parse_buffer(self, buffer):
+        """Return a list of (kind, value) tuples, classifying the lines of the file.
+        
+        Positional arguments:
+            buffer -- bytes-like object: the file content, possibly memory-mapped.
+        
+        Only the parts of the buffer needed are decoded.
+        Raise the "Error" exception in case of error.
+        Overrides the superclass method.
+        """
+        if buffer.find(b'\r') != -1:
+            # Normalize the line breaks first.
+            buffer = self._decode(buffer).encode('utf-8')
+        try:
+            return list(self._classify_lines(buffer))
+
+        except UnicodeDecodeError:
+            raise Error(f'Can not read "{norm_path(self._filePath)}".')
+
+    def _classify_lines(self, buffer):
+        """Generate (kind, value) tuples, classifying the lines of the buffer.
+        
+        Positional arguments:
+            buffer -- bytes-like object: utf-8 encoded text with "\\n" line breaks.
+        
+        Kinds and values:
+            'heading' -- the heading line, starting a chapter or a scene.
+            'pov', 'char', 'location', 'object' -- the title of the referenced element.
+            'tag' -- a yWriter tag.
+            'synopsis' -- a line of the synopsis.
+            'text' -- consecutive content lines including blank lines, sliced from the buffer.
+        
+        All values are decoded str; tags are interned.
+        Comments and unknown keywords are skipped. 
+        """
+        pos = 0
+        for match in self._lineClassifier.finditer(buffer):
+            start = match.start()
+            if start > pos:
+                # Content lines between the classified lines; an empty slice is one blank line.
+                yield ('text', str(buffer[pos:start - 1], 'utf-8'))
+            pos = match.end() + 1
+            kind = match.lastgroup
+            if kind is None:
+                continue
+
+            value = str(match.group(kind), 'utf-8')
+            if kind in ('pov', 'char', 'location', 'object'):
+                value = value.strip().replace('_', ' ')
+            elif kind == 'tag':
+                value = intern_text(value.strip())
+            elif kind != 'heading':
+                value = value.strip()
+            yield (kind, value)
+        if pos <= len(buffer):
+            yield ('text', str(buffer[pos:], 'utf-8'))
+
     def add_scene(self, scId):
         """Add a scene to the file content.
         
@@ -332,8 +438,10 @@ class NwdNovelFile(NwdFile):
         # Separate the text body by a blank line.
         self._lines.append('\n')
 
-        # Set scene content.
-        text = self._convert_from_yw(scene.sceneContent)
+        # Set scene content, if not converted in advance.
+        text = self._prj.get_converted(scId)
+        if text is None:
+            text = self._convert_from_yw(scene.sceneContent)
         if text:
             self._lines.append(text)
 
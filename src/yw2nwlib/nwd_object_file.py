@@ -46,7 +46,24 @@ class NwdObjectFile(NwdFile):
         self._prj.lcCount += 1
         itId = str(self._prj.lcCount)
         self._prj.novel.items[itId] = WorldElement()
-        self._prj.novel.items[itId].title = self._nwItem.nwName
+        if self._parsed['title'] is None:
+            self._prj.novel.items[itId].title = self._nwItem.nwName
+        else:
+            self._prj.novel.items[itId].title = self._parsed['title']
+        self._prj.novel.items[itId].aka = self._parsed['aka']
+        if self._parsed['tags'] is not None:
+            self._prj.novel.items[itId].tags = list(self._parsed['tags'])
+        self._prj.novel.items[itId].desc = self._parsed['desc']
+        self._prj.novel.srtItems.append(itId)
+        self._prj.novel.itIdsByTitle[self._prj.novel.items[itId].title] = itId
+        return 'Item data read in.'
+
+    def _parse_lines(self):
+        """Return a dictionary with the element properties found in the file.
+        
+        Overrides the superclass method.
+        """
+        parsed = dict(title=None, aka=None, tags=None)
         desc = []
         for line in self._lines:
             if not line:
@@ -60,25 +77,24 @@ class NwdObjectFile(NwdFile):
 
             elif line.startswith('%'):
                 if line.startswith(self._ywAkaKeyword):
-                    self._prj.novel.items[itId].aka = line.split(':')[1].strip()
+                    parsed['aka'] = line.split(':')[1].strip()
                 elif line.startswith(self._ywTagKeyword):
-                    if self._prj.novel.items[itId].tags is None:
-                        self._prj.novel.items[itId].tags = []
-                    self._prj.novel.items[itId].tags.append(line.split(':')[1].strip())
+                    if parsed['tags'] is None:
+                        parsed['tags'] = []
+                    parsed['tags'].append(intern_text(line.split(':')[1].strip()))
                 else:
                     continue
 
             elif line.startswith('@'):
                 if line.startswith('@tag'):
-                    self._prj.novel.items[itId].title = line.split(':')[1].strip().replace('_', ' ')
+                    parsed['title'] = intern_text(line.split(':')[1].strip().replace('_', ' '))
                 else:
                     continue
 
             else:
                 desc.append(line)
-        self._prj.novel.items[itId].desc = '\n'.join(desc)
-        self._prj.novel.srtItems.append(itId)
-        return 'Item data read in.'
+        parsed['desc'] = '\n'.join(desc)
+        return parsed
 
     def add_element(self, itId):
         """Add an element of the story world to the file content.
@@ -46,7 +46,24 @@ class NwdWorldFile(NwdFile):
         self._prj.lcCount += 1
         lcId = str(self._prj.lcCount)
         self._prj.novel.locations[lcId] = WorldElement()
-        self._prj.novel.locations[lcId].title = self._nwItem.nwName
+        if self._parsed['title'] is None:
+            self._prj.novel.locations[lcId].title = self._nwItem.nwName
+        else:
+            self._prj.novel.locations[lcId].title = self._parsed['title']
+        self._prj.novel.locations[lcId].aka = self._parsed['aka']
+        if self._parsed['tags'] is not None:
+            self._prj.novel.locations[lcId].tags = list(self._parsed['tags'])
+        self._prj.novel.locations[lcId].desc = self._parsed['desc']
+        self._prj.novel.srtLocations.append(lcId)
+        self._prj.novel.lcIdsByTitle[self._prj.novel.locations[lcId].title] = lcId
+        return 'Location data read in.'
+
+    def _parse_lines(self):
+        """Return a dictionary with the element properties found in the file.
+        
+        Overrides the superclass method.
+        """
+        parsed = dict(title=None, aka=None, tags=None)
         desc = []
         for line in self._lines:
             if not line:
@@ -60,25 +77,24 @@ class NwdWorldFile(NwdFile):
 
             elif line.startswith('%'):
                 if line.startswith(self._ywAkaKeyword):
-                    self._prj.novel.locations[lcId].aka = line.split(':')[1].strip()
+                    parsed['aka'] = line.split(':')[1].strip()
                 elif line.startswith(self._ywTagKeyword):
-                    if self._prj.novel.locations[lcId].tags is None:
-                        self._prj.novel.locations[lcId].tags = []
-                    self._prj.novel.locations[lcId].tags.append(line.split(':')[1].strip())
+                    if parsed['tags'] is None:
+                        parsed['tags'] = []
+                    parsed['tags'].append(intern_text(line.split(':')[1].strip()))
                 else:
                     continue
 
             elif line.startswith('@'):
                 if line.startswith('@tag'):
-                    self._prj.novel.locations[lcId].title = line.split(':')[1].strip().replace('_', ' ')
+                    parsed['title'] = intern_text(line.split(':')[1].strip().replace('_', ' '))
                 else:
                     continue
 
             else:
                 desc.append(line)
-        self._prj.novel.locations[lcId].desc = '\n'.join(desc)
-        self._prj.novel.srtLocations.append(lcId)
-        return 'Location data read in.'
+        parsed['desc'] = '\n'.join(desc)
+        return parsed
 
     def add_element(self, lcId):
         """Add a location to the file content.
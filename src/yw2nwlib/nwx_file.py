@@ -9,8 +9,12 @@ import xml.etree.ElementTree as ET
 from datetime import datetime
 from pywriter.pywriter_globals import *
 from pywriter.file.file import File
+from pywriter.model.chapter import Chapter
+from pywriter.model.novel_diff import NovelDiff
 from pywriter.yw.xml_indent import indent
 from yw2nwlib.handles import Handles
+from yw2nwlib.nw_index import NwIndex
+from yw2nwlib.nw_manifest import NwManifest
 from yw2nwlib.nw_item_v1_5 import NwItemV15
 from yw2nwlib.nwd_character_file import NwdCharacterFile
 from yw2nwlib.nwd_novel_file import NwdNovelFile
@@ -26,8 +30,13 @@ class NwxFile(File):
     Public methods:
         read_xml_file() -- read the novelWriter XML project file to the project tree.
         read() -- parse the novelWriter xml and md files and get the instance variables.
+        read_content_files(handles) -- parse selected content files and add their elements to the novel.
         merge(source) -- copy the yWriter project parts that can be mapped to the novelWriter project.
         write() -- write instance variables to the novelWriter files.
+        get_prefetched(filePath) -- return the content of a file read in advance, if any.
+        get_converted(scId) -- return the scene content converted in advance, if any.
+        update_item(nwItem) -- update the name attributes of an item in the XML project tree.
+        write_xml_file() -- write the XML project tree to the novelWriter XML project file.
     
     Public class variables:
         EXTENSION -- str: file extension of the novelWriter xml file. 
@@ -45,7 +54,20 @@ class NwxFile(File):
         scCount -- int: number of scenes.
         chCount -- int: number of characters.
         chId -- str: ID of the chapter currently processed.
+        unresolvedReferences -- list of str: scene references to unknown characters, locations, or items.
+        nwdCache -- NwdCache instance holding the parsed content files, or None.
+        ioExecutor -- concurrent.futures.Executor for reading and writing the content files, or None.
+        pendingWrites -- dict: content of the .nwd files to be written, by file path.
+        nwIndex -- NwIndex instance collecting the index of the content files written, or None.
+        convertExecutor -- concurrent.futures.Executor for converting the scene contents, or None.
+        nwItems -- dict: (key: handle; value: NwItem instance) of all content files.
+        itemElements -- dict: (key: handle; value: list of (kind, ID) tuples of the elements read from the content file).
     
+    nwItems and itemElements are not set, if the project is taken from the cache.
+
+    Along with the content files, write a manifest with their source element IDs and hashes,
+    and the novelWriter index of their tags and headings.
+
     Reads and writes file format version 1.3.
     Reads file format version 1.4.
     """
@@ -68,6 +90,9 @@ class NwxFile(File):
         'NOVEL':NwdNovelFile
         }
     _TRAILER = ('ARCHIVE', 'TRASH')
+    _ELEMENT_KINDS = ('chapters', 'scenes', 'characters', 'locations', 'items')
+    _CONVERSION_CHUNK_SIZE = 200000
+    # Number of characters of scene content converted by one executor task.
     STATUS_IDS = {
             'None': 's000001',
             'Outline': 's000002',
@@ -102,6 +127,12 @@ class NwxFile(File):
             first_edit_status -- tuple of str: novelWriter status to be converted to yWriter "1st Edit" scene status.
             second_edit_status -- tuple of str: novelWriter status to be converted to yWriter "2nd Edit" scene status.
             done_status -- tuple of str: novelWriter status to be converted to yWriter "Done" scene status.
+
+        Optional keyword arguments:
+            novel_cache -- NovelCache instance for looking up already parsed projects.
+            nwd_cache -- NwdCache instance for looking up already parsed content files.
+            io_executor -- concurrent.futures.Executor for reading and writing the content files concurrently.
+            convert_executor -- concurrent.futures.Executor, e.g. a process pool, for converting the scene contents in parallel.
     
         Extends the superclass constructor.
         """
@@ -115,8 +146,20 @@ class NwxFile(File):
         self.scCount = 0
         self.chCount = 0
         self.chId = None
+        self.unresolvedReferences = []
         self._sceneStatus = kwargs['scene_status']
         self.statusLookup = {}
+        self._novelCache = kwargs.get('novel_cache', None)
+        self.nwdCache = kwargs.get('nwd_cache', None)
+        self.ioExecutor = kwargs.get('io_executor', None)
+        self.pendingWrites = {}
+        self.nwIndex = None
+        self._prefetchedFiles = {}
+        self.convertExecutor = kwargs.get('convert_executor', None)
+        self._convertedScenes = {}
+        self._pendingConversions = []
+        self.nwItems = {}
+        self.itemElements = {}
 
     def read_xml_file(self):
         """Read the novelWriter XML project file to the project tree.
@@ -135,19 +178,68 @@ class NwxFile(File):
         Overrides the superclass method.
         """
 
-        #--- Read the XML file, if necessary.
+        #--- Look up the project in the cache, if any.
+        if self._novelCache is not None:
+            sourceFiles = self._get_source_files()
+            novel = self._novelCache.get(self.filePath, sourceFiles, self.kwargs)
+            if novel is not None:
+                self.novel = novel
+                return 'novelWriter data taken from the cache.'
+
+        root = self._get_project_root()
+
+        #--- Read project metadata from the xml element _tree.
+        prj = root.find('project')
+        if prj.find('title') is not None:
+            self.novel.title = prj.find('title').text
+        elif prj.find('name') is not None:
+            self.novel.title = prj.find('name').text
+        authors = []
+        for author in prj.iter('author'):
+            if author is not None:
+                if author.text:
+                    authors.append(author.text)
+        self.novel.authorName = ', '.join(authors)
+        self._read_content(root)
+        if self._novelCache is not None:
+            self._novelCache.put(self.filePath, sourceFiles, self.kwargs, self.novel)
+        return 'novelWriter data converted to novel structure.'
+
+    def read_content_files(self, handles):
+        """Parse selected content files and add their elements to the novel.
+        
+        Positional arguments:
+            handles -- collection of str: the handles of the content files to read.
+        
+        Set nwItems for all content files, and itemElements for the files read.
+        Scenes not preceded by a chapter heading are assigned to a placeholder chapter
+        with the ID '0', which is not listed in srtChapters.
+        The indexes of the characters, locations, and items by title are kept,
+        so they can be set up in advance for resolving the scene references.
+        Raise the "Error" exception in case of error.
+        """
+        root = self._get_project_root()
+        self.chId = '0'
+        self.novel.chapters[self.chId] = Chapter()
+        self._read_content(root, handles)
+
+    def _get_project_root(self):
+        """Return the root of the XML project tree, and read the settings.
+        
+        Read the XML file, if necessary.
+        Raise the "Error" exception in case of error.
+        """
         if self._tree is None:
             self.read_xml_file()
         root = self._tree.getroot()
 
-        #--- Check file type and version; apply strategy pattern for the NwItem class.
+        #--- Check file type and version.
         if root.tag != self._NWX_TAG:
             raise Error(f'This seems not to bee a novelWriter project file.')
 
         if root.attrib.get('fileVersion') != self._NWX_ATTR_V1_5['fileVersion']:
             raise Error(f'Wrong file version (must be {self._NWX_ATTR_V1_5["fileVersion"]}).')
 
-        NwItem = NwItemV15
         self.statusLookup = {}
         xmlStatus = root.find('settings').find('status')
         for xmlStatusEntry in xmlStatus.findall('entry'):
@@ -156,26 +248,37 @@ class NwxFile(File):
         xmlImportance = root.find('settings').find('importance')
         for xmlImportanceEntry in xmlImportance.findall('entry'):
             self.importanceLookup[xmlImportanceEntry.attrib.get('key')] = xmlImportanceEntry.text
+        return root
 
-        #--- Read project metadata from the xml element _tree.
-        prj = root.find('project')
-        if prj.find('title') is not None:
-            self.novel.title = prj.find('title').text
-        elif prj.find('name') is not None:
-            self.novel.title = prj.find('name').text
-        authors = []
-        for author in prj.iter('author'):
-            if author is not None:
-                if author.text:
-                    authors.append(author.text)
-        self.novel.authorName = ', '.join(authors)
+    def _read_content(self, root, handles=None):
+        """Read project content from the xml element tree and parse the content files.
+        
+        Positional arguments:
+            root -- the root of the XML project tree.
+        
+        Optional arguments:
+            handles -- collection of str: the handles of the content files to parse, if not all.
 
-        #--- Read project content from the xml element tree.
+        Raise the "Error" exception in case of error.
+        """
         # This is a simple variant that processes the flat XML structure
         # without evaluating the items' child/parent relations.
         # Assumptions:
         # - The NOVEL items are arranged in the correct order.
         # - ARCHIVE and TRASH sections are located at the end.
+
+        # Apply strategy pattern for the NwItem class.
+        NwItem = NwItemV15
+        self.unresolvedReferences = []
+        self.nwHandles = Handles()
+        self.nwItems = {}
+        self.itemElements = {}
+        nwdFiles = []
+        novelFiles = []
+        if handles is None:
+            self._prefetch_content_files()
+        if self.nwdCache is not None:
+            self.nwdCache.open(self.filePath, self.kwargs)
         content = root.find('content')
         for node in content.iter('item'):
             nwItem = NwItem()
@@ -190,36 +293,38 @@ class NwxFile(File):
             if nwItem.nwType != 'FILE':
                 continue
 
+            self.nwItems[handle] = nwItem
+            if handles is not None and not handle in handles:
+                continue
+
             nwdFile = self._NWD_CLASSES[nwItem.nwClass](self, nwItem)
+            if nwItem.nwClass == 'NOVEL':
+                # Defer the novel files until all characters, locations, and items are
+                # registered, so that the scene references can be resolved while parsing.
+                novelFiles.append((handle, nwdFile))
+            else:
+                nwdFiles.append((handle, nwdFile))
+        nwdFiles.extend(novelFiles)
+        total = len(nwdFiles)
+        phase = _('Reading content files')
+        for done, (handle, nwdFile) in enumerate(nwdFiles):
+            self.ui.set_progress(done, total, phase)
+            counts = self._get_element_counts()
             nwdFile.read()
 
-        # Create reference lists.
-        crIdsByTitle = {}
-        for crId in self.novel.characters:
-            crIdsByTitle[self.novel.characters[crId].title] = crId
-        lcIdsByTitle = {}
-        for lcId in self.novel.locations:
-            lcIdsByTitle[self.novel.locations[lcId].title] = lcId
-        itIdsByTitle = {}
-        for itId in self.novel.items:
-            itIdsByTitle[self.novel.items[itId].title] = itId
-
-        # Fix scene references, replacing titles by IDs.
-        for scId in self.novel.scenes:
-            characters = []
-            for crId in self.novel.scenes[scId].characters:
-                characters.append(crIdsByTitle[crId])
-            self.novel.scenes[scId].characters = characters
-            locations = []
-            for lcId in self.novel.scenes[scId].locations:
-                locations.append(lcIdsByTitle[lcId])
-            self.novel.scenes[scId].locations = locations
-            items = []
-            for itId in self.novel.scenes[scId].items:
-                items.append(itIdsByTitle[itId])
-            self.novel.scenes[scId].items = items
-
-        return 'novelWriter data converted to novel structure.'
+            # Register the elements created from the content file.
+            elements = []
+            for kind, oldCount, newCount in zip(self._ELEMENT_KINDS, counts, self._get_element_counts()):
+                for i in range(oldCount + 1, newCount + 1):
+                    elements.append((kind, str(i)))
+            self.itemElements[handle] = elements
+        self.ui.set_progress(total, total, phase)
+        if self.nwdCache is not None:
+            self.nwdCache.close()
+        self._discard_prefetched()
+        if self.unresolvedReferences:
+            report = '\n'.join(self.unresolvedReferences)
+            raise Error(f'{_("Unresolved references")}:\n{report}')
 
     def write(self):
         """Write instance variables to the novelWriter files.
@@ -239,6 +344,10 @@ class NwxFile(File):
             attrib['red'] = str(red)
             ET.SubElement(parent, 'entry', attrib).text = entry
 
+        def add_to_manifest(nwItem, kind, elemId, nwdFile):
+            """Add the content file written to the manifest."""
+            manifest.add_entry(nwItem.nwHandle, kind, elemId, fingerprints[kind][elemId], nwdFile.fileHash)
+
         root = ET.Element(self._NWX_TAG, self._NWX_ATTR_V1_5)
         NwItem = NwItemV15
 
@@ -275,6 +384,15 @@ class NwxFile(File):
         write_entry(importance, 'Major', 21, 0, 180, self.IMPORTANCE_IDS)
 
         #--- Write content.
+        self.pendingWrites = {}
+        self._start_scene_conversion()
+        fingerprints = NovelDiff().get_fingerprints(self.novel)
+        manifest = NwManifest(f'{os.path.dirname(self.filePath)}{self.CONTENT_DIR}'.rstrip('/'))
+        self.nwIndex = NwIndex(os.path.dirname(self.filePath))
+        done = 0
+        total = len(self.novel.srtChapters) + len(self.novel.get_scene_positions())
+        total += len(self.novel.srtCharacters) + len(self.novel.srtLocations) + len(self.novel.srtItems)
+        phase = _('Writing content files')
         content = ET.SubElement(root, 'content')
         attrCount = 0
         order = [0]
@@ -340,12 +458,15 @@ class NwxFile(File):
                     partHeading.nwLayout = 'NOTE'
                 partHeading.nwStatus = 'None'
                 partHeading.nwImportance = 'None'
-                partHeading.write(content, self)
 
-                # Add it to the .nwd file.
+                # Add it to the .nwd file, and count the content for the project file.
                 nwdFile = NwdNovelFile(self, partHeading)
                 nwdFile.add_chapter(chId)
                 nwdFile.write()
+                partHeading.write(content, self)
+                add_to_manifest(partHeading, 'chapters', chId, nwdFile)
+                done += 1
+                self.ui.set_progress(done, total, phase)
                 attrCount += 1
                 order[-1] += 1
                 # part level
@@ -392,12 +513,15 @@ class NwxFile(File):
                     chapterHeading.nwLayout = 'NOTE'
                 chapterHeading.nwStatus = 'None'
                 chapterHeading.nwImportance = 'None'
-                chapterHeading.write(content, self)
 
-                # Add it to the .nwd file.
+                # Add it to the .nwd file, and count the content for the project file.
                 nwdFile = NwdNovelFile(self, chapterHeading)
                 nwdFile.add_chapter(chId)
                 nwdFile.write()
+                chapterHeading.write(content, self)
+                add_to_manifest(chapterHeading, 'chapters', chId, nwdFile)
+                done += 1
+                self.ui.set_progress(done, total, phase)
                 attrCount += 1
                 order[-1] += 1
                 # chapter level
@@ -430,16 +554,15 @@ class NwxFile(File):
                     scene.nwActive = False
                 elif self.novel.scenes[scId].scType in (1, 2):
                     scene.nwLayout = 'NOTE'
-                if self.novel.scenes[scId].wordCount:
-                    scene.nwWordCount = str(self.novel.scenes[scId].wordCount)
-                if self.novel.scenes[scId].letterCount:
-                    scene.nwCharCount = str(self.novel.scenes[scId].letterCount)
-                scene.write(content, self)
 
-                # Add it to the .nwd file.
+                # Add it to the .nwd file, and count the content for the project file.
                 nwdFile = NwdNovelFile(self, scene)
                 nwdFile.add_scene(scId)
                 nwdFile.write()
+                scene.write(content, self)
+                add_to_manifest(scene, 'scenes', scId, nwdFile)
+                done += 1
+                self.ui.set_progress(done, total, phase)
                 attrCount += 1
                 order[-1] += 1
                 # chapter or part level
@@ -489,12 +612,15 @@ class NwxFile(File):
                 character.nwImportance = 'Minor'
             character.nwActive = True
             character.nwLayout = 'NOTE'
-            character.write(content, self)
 
-            # Add it to the .nwd file.
+            # Add it to the .nwd file, and count the content for the project file.
             nwdFile = NwdCharacterFile(self, character)
             nwdFile.add_character(crId)
             nwdFile.write()
+            character.write(content, self)
+            add_to_manifest(character, 'characters', crId, nwdFile)
+            done += 1
+            self.ui.set_progress(done, total, phase)
 
             attrCount += 1
             order[-1] += 1
@@ -540,12 +666,15 @@ class NwxFile(File):
             location.nwLayout = 'NOTE'
             location.nwStatus = 'None'
             location.nwImportance = 'None'
-            location.write(content, self)
 
-            # Add it to the .nwd file.
+            # Add it to the .nwd file, and count the content for the project file.
             nwdFile = NwdWorldFile(self, location)
             nwdFile.add_element(lcId)
             nwdFile.write()
+            location.write(content, self)
+            add_to_manifest(location, 'locations', lcId, nwdFile)
+            done += 1
+            self.ui.set_progress(done, total, phase)
             attrCount += 1
             order[-1] += 1
             # world level
@@ -590,12 +719,15 @@ class NwxFile(File):
             item.nwLayout = 'NOTE'
             item.nwStatus = 'None'
             item.nwImportance = 'None'
-            item.write(content, self)
 
-            # Add it to the .nwd file.
+            # Add it to the .nwd file, and count the content for the project file.
             nwdFile = NwdObjectFile(self, item)
             nwdFile.add_element(itId)
             nwdFile.write()
+            item.write(content, self)
+            add_to_manifest(item, 'items', itId, nwdFile)
+            done += 1
+            self.ui.set_progress(done, total, phase)
             attrCount += 1
             order[-1] += 1
             # object level
@@ -604,9 +736,186 @@ class NwxFile(File):
 
         # Write the content counter.
         content.set('count', str(attrCount))
+        self._write_pending()
+        manifest.write()
+        self.nwIndex.write()
+        self.nwIndex = None
+        self._convertedScenes = {}
+        self._pendingConversions = []
 
         #--- Format and write the XML tree.
         indent(root)
         self._tree = ET.ElementTree(root)
         self._tree.write(self.filePath, xml_declaration=True, encoding='utf-8')
         return f'"{norm_path(self.filePath)}" written.'
+
+    def update_item(self, nwItem):
+        """Update the name and the counts of an item in the XML project tree.
+        
+        Positional arguments:
+            nwItem -- NwItem instance: the item with the new name, status, and counts.
+        
+        Raise the "Error" exception if the item is not found.
+        """
+        if self._tree is None:
+            self.read_xml_file()
+        for node in self._tree.getroot().find('content').iter('item'):
+            if node.attrib.get('handle') == nwItem.nwHandle:
+                nameNode = node.find('name')
+                nameNode.text = nwItem.nwName
+                if nwItem.nwStatus is not None:
+                    nameNode.set('status', self.STATUS_IDS[nwItem.nwStatus])
+                metaNode = node.find('meta')
+                if metaNode is None:
+                    metaNode = ET.SubElement(node, 'meta')
+                if nwItem.nwCharCount is not None:
+                    metaNode.set('charCount', nwItem.nwCharCount)
+                if nwItem.nwWordCount is not None:
+                    metaNode.set('wordCount', nwItem.nwWordCount)
+                if nwItem.nwParaCount is not None:
+                    metaNode.set('paraCount', nwItem.nwParaCount)
+                return
+
+        raise Error(f'Invalid handle: {nwItem.nwHandle}')
+
+    def write_xml_file(self):
+        """Write the XML project tree to the novelWriter XML project file.
+        
+        Raise the "Error" exception in case of error.
+        """
+        try:
+            self._tree.write(self.filePath, xml_declaration=True, encoding='utf-8')
+        except:
+            raise Error(f'Can not write "{norm_path(self.filePath)}".')
+
+    def get_prefetched(self, filePath):
+        """Return the content of a file read in advance.
+        
+        Positional arguments:
+            filePath -- str: path to the content file.
+        
+        Return a bytes object, or None if the file was not prefetched. 
+        Raise an exception if prefetching failed.
+        """
+        future = self._prefetchedFiles.pop(filePath, None)
+        if future is None:
+            return None
+
+        return future.result()
+
+    def get_converted(self, scId):
+        """Return the scene content converted in advance.
+        
+        Positional arguments:
+            scId -- str: scene ID.
+        
+        Return a str, or None if the scene was not converted in advance. 
+        Raise an exception if the conversion failed.
+        """
+        while not scId in self._convertedScenes and self._pendingConversions:
+            # Wait for the chunks in the order of submission.
+            scIds, future = self._pendingConversions.pop(0)
+            self._convertedScenes.update(zip(scIds, future.result()))
+        return self._convertedScenes.pop(scId, None)
+
+    def _start_scene_conversion(self):
+        """Start converting the scene contents in chunks, if an executor is given.
+        
+        The chunks are submitted in the order of writing, so the first 
+        .nwd files can be written while the next chunks are being converted.
+        Raise the "Error" exception in case of error.
+        """
+
+        def submit(scIds, texts):
+            try:
+                future = self.convertExecutor.submit(NwdNovelFile.convert_scenes, texts, self.kwargs['double_linebreaks'])
+            except:
+                # The executor has been shut down.
+                raise Error(_('Cannot convert the scenes'))
+
+            self._pendingConversions.append((scIds, future))
+
+        self._convertedScenes = {}
+        self._pendingConversions = []
+        if self.convertExecutor is None:
+            return
+
+        scIds = []
+        texts = []
+        chunkSize = 0
+        for chId in self.novel.srtChapters:
+            for scId in self.novel.chapters[chId].srtScenes:
+                text = self.novel.scenes[scId].sceneContent
+                scIds.append(scId)
+                texts.append(text)
+                if text:
+                    chunkSize += len(text)
+                if chunkSize >= self._CONVERSION_CHUNK_SIZE:
+                    submit(scIds, texts)
+                    scIds = []
+                    texts = []
+                    chunkSize = 0
+        if scIds:
+            submit(scIds, texts)
+
+    def _prefetch_content_files(self):
+        """Start reading all content files concurrently, if an executor is given."""
+
+        def read_file(filePath):
+            with open(filePath, 'rb') as f:
+                return f.read()
+
+        self._prefetchedFiles = {}
+        if self.ioExecutor is None:
+            return
+
+        for filePath in self._get_source_files()[1:]:
+            self._prefetchedFiles[filePath] = self.ioExecutor.submit(read_file, filePath)
+
+    def _discard_prefetched(self):
+        """Discard the prefetched files not used, e.g. because the item is trashed."""
+        for future in self._prefetchedFiles.values():
+            future.cancel()
+        self._prefetchedFiles = {}
+
+    def _write_pending(self):
+        """Write the queued content files concurrently.
+        
+        Raise the "Error" exception in case of error.
+        """
+
+        def write_file(filePath, text):
+            with open(filePath, 'w', encoding='utf-8') as f:
+                f.write(text)
+
+        futures = []
+        try:
+            for filePath in self.pendingWrites:
+                futures.append((filePath, self.ioExecutor.submit(write_file, filePath, self.pendingWrites[filePath])))
+        except:
+            # The executor has been shut down.
+            raise Error(f'Can not write "{norm_path(filePath)}".')
+
+        finally:
+            self.pendingWrites = {}
+        for filePath, future in futures:
+            try:
+                future.result()
+            except:
+                raise Error(f'Can not write "{norm_path(filePath)}".')
+
+    def _get_element_counts(self):
+        """Return the numbers of elements read, in the order of _ELEMENT_KINDS."""
+        return (self.chCount, self.scCount, self.crCount, self.lcCount, self.itCount)
+
+    def _get_source_files(self):
+        """Return a list with the paths of the project file and all content files."""
+        contentDir = f'{os.path.dirname(self.filePath)}{self.CONTENT_DIR}'
+        sourceFiles = [self.filePath]
+        try:
+            for fileName in sorted(os.listdir(contentDir)):
+                if fileName.endswith(self.CONTENT_EXTENSION):
+                    sourceFiles.append(f'{contentDir}{fileName}')
+        except FileNotFoundError:
+            pass
+        return sourceFiles
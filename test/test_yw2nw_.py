@@ -4,11 +4,30 @@ Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import asyncio
+import json
 import os
+import pickle
 import unittest
+import xml.etree.ElementTree as ET
 from shutil import copyfile, rmtree, copytree
 import re
 import yw2nw_
+from pywriter.pywriter_globals import intern_text, string_to_list
+from pywriter.ui.ui_async import UiAsync
+from pywriter.file.novel_cache import NovelCache
+from pywriter.model.novel import Novel
+from pywriter.model.novel_diff import NovelDiff
+from pywriter.model.novel_statistics import NovelStatistics
+from pywriter.model.scene import count_text
+from pywriter.yw.yw7_file import Yw7File
+from yw2nwlib.nw_converter import NwConverter
+from yw2nwlib.nw_index import NwIndex
+from yw2nwlib.nw_manifest import NwManifest
+from yw2nwlib.nw_sync import NwSync
+from yw2nwlib.nwd_cache import NwdCache
+from yw2nwlib.nwd_file import NwdFile
+from yw2nwlib.nwx_file import NwxFile
 
 # Test environment
 
@@ -27,6 +46,7 @@ YW7_EDITED = 'edited.yw7'
 NW_NORMAL = 'normal.nw'
 NW_EDITED = 'edited.nw'
 PROJECT = 'Sample Project'
+CACHE_DIR = f'{TEST_EXEC_PATH}cache'
 
 
 def read_file(inputFile):
@@ -39,6 +59,17 @@ def read_file(inputFile):
             return f.read()
 
 
+def read_yw7_novel(filePath=f'{TEST_DATA_PATH}{YW7_EDITED}'):
+    yw7File = Yw7File(filePath)
+    yw7File.novel = Novel()
+    yw7File.read()
+    return yw7File.novel
+
+
+def list_content_files(contentDir):
+    return [fileName for fileName in os.listdir(contentDir) if fileName.endswith('.nwd')]
+
+
 def adjust_timestamp(text):
     return re.sub('timeStamp=".*?"', 'timeStamp="2023-06-06 22:10:14"', text)
 
@@ -56,6 +87,14 @@ def remove_all_testfiles():
         rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw')
     except:
         pass
+    try:
+        rmtree(f'{TEST_EXEC_PATH}{PROJECT}.nw.bak')
+    except:
+        pass
+    try:
+        rmtree(CACHE_DIR)
+    except:
+        pass
 
 
 class NormalOperation(unittest.TestCase):
@@ -68,6 +107,16 @@ class NormalOperation(unittest.TestCase):
             pass
         remove_all_testfiles()
 
+    def _check_nw_project(self):
+        """Compare the generated novelWriter project with the expected one, and return the content file names."""
+        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
+                         read_file(f'{TEST_DATA_PATH}{NW_EDITED}/nwProject.nwx'))
+        contentFiles = list_content_files(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
+        for contentFile in contentFiles:
+            self.assertEqual(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFile}'),
+                             read_file(f'{TEST_DATA_PATH}{NW_EDITED}/content/{contentFile}'))
+        return contentFiles
+
     def test_nw_to_yw7(self):
         copytree(f'{TEST_DATA_PATH}{NW_NORMAL}',
                  f'{TEST_EXEC_PATH}{PROJECT}.nw')
@@ -80,12 +129,406 @@ class NormalOperation(unittest.TestCase):
         copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
         os.chdir(TEST_EXEC_PATH)
         yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.yw7', doubleLinebreaks=True)
-        self.assertEqual(adjust_timestamp(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')),
-                                            read_file(f'{TEST_DATA_PATH}{NW_EDITED}/nwProject.nwx'))
-        contentFiles = os.listdir(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
-        for contentFile in contentFiles:
-            self.assertEqual(read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFile}'), read_file(
-                                        f'{TEST_DATA_PATH}{NW_EDITED}/content/{contentFile}'))
+        contentFiles = self._check_nw_project()
+
+        # Validate the manifest, then modify a content file.
+        manifest = NwManifest(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
+        manifest.read()
+        self.assertEqual(len(manifest.entries), len(contentFiles))
+        self.assertEqual(manifest.validate(), [])
+        with open(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{contentFiles[0]}', 'a', encoding='utf-8') as f:
+            f.write('Modified.')
+        self.assertEqual(len(manifest.validate()), 1)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class CachedOperation(NormalOperation):
+    """Test case: Converting twice, using the novel cache."""
+
+    def test_nw_to_yw7(self):
+        copytree(f'{TEST_DATA_PATH}{NW_NORMAL}',
+                 f'{TEST_EXEC_PATH}{PROJECT}.nw')
+        os.chdir(TEST_EXEC_PATH)
+        for __ in range(2):
+            yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', doubleLinebreaks=True, cacheDir=CACHE_DIR)
+            self.assertEqual(read_file(f'{TEST_EXEC_PATH}{PROJECT}.yw7'),
+                             read_file(f'{TEST_DATA_PATH}{YW7_GENERATED}'))
+        self.assertTrue(os.listdir(CACHE_DIR))
+
+    def test_yw7_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        os.chdir(TEST_EXEC_PATH)
+        for __ in range(2):
+            yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.yw7', doubleLinebreaks=True, cacheDir=CACHE_DIR)
+            self._check_nw_project()
+        self.assertTrue(os.listdir(CACHE_DIR))
+
+    def test_shared_cache_dir(self):
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        projectPath = f'{TEST_EXEC_PATH}{PROJECT}.yw7'
+        nwdCache = NwdCache(CACHE_DIR)
+        nwdCache.open(projectPath, {})
+        nwdCache.put_parsed('0123456789abc', projectPath, ['Parsed'])
+        nwdCache.close()
+        novelCache = NovelCache(CACHE_DIR)
+        novelCache.put(projectPath, [projectPath], {}, read_yw7_novel())
+        self.assertEqual(len(os.listdir(CACHE_DIR)), 2)
+
+        # The novel cache fits into the size limit, so it must not delete the .nwd cache entries.
+        novelCache.maxSize = max(os.path.getsize(f'{CACHE_DIR}/{fileName}') for fileName in os.listdir(CACHE_DIR))
+        novelCache.put(projectPath, [projectPath], {}, read_yw7_novel())
+        self.assertEqual(len(os.listdir(CACHE_DIR)), 2)
+
+
+class ParallelOperation(NormalOperation):
+    """Test case: Converting the scene contents with a process pool."""
+
+    def test_yw7_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        os.chdir(TEST_EXEC_PATH)
+        yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.yw7', doubleLinebreaks=True, jobs=2)
+        self._check_nw_project()
+
+
+class AsyncOperation(NormalOperation):
+    """Test case: Converting with the asyncio API."""
+
+    def _run_async(self, sourcePath):
+        kwargs = {'suffix': yw2nw_.SUFFIX}
+        kwargs.update(yw2nw_.SETTINGS)
+        kwargs.update(yw2nw_.OPTIONS)
+
+        async def convert():
+            converter = NwConverter()
+            converter.ui = UiAsync('')
+            await converter.run_async(sourcePath, **kwargs)
+            return converter.ui.infoHowText
+
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            message = loop.run_until_complete(convert())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+        self.assertTrue(message.startswith('File written'))
+
+    def test_nw_to_yw7(self):
+        copytree(f'{TEST_DATA_PATH}{NW_NORMAL}',
+                 f'{TEST_EXEC_PATH}{PROJECT}.nw')
+        os.chdir(TEST_EXEC_PATH)
+        self._run_async(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx')
+        self.assertEqual(read_file(f'{TEST_EXEC_PATH}{PROJECT}.yw7'),
+                         read_file(f'{TEST_DATA_PATH}{YW7_GENERATED}'))
+
+    def test_yw7_to_nw(self):
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        os.chdir(TEST_EXEC_PATH)
+        self._run_async(f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        self._check_nw_project()
+
+
+class NovelDiffTest(unittest.TestCase):
+    """Test case: Comparing novels."""
+
+    def test_no_changes(self):
+        self.assertFalse(NovelDiff().compare(read_yw7_novel(), read_yw7_novel()))
+
+    def test_changes(self):
+        oldNovel = read_yw7_novel()
+        newNovel = read_yw7_novel()
+        firstChId, secondChId = newNovel.srtChapters[:2]
+        scId = newNovel.chapters[firstChId].srtScenes[0]
+        newNovel.scenes[scId].sceneContent = 'Changed.'
+        newNovel.chapters[secondChId].srtScenes.insert(0, newNovel.chapters[firstChId].srtScenes.pop(0))
+        crId = newNovel.srtCharacters[0]
+        del newNovel.characters[crId]
+        changes = NovelDiff().compare(oldNovel, newNovel)
+        self.assertEqual(changes.scenes.modified, [scId])
+        self.assertEqual(changes.scenes.changedFields[scId], ['sceneContent'])
+        self.assertEqual(changes.scenes.moved, [scId])
+        self.assertEqual(changes.chapters.modified, [firstChId, secondChId])
+        self.assertEqual(changes.characters.removed, [crId])
+        self.assertFalse(changes.locations)
+
+
+class NovelStatisticsTest(unittest.TestCase):
+    """Test case: Counting words, letters, and paragraphs."""
+
+    def test_count_text(self):
+        self.assertEqual(count_text('> One two-three--four.\n\n[i]Five[/i] /* Comment */\n[b][/b]\n'), (4, 27, 2))
+
+    def test_statistics(self):
+        novel = read_yw7_novel()
+        statistics = NovelStatistics()
+        statistics.count(novel)
+        for scId, (words, letters, paragraphs) in statistics.scenes.items():
+            self.assertEqual((words, letters), (novel.scenes[scId].wordCount, novel.scenes[scId].letterCount))
+        for group in (statistics.chapters, statistics.statuses, statistics.viewpoints):
+            self.assertEqual(tuple(map(sum, zip(*group.values()))), statistics.total)
+        self.assertTrue(statistics.total[2] > 0)
+
+
+class SceneRelationsTest(unittest.TestCase):
+    """Test case: Looking up the scenes related to characters, locations, and items."""
+
+    def _check_relations(self, novel):
+        for kind, get_scenes in (
+                ('characters', novel.get_character_scenes),
+                ('locations', novel.get_location_scenes),
+                ('items', novel.get_item_scenes),
+                ):
+            for elemId in getattr(novel, kind):
+                scIds = [scId for scId in novel.scenes if elemId in (getattr(novel.scenes[scId], kind) or [])]
+                self.assertEqual(get_scenes(elemId), scIds)
+
+    def test_relations(self):
+        novel = read_yw7_novel()
+        self._check_relations(novel)
+        crId = novel.srtCharacters[0]
+        self.assertTrue(novel.get_character_scenes(crId))
+
+        # Assignments and deletions update the index.
+        for scId in novel.get_character_scenes(crId):
+            novel.scenes[scId].characters = []
+        self.assertEqual(novel.get_character_scenes(crId), [])
+        scId = list(novel.scenes)[0]
+        novel.scenes[scId].characters = [crId]
+        self.assertEqual(novel.get_character_scenes(crId), [scId])
+        del novel.scenes[scId]
+        self.assertEqual(novel.get_character_scenes(crId), [])
+        self._check_relations(novel)
+
+        # The index is rebuilt when a novel is unpickled.
+        self._check_relations(pickle.loads(pickle.dumps(read_yw7_novel())))
+
+
+class NovelOrderTest(unittest.TestCase):
+    """Test case: Looking up the positions of chapters and scenes."""
+
+    def _check_positions(self, novel):
+        globalIndex = 0
+        for chapterPosition, chId in enumerate(novel.srtChapters):
+            self.assertEqual(novel.get_chapter_position(chId), chapterPosition)
+            for scenePosition, scId in enumerate(novel.chapters[chId].srtScenes):
+                self.assertEqual(novel.get_scene_position(scId), (chId, scenePosition, globalIndex))
+                globalIndex += 1
+        self.assertEqual(len(novel.get_scene_positions()), globalIndex)
+
+    def test_positions(self):
+        novel = read_yw7_novel()
+        self._check_positions(novel)
+
+        # Changes of the chapter list, the chapters, and their scene lists update the index.
+        firstChId, secondChId = novel.srtChapters[:2]
+        scId = novel.chapters[firstChId].srtScenes.pop(0)
+        novel.chapters[secondChId].srtScenes.append(scId)
+        self.assertEqual(novel.get_scene_position(scId)[0], secondChId)
+        novel.srtChapters.reverse()
+        self._check_positions(novel)
+        novel.chapters[secondChId].srtScenes = []
+        self.assertIsNone(novel.get_scene_position(scId))
+        chapter = novel.chapters[firstChId]
+        chapter.srtScenes.append(scId)
+        del novel.chapters[firstChId]
+        novel.srtChapters.remove(firstChId)
+        chapter.srtScenes.remove(scId)
+        self.assertIsNone(novel.get_chapter_position(firstChId))
+        self._check_positions(novel)
+
+        # The unpickled novel keeps its index up to date.
+        novel = pickle.loads(pickle.dumps(read_yw7_novel()))
+        self._check_positions(novel)
+        chId = novel.srtChapters[-1]
+        scId = novel.chapters[novel.srtChapters[0]].srtScenes[0]
+        novel.chapters[chId].srtScenes.insert(0, scId)
+        novel.chapters[novel.srtChapters[0]].srtScenes.remove(scId)
+        self.assertEqual(novel.get_scene_position(scId)[:2], (chId, 0))
+        self._check_positions(novel)
+
+
+class InternTextTest(unittest.TestCase):
+    """Test case: Sharing the repeated IDs and tags of a project."""
+
+    def test_shared_strings(self):
+        novel = read_yw7_novel()
+        crIds = {crId: crId for crId in novel.srtCharacters}
+        scIds = {scId: scId for scId in novel.scenes}
+        for chId in novel.srtChapters:
+            for scId in novel.chapters[chId].srtScenes:
+                self.assertIs(scId, scIds[scId])
+        for scene in novel.scenes.values():
+            for crId in scene.characters or []:
+                self.assertIs(crId, crIds[crId])
+        self.assertIs(string_to_list('Girl;Programmer')[1], string_to_list(' Programmer ;Girl')[0])
+        self.assertIsNone(intern_text(None))
+
+
+class NwIndexTest(unittest.TestCase):
+    """Test case: Writing the novelWriter index along with the project."""
+
+    def setUp(self):
+        remove_all_testfiles()
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+
+    def test_index(self):
+        os.chdir(TEST_EXEC_PATH)
+        yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.yw7', doubleLinebreaks=True)
+        prjDir = f'{TEST_EXEC_PATH}{PROJECT}.nw'
+        with open(f'{prjDir}{NwIndex.META_DIR}{NwIndex.FILE_NAME}', 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        self.assertEqual(sorted(index), ['novelWriter.itemIndex', 'novelWriter.tagsIndex'])
+        counts = {}
+        for node in ET.parse(f'{prjDir}/nwProject.nwx').getroot().find('content').iter('item'):
+            meta = node.find('meta')
+            if meta.get('wordCount') is not None:
+                counts[node.get('handle')] = (int(meta.get('charCount')), int(meta.get('wordCount')), int(meta.get('paraCount')))
+        itemIndex = index['novelWriter.itemIndex']
+        tagsIndex = index['novelWriter.tagsIndex']
+
+        # Check the index against the format read by novelWriter 2.0.
+        self.assertEqual(sorted(itemIndex), sorted(fileName[:-4] for fileName in list_content_files(f'{prjDir}/content')))
+        for handle, itemData in itemIndex.items():
+            self.assertRegex(handle, '^[a-f0-9]{13}$')
+            itemCounts = [0, 0, 0]
+            for titleKey, heading in itemData['headings'].items():
+                self.assertRegex(titleKey, '^T[0-9]{4}$')
+                self.assertIn(heading['level'], ('H0', 'H1', 'H2', 'H3', 'H4'))
+                for key in ('line', 'cCount', 'wCount', 'pCount'):
+                    self.assertIsInstance(heading[key], int)
+                for key in ('title', 'tag', 'synopsis'):
+                    self.assertIsInstance(heading[key], str)
+                for i, key in enumerate(('cCount', 'wCount', 'pCount')):
+                    itemCounts[i] += heading[key]
+            self.assertEqual(tuple(itemCounts), counts[handle])
+            for titleKey, references in itemData.get('references', {}).items():
+                self.assertIn(titleKey, itemData['headings'])
+                for tag, keywords in references.items():
+                    self.assertIn(tag, tagsIndex)
+                    for keyword in keywords.split(','):
+                        self.assertIn(keyword, NwIndex.REFERENCE_KEYWORDS)
+        for tag, tagData in tagsIndex.items():
+            self.assertEqual(tagData['name'], tag)
+            self.assertEqual(itemIndex[tagData['handle']]['headings'][tagData['heading']]['tag'], tag)
+            self.assertIn(tagData['class'], ('CHARACTER', 'WORLD', 'OBJECT', 'NOVEL'))
+        self.assertIn('Jane', tagsIndex)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class TrackedWriteTest(unittest.TestCase):
+    """Test case: Writing back the changed elements only."""
+
+    def setUp(self):
+        remove_all_testfiles()
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+
+    def test_tracked_write(self):
+        yw7File = Yw7File(f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        yw7File.novel = Novel()
+        yw7File.read()
+        yw7File.novel.set_clean()
+        scIds = list(yw7File.novel.scenes)
+        yw7File.novel.scenes[scIds[0]].title = 'Changed title'
+        yw7File.novel.set_dirty('scenes', scIds[0])
+        yw7File.write()
+        self.assertEqual(yw7File.novel.dirtyElements, {})
+        changes = NovelDiff().compare(read_yw7_novel(),
+                                      read_yw7_novel(f'{TEST_EXEC_PATH}{PROJECT}.yw7'))
+        self.assertEqual(changes.scenes.modified, [scIds[0]])
+        self.assertEqual(changes.scenes.changedFields[scIds[0]], ['title'])
+
+        # The unchanged parts are copied from the original file.
+        oldText = read_file(f'{TEST_DATA_PATH}{YW7_EDITED}')
+        newText = read_file(f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        sections, scenes = yw7File._get_xml_ranges(oldText)
+        for scId in scIds[1:]:
+            start, end = scenes[scId]
+            self.assertIn(oldText[start:end], newText)
+        start, end = sections['WCLog']
+        self.assertIn(oldText[start:end], newText)
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+class SyncOperation(unittest.TestCase):
+    """Test case: Synchronizing the projects after changing both."""
+
+    def setUp(self):
+        remove_all_testfiles()
+        copyfile(f'{TEST_DATA_PATH}{YW7_EDITED}', f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+
+        # Rewrite the project, so the test changes are the only ones made by Yw7File.
+        self.yw7File = Yw7File(f'{TEST_EXEC_PATH}{PROJECT}.yw7')
+        self.yw7File.novel = Novel()
+        self.yw7File.read()
+        self.yw7File.write()
+        os.chdir(TEST_EXEC_PATH)
+        yw2nw_.run(f'{TEST_EXEC_PATH}{PROJECT}.yw7', doubleLinebreaks=True)
+        self.kwargs = dict(yw2nw_.SETTINGS)
+        self.kwargs.update(yw2nw_.OPTIONS)
+
+    def _sync(self):
+        sync = NwSync(Yw7File(f'{TEST_EXEC_PATH}{PROJECT}.yw7', **self.kwargs),
+                      NwxFile(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx', **self.kwargs))
+        sync.run()
+        return sync
+
+    def test_sync(self):
+        self.assertFalse(self._sync().toNovelWriter)
+
+        # Change three scenes in yWriter, and the last two of them in novelWriter.
+        yw7File = self.yw7File
+        yw7File.novel = Novel()
+        yw7File.read()
+        scIds = [scId for chId in yw7File.novel.srtChapters for scId in yw7File.novel.chapters[chId].srtScenes][:3]
+        descriptions = {}
+        for scId in scIds:
+            descriptions[scId] = yw7File.novel.scenes[scId].desc
+            yw7File.novel.scenes[scId].desc = 'Changed in yWriter.'
+        yw7File.novel.scenes[scIds[0]].sceneContent = 'Changed in yWriter.'
+        yw7File.write()
+        manifest = NwManifest(f'{TEST_EXEC_PATH}{PROJECT}.nw/content')
+        manifest.read()
+        handles = {entry['id']: handle for handle, entry in manifest.entries.items() if entry['kind'] == 'scenes'}
+        for scId in scIds[1:]:
+            with open(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{handles[scId]}.nwd', 'a', encoding='utf-8') as f:
+                f.write('\n\nChanged in novelWriter.')
+        sync = self._sync()
+        self.assertEqual(sync.toNovelWriter, [handles[scIds[0]]])
+        self.assertEqual(len(sync.conflicts), 2)
+        self.assertEqual(sync.structuralChanges, [])
+
+        # The project file has the counts of the rewritten content file.
+        handle = handles[scIds[0]]
+        text = read_file(f'{TEST_EXEC_PATH}{PROJECT}.nw/content/{handle}.nwd')
+        for node in ET.parse(f'{TEST_EXEC_PATH}{PROJECT}.nw/nwProject.nwx').getroot().find('content').iter('item'):
+            if node.get('handle') == handle:
+                meta = node.find('meta')
+                counts = (int(meta.get('charCount')), int(meta.get('wordCount')), int(meta.get('paraCount')))
+        self.assertEqual(counts, NwdFile.count_text(text))
+
+        # Resolve the conflicts by reverting the changes in yWriter.
+        yw7File.novel = Novel()
+        yw7File.read()
+        for scId in scIds[1:]:
+            # Yw7File.write() keeps the old value, if the new one is None.
+            yw7File.novel.scenes[scId].desc = descriptions[scId] or ''
+        yw7File.write()
+        sync = self._sync()
+        self.assertEqual(sorted(sync.toYw), sorted(handles[scId] for scId in scIds[1:]))
+        self.assertEqual(sync.conflicts, [])
+        self.assertIn('Changed in novelWriter.', read_file(f'{TEST_EXEC_PATH}{PROJECT}.yw7'))
+
+        # Nothing to do after synchronizing.
+        sync = self._sync()
+        self.assertFalse(sync.toNovelWriter or sync.toYw or sync.conflicts)
+        manifest.read()
+        self.assertEqual(manifest.validate(), [])
 
     def tearDown(self):
         remove_all_testfiles()
@@ -1,27 +1,133 @@
 """Build a Python script for the yw2nw distribution.
-        
-In order to distribute a single script without dependencies, 
+
+In order to distribute a single script without dependencies,
 this script "inlines" all modules imported from the pywriter package.
 
+Then build a zip application from the script for read-only installations.
+The zip application contains the script's bytecode, compiled
+with docstrings stripped, so Python needn't compile it on every run.
+The bytecode only works with the Python version running the build;
+other Python versions fall back to the script's source in the archive.
+
+The modules imported within functions stay lazy in the built script,
+so running it with "--help" doesn't load the converter.
+The build fails if "--help" imports for longer than HELP_IMPORT_TIME_BUDGET,
+or if loading the converter takes longer than IMPORT_TIME_BUDGET.
+
+Usage:
+build_yw2nw.py [version]
+
+Positional arguments:
+  version -- version string replacing "@release" in the zip application.
+
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/yw2nw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import os
+import py_compile
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
+import zipfile
+import import_time
 import inliner
 
 SRC = '../src/'
 BUILD = '../test/'
 SOURCE_FILE = f'{SRC}yw2nw_.py'
 TARGET_FILE = f'{BUILD}yw2nw.py'
+PYZ_FILE = f'{BUILD}yw2nw.pyz'
+MODULE_NAME = 'yw2nw'
+INTERPRETER = '/usr/bin/env python3'
+IMPORT_TIME_BUDGET = 150
+# Maximum time in milliseconds for importing the application and the converter from the zip archive.
+HELP_IMPORT_TIME_BUDGET = 50
+# Maximum import time in milliseconds for running the zip application with "--help".
+
+MAIN_SCRIPT = f'''import {MODULE_NAME}
+{MODULE_NAME}.main()
+'''
+# The application is imported as a module, so worker processes can unpickle its functions.
+
+
+def build_pyz(scriptFile, pyzFile, version=None):
+    """Create a zip application from a single-file script.
+
+    Positional arguments:
+        scriptFile -- str: path of the inlined script.
+        pyzFile -- str: path of the zip application to create.
+
+    Optional arguments:
+        version -- str: version string replacing "@release", if any.
+
+    The archive is uncompressed, so running it doesn't require zlib.
+    """
+    with open(scriptFile, 'r', encoding='utf-8') as f:
+        script = f.read()
+    if version is not None:
+        script = script.replace('@release', version)
+    with TemporaryDirectory() as tempDir:
+        sourcePath = f'{tempDir}/{MODULE_NAME}.py'
+        bytecodePath = f'{tempDir}/{MODULE_NAME}.pyc'
+        with open(sourcePath, 'w', encoding='utf-8') as f:
+            f.write(script)
+
+        # Optimization level 2 strips the docstrings and assertions.
+        # The bytecode is not checked against the source, which is only a fallback.
+        py_compile.compile(sourcePath, bytecodePath, doraise=True, optimize=2,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+        print(f'Writing "{pyzFile}"...\n')
+        with open(pyzFile, 'wb') as f:
+            f.write(f'#!{INTERPRETER}\n'.encode('utf-8'))
+            with zipfile.ZipFile(f, 'w', compression=zipfile.ZIP_STORED) as z:
+                z.writestr('__main__.py', MAIN_SCRIPT)
+                z.write(bytecodePath, f'{MODULE_NAME}.pyc')
+                z.write(sourcePath, f'{MODULE_NAME}.py')
+    os.chmod(pyzFile, 0o755)
+
+
+def get_best_load_time(pyzFile, runs=import_time.RUNS):
+    """Return the shortest time in milliseconds for importing the application and the converter.
+
+    The converter's modules are loaded by a function, not by an import statement,
+    so the time is measured by the process instead of "-X importtime".
+    """
+    pyzPath = os.path.abspath(pyzFile)
+    script = (f'import sys, time; start = time.perf_counter(); sys.path.insert(0, {pyzPath!r}); '
+              f'import {MODULE_NAME}; {MODULE_NAME}.NwConverter; print(time.perf_counter() - start)')
+    best = None
+    for __ in range(runs):
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        loadTime = float(result.stdout) * 1000
+        if best is None or loadTime < best:
+            best = loadTime
+    return best
+
+
+def check_import_time(pyzFile):
+    """Exit with an error message if an import time exceeds its budget."""
+    helpTime, __ = import_time.get_best_import_times([os.path.abspath(pyzFile), '--help'])
+    helpTime /= 1000
+    print(f'Import time with "--help": {helpTime:.1f} ms (budget: {HELP_IMPORT_TIME_BUDGET} ms)')
+    loadTime = get_best_load_time(pyzFile)
+    print(f'Import time of the converter: {loadTime:.1f} ms (budget: {IMPORT_TIME_BUDGET} ms)\n')
+    if helpTime > HELP_IMPORT_TIME_BUDGET:
+        sys.exit(f'ERROR: The import time of "{pyzFile} --help" exceeds the budget.')
+
+    if loadTime > IMPORT_TIME_BUDGET:
+        sys.exit(f'ERROR: The import time of the converter in "{pyzFile}" exceeds the budget.')
 
 
-def main():
+def main(version=None):
     # inliner.run(SOURCE_FILE, TARGET_FILE, 'yw2nwlib', '../src/', copyPyWriter=True)
     # inliner.run(TARGET_FILE, TARGET_FILE, 'pywriter', '../../PyWriter/src/', copyPyWriter=True)
     inliner.run(SOURCE_FILE, TARGET_FILE, 'yw2nwlib', '../src/')
     inliner.run(TARGET_FILE, TARGET_FILE, 'pywriter', '../src/')
+    build_pyz(TARGET_FILE, PYZ_FILE, version)
+    check_import_time(PYZ_FILE)
     print('Done.')
 
 
 if __name__ == '__main__':
-    main()
+    main(*sys.argv[1:2])
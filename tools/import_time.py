@@ -0,0 +1,86 @@
+"""Measure the import time of the yw2nw application.
+
+Run Python with "-X importtime" for typical entry points
+and list the modules with the largest cumulative import time.
+Each measurement is repeated, and the fastest run is reported,
+so that the file system cache does not distort the result.
+
+Usage:
+import_time.py [script]
+
+Positional arguments:
+  script -- path of the script to measure instead of "../src/yw2nw_.py".
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+import subprocess
+import sys
+
+SRC = '../src/'
+SCRIPT = f'{SRC}yw2nw_.py'
+RUNS = 5
+TOP_MODULES = 10
+
+
+def get_import_times(args, cwd=None):
+    """Return the total import time and a list of the module import times.
+
+    Positional arguments:
+        args -- list of str: Python command line arguments following "-X importtime".
+
+    Optional arguments:
+        cwd -- str: working directory of the Python process.
+
+    The total and the list entries are in microseconds.
+    The list contains (cumulative time, module name) tuples,
+    sorted by cumulative time, starting with the largest.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args,
+                            cwd=cwd, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    total = 0
+    modules = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        if match is None:
+            continue
+
+        cumulative = int(match.group(2))
+        modules.append((cumulative, match.group(4)))
+        if len(match.group(3)) == 1:
+            # Top-level import
+            total += cumulative
+    modules.sort(reverse=True)
+    return total, modules
+
+
+def get_best_import_times(args, cwd=None, runs=RUNS):
+    """Return the results of the fastest of several runs of get_import_times()."""
+    best = None
+    for __ in range(runs):
+        times = get_import_times(args, cwd)
+        if best is None or times[0] < best[0]:
+            best = times
+    return best
+
+
+def report(title, args, cwd=None):
+    """Print the total import time and the slowest modules."""
+    total, modules = get_best_import_times(args, cwd)
+    print(f'{title}: {total / 1000:.1f} ms')
+    for cumulative, moduleName in modules[:TOP_MODULES]:
+        print(f'    {cumulative / 1000:8.1f} ms  {moduleName}')
+    print()
+
+
+def main(script=SCRIPT):
+    scriptDir, scriptName = os.path.split(os.path.abspath(script))
+    report(f'{scriptName} --help', [scriptName, '--help'], scriptDir)
+    report('Converter', ['-c', 'from yw2nwlib.nw_converter import NwConverter'], os.path.abspath(SRC))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])
@@ -3,16 +3,155 @@
 In order to distribute single scripts without dependencies, 
 this script "inlines" all modules imported from the pywriter package.
 
+Modules imported within functions stay lazy: they are inlined into a
+function that defines their names globally when called for the first time.
+The local imports are replaced with calls of this function.
+
 Copyright (c) 2023 Peter Triesberger
 For further information see https://github.com/peter88213/PyWriter
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import ast
+import io
 import re
 import os
+import tokenize
 from shutil import copyfile
 
 
-def inline_module(file, package, packagePath, text, processedModules, copyPyWriter):
+def get_import_function(package):
+    """Return the name of the function importing the deferred modules of a package."""
+    return f'_import_{package}_modules'
+
+
+def get_global_names(text):
+    """Return a (names, annotations) tuple for the top level of the code.
+
+    names -- sorted list of the names bound.
+    annotations -- list of the ast.AnnAssign nodes.
+    """
+
+    class GlobalNames(ast.NodeVisitor):
+
+        def __init__(self):
+            self.names = set()
+            self.annotations = []
+
+        def visit_FunctionDef(self, node):
+            self.names.add(node.name)
+
+        visit_AsyncFunctionDef = visit_FunctionDef
+        visit_ClassDef = visit_FunctionDef
+
+        def visit_Lambda(self, node):
+            pass
+
+        visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_Lambda
+
+        def visit_Name(self, node):
+            if isinstance(node.ctx, ast.Store):
+                self.names.add(node.id)
+
+        def visit_AnnAssign(self, node):
+            self.annotations.append(node)
+            self.generic_visit(node)
+
+        def visit_alias(self, node):
+            # Star imports are left to the next package's inlining.
+            if node.name != '*':
+                self.names.add(node.asname or node.name.split('.')[0])
+
+        def visit_ExceptHandler(self, node):
+            if node.name:
+                self.names.add(node.name)
+            self.generic_visit(node)
+
+    visitor = GlobalNames()
+    visitor.visit(ast.parse(text))
+    return sorted(visitor.names), visitor.annotations
+
+
+def remove_annotations(text, annotations):
+    """Return the code with the annotations of the given assignments removed.
+
+    A name declared global can not be annotated.
+    The annotated assignments must be on one line.
+    """
+    lines = text.splitlines(keepends=True)
+    for node in annotations:
+        # The column offsets refer to the utf-8 encoded line.
+        line = lines[node.lineno - 1].encode('utf-8')
+        if node.value is None:
+            lines[node.lineno - 1] = f'{line[:node.col_offset].decode("utf-8")}pass\n'
+        else:
+            lines[node.lineno - 1] = (line[:node.target.end_col_offset] + b' = ' + line[node.value.col_offset:]).decode('utf-8')
+    return ''.join(lines)
+
+
+def indent_code(text, prefix='    '):
+    """Return the code indented, leaving the continuation lines of multi-line strings unchanged."""
+    stringLines = set()
+    fStringStarts = []
+    for token in tokenize.generate_tokens(io.StringIO(text).readline):
+        if token.type == tokenize.STRING:
+            stringLines.update(range(token.start[0] + 1, token.end[0] + 1))
+        elif token.type == getattr(tokenize, 'FSTRING_START', None):
+            fStringStarts.append(token.start[0])
+        elif token.type == getattr(tokenize, 'FSTRING_END', None):
+            stringLines.update(range(fStringStarts.pop() + 1, token.end[0] + 1))
+    lines = []
+    for lineNumber, line in enumerate(text.splitlines(keepends=True), 1):
+        if line.strip() and not lineNumber in stringLines:
+            line = f'{prefix}{line}'
+        lines.append(line)
+    return ''.join(lines)
+
+
+def wrap_deferred_modules(text, package, hasImportHook):
+    """Return the code of the deferred modules, wrapped in their import function.
+
+    Positional arguments:
+        text -- str: the inlined code of the modules imported within functions.
+        package -- str: name of the package the modules belong to.
+        hasImportHook -- bool: True, if the script already has the module's __getattr__ function.
+
+    The import function declares the module names global, so calling it
+    defines them as if the modules were inlined at top level.
+    The module's __getattr__ function calls all import functions,
+    so a worker process can unpickle a function of a deferred module.
+    """
+    importFunction = get_import_function(package)
+    importedFlag = f'_{package}ModulesImported'
+    wrapper = []
+    if not hasImportHook:
+        wrapper.append(f"""_IMPORT_FUNCTIONS = []
+
+
+def __getattr__(name):
+    # Import the deferred modules, e.g. when a worker process unpickles a function.
+    for importFunction in _IMPORT_FUNCTIONS:
+        importFunction()
+    try:
+        return globals()[name]
+
+    except KeyError:
+        raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}") from None
+
+
+""")
+    wrapper.append(f'{importedFlag} = False\n\n\ndef {importFunction}():\n')
+    names, annotations = get_global_names(text)
+    names.insert(0, importedFlag)
+    text = remove_annotations(text, annotations)
+    for i in range(0, len(names), 8):
+        wrapper.append(f'    global {", ".join(names[i:i + 8])}\n')
+    wrapper.append(f'    if {importedFlag}:\n        return\n\n    {importedFlag} = True\n')
+    wrapper.append(indent_code(text))
+    wrapper.append(f'\n\n_IMPORT_FUNCTIONS.append({importFunction})\n\n\n')
+    return ''.join(wrapper)
+
+
+def inline_module(file, package, packagePath, text, processedModules, copyPyWriter, deferredModules):
     with open(file, 'r', encoding='utf-8') as f:
         print(f'Processing "{file}"...')
         if copyPyWriter:
@@ -50,15 +189,22 @@ def inline_module(file, package, packagePath, text, processedModules, copyPyWrit
                     if '__main__' in line:
                         return(text)
                 if 'import' in line:
-                    importModule = re.match('from (.+?) import.+', line)
-                    if (importModule is not None) and (package in importModule.group(1)):
-                        packageName = re.sub('\.', '\/', importModule.group(1))
+                    importModule = re.match('(\s*)from (.+?) import.+', line)
+                    if (importModule is not None) and (package in importModule.group(2)):
+                        packageName = importModule.group(2).replace('.', '/')
                         moduleName = f'{packagePath}{packageName}'
-                        if not (moduleName in processedModules):
+                        if importModule.group(1):
+                            # Local import: call the function defining the deferred modules' names.
+                            if not (moduleName in deferredModules):
+                                deferredModules.append(moduleName)
+                            callLine = f'{importModule.group(1)}{get_import_function(package)}()\n'
+                            if not text.endswith(callLine):
+                                text = f'{text}{callLine}'
+                        elif not (moduleName in processedModules):
                             processedModules.append(moduleName)
                             text = inline_module(
-                                f'{moduleName}.py', package, packagePath, text, processedModules, copyPyWriter)
-                    elif line.lstrip().startswith('import'):
+                                f'{moduleName}.py', package, packagePath, text, processedModules, copyPyWriter, deferredModules)
+                    elif line.startswith('import'):
                         moduleName = line.replace('import ', '').rstrip()
                         if not (moduleName in processedModules):
                             processedModules.append(moduleName)
@@ -73,7 +219,26 @@ def inline_module(file, package, packagePath, text, processedModules, copyPyWrit
 def run(sourceFile, targetFile, package, packagePath, copyPyWriter=False):
     text = ''
     processedModules = []
-    text = inline_module(sourceFile, package, packagePath, text, processedModules, copyPyWriter)
+    deferredModules = []
+    text = inline_module(sourceFile, package, packagePath, text, processedModules, copyPyWriter, deferredModules)
+
+    # Modules imported within functions are inlined into their import function before the main program,
+    # so their names are defined when the functions call it.
+    deferredText = ''
+    hasDeferredModules = bool(deferredModules)
+    while deferredModules:
+        moduleName = deferredModules.pop(0)
+        if not (moduleName in processedModules):
+            processedModules.append(moduleName)
+            deferredText = inline_module(
+                f'{moduleName}.py', package, packagePath, deferredText, processedModules, copyPyWriter, deferredModules)
+    if hasDeferredModules:
+        deferredText = wrap_deferred_modules(deferredText, package, '\ndef __getattr__(name):' in text)
+    mainPos = text.rfind("\nif __name__ == '__main__':")
+    if mainPos < 0:
+        text = f'{text}{deferredText}'
+    else:
+        text = f'{text[:mainPos + 1]}{deferredText}{text[mainPos + 1:]}'
     with open(targetFile, 'w', encoding='utf-8') as f:
         print(f'Writing "{targetFile}"...\n')
         f.write(text)
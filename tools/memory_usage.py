@@ -0,0 +1,117 @@
+"""Measure the memory used by the model of a yWriter project.
+
+Read a yWriter project and report the memory held by the Novel instance,
+after the xml element tree is released.
+Without a project given, generate a project with NUM_SCENES scenes,
+whose scenes refer to a few characters, locations, items, and tags,
+so the model's metadata rather than the scene contents dominates.
+
+Usage:
+memory_usage.py [yw7 file]
+
+Positional arguments:
+  yw7 file -- path of the yWriter project to measure instead of a generated one.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/yw2nw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, f'{os.path.dirname(os.path.abspath(__file__))}/../src')
+from pywriter.model.chapter import Chapter
+from pywriter.model.character import Character
+from pywriter.model.novel import Novel
+from pywriter.model.scene import Scene
+from pywriter.model.world_element import WorldElement
+from pywriter.yw.yw7_file import Yw7File
+
+NUM_SCENES = 10000
+SCENES_PER_CHAPTER = 25
+NUM_CHARACTERS = 40
+NUM_LOCATIONS = 20
+NUM_ITEMS = 10
+NUM_TAGS = 30
+
+
+def generate_project(filePath):
+    """Write a yWriter project with NUM_SCENES scenes to filePath."""
+    novel = Novel()
+    novel.title = 'Memory usage'
+    for i in range(NUM_CHARACTERS):
+        crId = str(i + 1)
+        novel.characters[crId] = Character()
+        novel.characters[crId].title = f'Character {i + 1}'
+        novel.srtCharacters.append(crId)
+    for i in range(NUM_LOCATIONS):
+        lcId = str(i + 1)
+        novel.locations[lcId] = WorldElement()
+        novel.locations[lcId].title = f'Location {i + 1}'
+        novel.srtLocations.append(lcId)
+    for i in range(NUM_ITEMS):
+        itId = str(i + 1)
+        novel.items[itId] = WorldElement()
+        novel.items[itId].title = f'Item {i + 1}'
+        novel.srtItems.append(itId)
+    chapter = None
+    for i in range(NUM_SCENES):
+        if i % SCENES_PER_CHAPTER == 0:
+            chId = str(len(novel.srtChapters) + 1)
+            chapter = Chapter()
+            chapter.title = f'Chapter {chId}'
+            chapter.chLevel = 0
+            chapter.chType = 0
+            novel.chapters[chId] = chapter
+            novel.srtChapters.append(chId)
+        scId = str(i + 1)
+        scene = Scene()
+        scene.title = f'Scene {scId}'
+        scene.scType = 0
+        scene.status = i % 5 + 1
+        scene.sceneContent = 'The scene.'
+        scene.characters = [str((i + j) % NUM_CHARACTERS + 1) for j in range(3)]
+        scene.locations = [str((i + j) % NUM_LOCATIONS + 1) for j in range(2)]
+        scene.items = [str(i % NUM_ITEMS + 1)]
+        scene.tags = [f'tag{(i + j) % NUM_TAGS}' for j in range(3)]
+        scene.scnArcs = f'Arc {i % 3 + 1}'
+        novel.scenes[scId] = scene
+        chapter.srtScenes.append(scId)
+    ywFile = Yw7File(filePath)
+    ywFile.novel = novel
+    ywFile.write()
+
+
+def measure(filePath):
+    """Return the number of bytes held by the novel read from filePath."""
+    gc.collect()
+    tracemalloc.start()
+    ywFile = Yw7File(filePath)
+    ywFile.novel = Novel()
+    ywFile.read()
+    novel = ywFile.novel
+    del ywFile
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del novel
+    return size
+
+
+def main(filePath=None):
+    if filePath is None:
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = f'{tempDir}/memory_usage.yw7'
+            generate_project(filePath)
+            size = measure(filePath)
+        print(f'Generated project with {NUM_SCENES} scenes: {size / 1024 / 1024:.2f} MiB')
+    else:
+        size = measure(filePath)
+        print(f'{os.path.basename(filePath)}: {size / 1024 / 1024:.2f} MiB')
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:2])